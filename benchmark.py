@@ -0,0 +1,309 @@
+# Benchmark-Suite mit synthetischen Daten
+#
+# Erzeugt eine Wegwerf-SQLite-Datenbank mit realistischer Taxonomie, Nutzern mit
+# dünn besetzten Selbsteinschätzungen und Projekten mit Anforderungen und Zuweisungen,
+# misst die Abdeckungs-Helfer und die wichtigsten Seiten über den Flask-Testclient
+# und schreibt die Ergebnisse als JSON, damit mehrere Läufe verglichen werden können.
+#
+#   python benchmark.py                          # Standardgröße (10k Nutzer, 2k Projekte)
+#   python benchmark.py --users 500 --projects 100 --output klein.json
+#   python benchmark.py --compare alt.json neu.json
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+LEVELS = (1, 2, 3)  # Kenner, Könner, Experte
+BENCH_PASSWORD = 'benchmark'
+
+
+# Argumente für Datenmenge, Wiederholungen und Ausgabe
+def parse_args():
+    parser = argparse.ArgumentParser(description='Benchmark mit synthetischen Daten')
+    parser.add_argument('--groups', type=int, default=20, help='Anzahl Kompetenzgruppen')
+    parser.add_argument('--competences', type=int, default=200, help='Anzahl Kompetenzen')
+    parser.add_argument('--skills', type=int, default=2000, help='Anzahl Wissen und Fähigkeiten')
+    parser.add_argument('--users', type=int, default=10000, help='Anzahl Nutzer')
+    parser.add_argument('--skills-per-user', type=int, default=20, help='Mittlere Anzahl Selbsteinschätzungen je Nutzer')
+    parser.add_argument('--projects', type=int, default=2000, help='Anzahl Projekte')
+    parser.add_argument('--active-share', type=float, default=0.25, help='Anteil aktiver (nicht abgeschlossener) Projekte')
+    parser.add_argument('--repeat', type=int, default=5, help='Wiederholungen je Messung')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--db', help='Pfad der Benchmark-Datenbank (Standard: temporäre Datei)')
+    parser.add_argument('--output', default='benchmark_results.json', help='Ergebnisdatei (JSON)')
+    parser.add_argument('--compare', nargs=2, metavar=('ALT', 'NEU'), help='Zwei Ergebnisdateien vergleichen')
+    return parser.parse_args()
+
+
+# Füllt die Datenbank per Bulk-Insert (Core, ohne ORM-Objekte)
+def generate_data(main, args):
+    rnd = random.Random(args.seed)
+    db = main.db
+    db.drop_all()
+    db.create_all()
+
+    def insert(table, rows):
+        if rows:
+            db.session.execute(table.insert(), rows)
+
+    insert(main.CompetenceGroup.__table__, [
+        {'id': i, 'name': f'Kompetenzgruppe {i}'} for i in range(1, args.groups + 1)
+    ])
+    insert(main.Competence.__table__, [
+        {'id': i, 'name': f'Kompetenz {i}', 'competence_group_id': rnd.randint(1, args.groups)}
+        for i in range(1, args.competences + 1)
+    ])
+    insert(main.KnowledgeSkills.__table__, [
+        {'id': i, 'name': f'Wissen/Fähigkeit {i}', 'competence_id': rnd.randint(1, args.competences)}
+        for i in range(1, args.skills + 1)
+    ])
+
+    # Ein gemeinsamer Passwort-Hash, sonst dominiert das Hashing die Generierung
+    password_hash = main.generate_password_hash(BENCH_PASSWORD)
+    insert(main.Users.__table__, [
+        {'id': 1, 'name': 'Admin', 'email': 'admin@benchmark', 'admin': True,
+         'password_hash': password_hash, 'should_update_competences': False}
+    ] + [
+        {'id': i, 'name': f'Mitarbeiter {i}', 'email': f'user{i}@benchmark', 'admin': False,
+         'password_hash': password_hash, 'should_update_competences': False}
+        for i in range(2, args.users + 2)
+    ])
+
+    # Dünn besetzte Selbsteinschätzungen: beliebte Skills werden häufiger gewählt
+    skill_ids = list(range(1, args.skills + 1))
+    skill_weights = [1.0 / (rank ** 0.6) for rank in range(1, args.skills + 1)]
+    competence_rows = []
+    for user_id in range(2, args.users + 2):
+        count = min(args.skills, max(0, int(rnd.gauss(args.skills_per_user, args.skills_per_user / 3))))
+        for skill_id in set(rnd.choices(skill_ids, weights=skill_weights, k=count)):
+            competence_rows.append({'users_id': user_id, 'knowledge_skill_id': skill_id,
+                                    'competence_level': rnd.choice(LEVELS)})
+    insert(main.UsersCompetence.__table__, competence_rows)
+
+    project_rows = []
+    requirement_rows = []
+    assignment_rows = []
+    for project_id in range(1, args.projects + 1):
+        active = rnd.random() < args.active_share
+        project_rows.append({
+            'id': project_id,
+            'project_name': f'Projekt {project_id}',
+            'status': None if active else 'Abgeschlossen',
+            'notiz': f'Notiz zu Projekt {project_id}' if not active else '',
+        })
+        for skill_id in set(rnd.choices(skill_ids, weights=skill_weights, k=rnd.randint(5, 15))):
+            requirement_rows.append({'project_id': project_id, 'knowledge_skill_id': skill_id,
+                                     'competence_level': rnd.choice(LEVELS)})
+        for user_id in rnd.sample(range(2, args.users + 2), min(args.users, rnd.randint(1, 6))):
+            assignment_rows.append({'project_id': project_id, 'user_id': user_id})
+    insert(main.Project.__table__, project_rows)
+    insert(main.ProjectRequirement.__table__, requirement_rows)
+    insert(main.projekt_user, assignment_rows)
+    db.session.commit()
+
+    # Abgeleitete Daten (materialisierte Abdeckung, Volltextindex) wie im Betrieb aufbauen
+    for command in ('coverage-rebuild', 'project-fts-rebuild'):
+        result = main.app.test_cli_runner().invoke(args=[command])
+        if result.exit_code != 0:
+            raise RuntimeError(result.output)
+
+    return {
+        'competence_groups': args.groups,
+        'competences': args.competences,
+        'knowledge_skills': args.skills,
+        'users': args.users + 1,
+        'users_competence': len(competence_rows),
+        'projects': args.projects,
+        'project_requirements': len(requirement_rows),
+        'assignments': len(assignment_rows),
+    }
+
+
+# Zählt SQL-Statements außerhalb von Requests (für die Helfer-Funktionen)
+class QueryCounter:
+
+    def __init__(self, main, engine):
+        self.count = 0
+        self._event = main.db.event
+        self._engine = engine
+
+    def _count(self, *args):
+        self.count += 1
+
+    def __enter__(self):
+        self.count = 0
+        self._event.listen(self._engine, 'after_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        self._event.remove(self._engine, 'after_cursor_execute', self._count)
+
+
+# Führt eine Messung mehrfach aus; vor jedem Lauf wird die Session geleert (kalter Identity-Map-Zustand)
+def measure(main, engine, name, func, repeat):
+    durations = []
+    queries = None
+    for _ in range(repeat):
+        if main.has_app_context():
+            main.db.session.remove()
+        with QueryCounter(main, engine) as counter:
+            started = time.perf_counter()
+            func()
+            durations.append(time.perf_counter() - started)
+        queries = counter.count
+    result = {
+        'min_s': min(durations),
+        'median_s': statistics.median(durations),
+        'mean_s': statistics.fmean(durations),
+        'max_s': max(durations),
+        'queries': queries,
+    }
+    print(f"{name:<40} median {result['median_s'] * 1000:9.1f} ms   {queries:6d} Queries")
+    return result
+
+
+# Misst die Hilfsfunktionen für Kompetenzvergleich und -abdeckung
+def bench_helpers(main, repeat):
+    results = {}
+    engine = main.Engine  # Engine-Klasse: zählt auch die Read-only-Engine der Report-Seiten
+    sample_project = main.Project.query.filter(main._active_project_filter()).order_by(main.Project.id).first()
+    anforderungen = main._get_project_requirements(sample_project.id)
+
+    def compare_user_skills():
+        main._compare_user_skills(main.Users.query.all(), anforderungen)
+
+    def active_projects():
+        return main.Project.query.filter(main._active_project_filter()).all()
+
+    def check_kompetenz_abdeckung():
+        projekte = active_projects()
+        report = main.CoverageReport.load(projekte)
+        for projekt in projekte:
+            main.check_kompetenz_abdeckung(projekt, report)
+
+    results['_compare_user_skills'] = measure(main, engine, '_compare_user_skills', compare_user_skills, repeat)
+    results['_structure_requirements'] = measure(
+        main, engine, '_structure_requirements', lambda: main._structure_requirements(anforderungen), repeat)
+    results['_calculate_missing_competences'] = measure(
+        main, engine, '_calculate_missing_competences', lambda: main._calculate_missing_competences(active_projects()), repeat)
+    results['check_kompetenz_abdeckung'] = measure(
+        main, engine, 'check_kompetenz_abdeckung (alle aktiven)', check_kompetenz_abdeckung, repeat)
+    return results
+
+
+# Misst vollständige Requests über den Flask-Testclient (ohne umgebenden App-Kontext,
+# damit jeder Request wie im Betrieb eine eigene Session und ein eigenes g bekommt)
+def bench_routes(main, repeat):
+    app = main.app
+    app.config['WTF_CSRF_ENABLED'] = False
+    results = {}
+
+    with app.app_context():
+        engine = main.Engine  # Engine-Klasse: zählt auch die Read-only-Engine der Report-Seiten
+        # Mitarbeiter mit den meisten Projekten für das Dashboard wählen
+        busy_user_id = main.db.session.execute(
+            main.db.select(main.projekt_user.c.user_id)
+            .group_by(main.projekt_user.c.user_id)
+            .order_by(main.db.func.count().desc())
+            .limit(1)
+        ).scalar()
+        busy_user_email = main.db.session.get(main.Users, busy_user_id).email
+        sample_project_id = main.db.session.execute(
+            main.db.select(main.Project.id).where(main._active_project_filter()).order_by(main.Project.id).limit(1)
+        ).scalar()
+
+    def client_for(email):
+        client = app.test_client()
+        response = client.post('/login', data={'email': email, 'password': BENCH_PASSWORD})
+        if response.status_code != 302:
+            raise RuntimeError(f'Login für {email} fehlgeschlagen')
+        return client
+
+    admin_client = client_for('admin@benchmark')
+    user_client = client_for(busy_user_email)
+
+    routes = [
+        ('GET /admin', admin_client, 'get', '/admin', None),
+        ('POST /admin (Kompetenzvergleich)', admin_client, 'post', '/admin', {'project_id': sample_project_id}),
+        ('GET /history', admin_client, 'get', '/history', None),
+        ('GET /dashboard', user_client, 'get', '/dashboard', None),
+        ('GET /competence', user_client, 'get', '/competence', None),
+    ]
+    for name, client, method, url, data in routes:
+        def request_page():
+            response = getattr(client, method)(url, data=data)
+            if response.status_code != 200:
+                raise RuntimeError(f'{name}: HTTP {response.status_code}')
+        results[name] = measure(main, engine, name, request_page, repeat)
+    return results
+
+
+# Aktueller Git-Commit (falls verfügbar) zur Zuordnung der Ergebnisse
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Stellt zwei Ergebnisdateien gegenüber (Median, relative Änderung)
+def compare(old_path, new_path):
+    with open(old_path, encoding='utf-8') as f:
+        old = json.load(f)['results']
+    with open(new_path, encoding='utf-8') as f:
+        new = json.load(f)['results']
+
+    print(f"{'Messung':<40} {'alt (ms)':>10} {'neu (ms)':>10} {'Änderung':>10}")
+    for name in sorted(set(old) | set(new)):
+        if name not in old or name not in new:
+            print(f"{name:<40} {'nur in einer Datei':>32}")
+            continue
+        old_ms = old[name]['median_s'] * 1000
+        new_ms = new[name]['median_s'] * 1000
+        change = (new_ms - old_ms) / old_ms * 100 if old_ms else 0.0
+        print(f"{name:<40} {old_ms:10.1f} {new_ms:10.1f} {change:+9.1f}%")
+
+
+def main_cli():
+    args = parse_args()
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='dss-benchmark-'), 'benchmark.db')
+    os.environ['DSS_DATABASE_URI'] = f'sqlite:///{os.path.abspath(db_path)}'
+    import main  # erst nach dem Setzen der Datenbank-URI importieren
+
+    with main.app.app_context():
+        started = time.perf_counter()
+        dataset = generate_data(main, args)
+        print(f"Testdaten erzeugt in {time.perf_counter() - started:.1f} s: {dataset}")
+
+        results = bench_helpers(main, args.repeat)
+    results.update(bench_routes(main, args.repeat))
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'seed': args.seed,
+        'dataset': dataset,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Ergebnisse gespeichert in {args.output}")
+
+
+if __name__ == '__main__':
+    sys.exit(main_cli())
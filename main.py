@@ -1,24 +1,238 @@
 # Import aller benötigten Flask-Module und Erweiterungen
-from collections import defaultdict  # Für verschachtelte Dictionaries
+import bisect  # Präfixsuche im Kompetenz-Suchindex
+import csv  # Projekt-Massenimport
+import enum  # Kompetenzniveaus als Aufzählung
+import functools  # Decorator für Wiederholungen bei Datenbanksperren
+import heapq  # Langsamste SQL-Statements je Request
+import io  # CSV-Import aus dem Request-Body
+import os  # Konfiguration über Umgebungsvariablen
+import random  # Jitter beim Wiederholen nach Datenbanksperren
+import re  # Suchbegriffe für die Volltextsuche zerlegen
+import sqlite3  # PRAGMA data_version für den Cache-Abgleich zwischen Prozessen
+import sys  # Exit-Code für CLI-Befehle
+import threading  # Sperren für prozessweite Caches
+import time  # Laufzeitmessung für Monitoring
+import unicodedata  # Umlaute/Akzente für die Kompetenzsuche vereinheitlichen
+import uuid  # Kennung der Job-Worker
+from collections import OrderedDict, defaultdict, namedtuple  # Für verschachtelte Dictionaries und Cache-Strukturen
+from concurrent.futures import ThreadPoolExecutor  # Hintergrund-Jobs
+from datetime import datetime, timedelta, timezone  # Zeitstempel der Hintergrund-Jobs
+import click  # Optionen für CLI-Befehle
 from flask import Flask, render_template, flash, request, redirect, url_for  # Basis Flask-Funktionalität
+from flask import Response, abort, g, has_app_context, before_render_template, template_rendered  # Monitoring
+from flask import has_request_context, jsonify  # Nutzer-Cache, JSON-Endpunkte
 from flask_login import (UserMixin, LoginManager, login_user, login_required, 
                          logout_user, current_user)  # User-Session-Management
 from flask_migrate import Migrate  # Datenbank-Migrationen
 from flask_sqlalchemy import SQLAlchemy  # ORM für Datenbankoperationen
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession  # Basis der Session mit Lese-Routing
 from flask_wtf import FlaskForm  # Formular-Handling mit CSRF-Schutz
-from sqlalchemy.orm import joinedload  # Optimierte Datenbankabfragen mit Joins
+from jinja2 import FileSystemBytecodeCache  # Kompilierte Templates über Neustarts hinweg behalten
+from markupsafe import Markup  # Gecachte HTML-Fragmente als sicheres Markup ausgeben
+from sqlalchemy import create_engine  # Read-only-Engine für Report-Seiten
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert  # Upsert der Cache-Generationen (nur SQLite)
+from sqlalchemy.engine import Engine  # Engine-Events für SQL-Instrumentierung
+from sqlalchemy.exc import OperationalError  # "database is locked" erkennen
+from sqlalchemy.orm import joinedload, selectinload, Session  # Optimierte Datenbankabfragen mit Joins
 from werkzeug.security import generate_password_hash, check_password_hash  # Passwort-Hashing für Sicherheit
 from wtforms import StringField, SubmitField, PasswordField, BooleanField  # Formularfelder
 from wtforms.validators import DataRequired  # Formularvalidierung
+import numpy as np  # Matrixoperationen für Kompetenzprofile und Portfolio-Besetzung
 
 app = Flask(__name__)
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///users.db'  # Datenbankpfad
+# Verbindungseinstellungen für SQLite, per DSS_SQLITE_PROFILE wählbar. "production": WAL (Leser und
+# Schreiber blockieren sich nicht), weniger fsync, größerer Seiten-Cache, mmap und Warten auf Sperren.
+SQLITE_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',  # Im WAL-Modus ausreichend sicher, spart ein fsync je Commit
+        'cache_size': -65536,  # 64 MiB je Verbindung (negativ = KiB)
+        'mmap_size': 268435456,  # 256 MiB
+        'busy_timeout': 5000,  # Bis zu 5 s auf eine Sperre warten statt sofort "database is locked"
+        'temp_store': 'MEMORY',
+    },
+    'default': {},  # SQLite-Standard (Rollback-Journal)
+}
+
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DSS_DATABASE_URI', 'sqlite:///users.db')  # Datenbankpfad
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False 
 app.config['SECRET_KEY'] = 'your-secret-key-change-in-production'  # Für Flash-Messages und CSRF!
+app.config['SQL_SLOW_QUERY_SECONDS'] = 0.1  # Ab dieser Dauer wird ein Statement als langsam protokolliert
+app.config['SQL_REPEATED_STATEMENT_THRESHOLD'] = 10  # Ab so vielen Wiederholungen je Request: N+1-Verdacht
+app.config['USER_CACHE_TTL_SECONDS'] = 60  # Maximale Lebensdauer eines gecachten Session-Nutzers
+app.config['USER_CACHE_MAX_SIZE'] = 1024  # Maximale Anzahl gecachter Session-Nutzer (LRU)
+app.config['JOB_RUNNER_IN_PROCESS'] = True  # Jobs im Webprozess abarbeiten (sonst nur über "flask jobs-worker")
+app.config['JOB_WORKERS'] = 2  # Threads für Hintergrund-Jobs
+app.config['JOB_MAX_ATTEMPTS'] = 3  # Versuche je Job, bevor er als fehlgeschlagen gilt
+app.config['JOB_RETRY_BASE_SECONDS'] = 5  # Wartezeit vor dem 2. Versuch, verdoppelt sich je Versuch
+app.config['JOB_POLL_SECONDS'] = 2  # Abfrageintervall, falls kein Wecksignal kommt (z. B. anderer Prozess)
+app.config['JOB_STALE_SECONDS'] = 600  # Laufende Jobs ohne Abschluss gelten danach als abgebrochen
+app.config['ANALYTICS_SNAPSHOT_INTERVAL_HOURS'] = 24  # Mindestabstand der automatischen Analyse-Snapshots
+app.config['CACHE_SYNC_ENABLED'] = True  # Caches zu Beginn jedes Requests mit anderen Worker-Prozessen abgleichen
+app.config['SQLITE_PRAGMAS'] = SQLITE_PROFILES[os.environ.get('DSS_SQLITE_PROFILE', 'production')]  # Auf jeder neuen Verbindung
+app.config['SQLITE_READ_ONLY_REPORTS'] = True  # Report-Seiten (@read_only_db) über eigene Read-only-Verbindungen
+app.config['DB_LOCK_RETRIES'] = 4  # Wiederholungen, wenn trotz busy_timeout "database is locked" auftritt
+app.config['DB_LOCK_RETRY_BASE_SECONDS'] = 0.05  # Wartezeit vor der 1. Wiederholung, verdoppelt sich je Versuch
+app.config['JINJA_BYTECODE_CACHE_DIR'] = os.environ.get(  # Leer = kein Bytecode-Cache
+    'DSS_JINJA_CACHE_DIR', os.path.join(app.instance_path, 'jinja_cache'))
+
+# Kompilierte Templates auf der Platte ablegen, damit ein neu gestarteter Worker sie nicht erneut
+# übersetzen muss (Jinja prüft die Prüfsumme des Quelltexts, geänderte Templates werden neu übersetzt)
+if app.config['JINJA_BYTECODE_CACHE_DIR']:
+    os.makedirs(app.config['JINJA_BYTECODE_CACHE_DIR'], exist_ok=True)
+    app.jinja_env.bytecode_cache = FileSystemBytecodeCache(app.config['JINJA_BYTECODE_CACHE_DIR'])
+
+# Session mit Lese-Routing: in GET-Requests auf Report-Seiten (info['read_only']) gehen SELECTs an die
+# Read-only-Engine; Flushes und alle anderen Statements bleiben auf der normalen Engine. Nach dem ersten
+# Flush liest die Session wieder über die normale Engine, damit sie ihre eigenen Änderungen sieht.
+class RoutingSession(FlaskSQLAlchemySession):
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('read_only') and not self._flushing and getattr(clause, 'is_select', False):
+            read_engine = get_read_engine()
+            if read_engine is not None:
+                return read_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})  
+
+# Die FTS5-Tabelle project_fts (und ihre Schattentabellen) wird außerhalb der Modelle gepflegt
+def _include_in_migrations(name, type_, parent_names):
+    return not (type_ == 'table' and name.startswith('project_fts'))
+
+migrate = Migrate(app, db, include_name=_include_in_migrations)  
+
+# === DATENBANK-PROFIL: PRAGMAS, SPERREN, LESEVERBINDUNGEN ===
+# Jede neue SQLite-Verbindung bekommt die Pragmas aus SQLITE_PRAGMAS. Schreibende Transaktionen
+# (Hilfsfunktionen, die schreiben und committen) werden mit exponentiellem Backoff wiederholt, falls
+# eine Sperre länger als busy_timeout dauert; die Routen selbst laufen nie doppelt. Report-Seiten
+# lesen über eine eigene Engine mit Read-only-Verbindungen (mode=ro) und halten so nie Schreibsperren.
+
+_read_engine = None  # (URL der Haupt-Engine, Read-only-Engine)
+_read_engine_lock = threading.Lock()
+
+
+@db.event.listens_for(Engine, 'connect')
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in app.config['SQLITE_PRAGMAS'].items():
+            try:
+                cursor.execute(f'PRAGMA {name}={value}')
+            except sqlite3.OperationalError:
+                pass  # z. B. journal_mode auf einer Read-only-Verbindung
+    finally:
+        cursor.close()
+
+
+# Read-only-Engine auf dieselbe Datenbankdatei (None bei In-Memory- oder Nicht-SQLite-Datenbanken)
+def get_read_engine():
+    global _read_engine
+    if not app.config['SQLITE_READ_ONLY_REPORTS']:
+        return None
+    url = db.engine.url
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+
+    current = _read_engine
+    if current is not None and current[0] == url:
+        return current[1]
+    with _read_engine_lock:
+        if _read_engine is None or _read_engine[0] != url:
+            _read_engine = (url, create_engine(f'sqlite:///file:{url.database}?mode=ro&uri=true'))
+        return _read_engine[1]
+
+
+# Markiert eine Route, deren GET-Abfragen über die Read-only-Engine laufen; POSTs derselben Route
+# (Formulare auf Admin- und Verlaufsseite) nutzen wie alle anderen Routen die normale Engine
+def read_only_db(view):
+    view.read_only_db = True
+    return view
+
+
+@app.before_request
+def _route_read_only_requests():
+    view = app.view_functions.get(request.endpoint)
+    if request.method in ('GET', 'HEAD') and getattr(view, 'read_only_db', False):
+        db.session.info['read_only'] = True
+
+
+# Schreibt ein lesender Request doch (z. B. Cache-Einträge, über den Nutzer-Cache angehängte Objekte),
+# laufen ab dem Flush auch die SELECTs wieder über die normale Engine
+@db.event.listens_for(RoutingSession, 'after_flush')
+def _stop_read_only_routing(session, flush_context):
+    session.info.pop('read_only', None)
+
+
+@app.teardown_request
+def _end_read_only_routing(exc):
+    db.session.info.pop('read_only', None)
+
+
+def _is_db_locked(exc):
+    code = getattr(exc.orig, 'sqlite_errorcode', None)
+    return code in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED) or 'locked' in str(exc.orig)
+
+
+# Wiederholt eine Transaktion, wenn SQLite "database is locked" meldet: Session zurückrollen, mit
+# Backoff (plus Jitter) warten und von vorn beginnen. Nur für Funktionen, die ihre Eingaben als
+# einfache Werte (IDs, gelesene Formulardaten) bekommen, alles selbst schreiben und am Ende committen.
+def retry_on_db_lock(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        retries = app.config['DB_LOCK_RETRIES']
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except OperationalError as exc:
+                if attempt == retries or not _is_db_locked(exc):
+                    raise
+                db.session.rollback()
+                delay = app.config['DB_LOCK_RETRY_BASE_SECONDS'] * 2 ** attempt * (0.5 + random.random())
+                METRICS['db_lock_retries'].inc(request.endpoint if has_request_context() else func.__name__)
+                app.logger.warning("Datenbank gesperrt in %s, Versuch %s/%s in %.2f s",
+                                   func.__name__, attempt + 1, retries, delay)
+                time.sleep(delay)
+    return wrapper
+
+
+# Kompetenzniveaus als kleine Ordinalzahl (0 = Kompetenz nicht vorhanden).
+# Wird für alle Vergleiche und Aggregationen verwendet, auch direkt in SQL (MAX, >=).
+class CompetenceLevel(enum.IntEnum):
+    KENNER = 1
+    KOENNER = 2
+    EXPERTE = 3
+
+    # Anzeigename, wie er in Formularen und Templates verwendet wird
+    @property
+    def label(self):
+        return ("Kenner", "Könner", "Experte")[self - 1]
+
+    def __str__(self):
+        return self.label
+
+    # Wandelt einen Anzeigenamen ("Kenner", "Könner", "Experte") in das Level um (sonst None)
+    @classmethod
+    def from_label(cls, label):
+        for level in cls:
+            if level.label == label:
+                return level
+        return None
 
-db = SQLAlchemy(app)  
-migrate = Migrate(app, db)  
+# Spaltentyp: speichert CompetenceLevel als SmallInteger und liefert beim Lesen wieder CompetenceLevel
+class CompetenceLevelType(db.TypeDecorator):
+    impl = db.SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else int(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else CompetenceLevel(value)
 
 # Nutzer-Tabelle mit Login
 class Users(db.Model, UserMixin):
@@ -78,17 +292,39 @@ class KnowledgeSkills(db.Model):
 
 # Nutzerkompetenzen mit Level-Tabelle  
 class UsersCompetence(db.Model):
+    # Pro Nutzer höchstens ein Level je Wissen und Fähigkeit
+    __table_args__ = (
+        db.UniqueConstraint('users_id', 'knowledge_skill_id', name='uq_users_competence_user_skill'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)  
     users_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False) 
     knowledge_skill_id = db.Column(db.Integer, db.ForeignKey('knowledge_skills.id'), nullable=False)  
-    competence_level = db.Column(db.String(100), nullable=False)  # Kompetenzniveau ( "Kenner", "Könner", "Experte")
+    competence_level = db.Column(CompetenceLevelType, nullable=False)  # Kompetenzniveau (CompetenceLevel)
+
+# Append-only Protokoll der Leveländerungen: wird beim Speichern im selben Bulk wie users_competence
+# geschrieben und nie verändert (siehe Abschnitt KOMPETENZHISTORIE)
+class CompetenceChange(db.Model):
+    __tablename__ = 'competence_change'
+    __table_args__ = (
+        # Stand eines Nutzers zu einem Zeitpunkt, ohne das ganze Protokoll zu lesen
+        db.Index('ix_competence_change_user_skill_time', 'users_id', 'knowledge_skill_id', 'changed_at'),
+        db.Index('ix_competence_change_changed_at', 'changed_at'),  # Auswertungen über Zeiträume
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    users_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    knowledge_skill_id = db.Column(db.Integer, db.ForeignKey('knowledge_skills.id'), nullable=False)
+    old_level = db.Column(CompetenceLevelType)  # NULL = vorher nicht vorhanden
+    new_level = db.Column(CompetenceLevelType)  # NULL = entfernt
+    changed_at = db.Column(db.DateTime, nullable=False)  # UTC
 
 
 # Many-to-Many Beziehung zwischen Projekten und Nutzern
 projekt_user = db.Table('projekt_user',
     db.Column('project_id', db.Integer, db.ForeignKey('project.id'), primary_key=True),
-    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id'), primary_key=True),
+    db.Index('ix_projekt_user_user_id', 'user_id')  # Projekte eines Nutzers
 )
 
 # Projekt-Tabelle 
@@ -96,8 +332,9 @@ class Project(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)  
     project_name = db.Column(db.String(100), nullable=False)  
-    status = db.Column(db.String(100))  # Projektstatus ( "Aktiv", "Abgeschlossen")
+    status = db.Column(db.String(100), index=True)  # Projektstatus ( "Aktiv", "Abgeschlossen")
     notiz = db.Column(db.Text)
+    closed_at = db.Column(db.DateTime)  # Zeitpunkt des Abschlusses (UTC), für Auswertungen "zum Abschluss"
     
   
     requirements = db.relationship('ProjectRequirement', backref='project', lazy=True)  # 1:n zu Anforderungen
@@ -107,12 +344,77 @@ class Project(db.Model):
 class ProjectRequirement(db.Model):
     
     id = db.Column(db.Integer, primary_key=True)  
-    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False)  
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), nullable=False, index=True)  
     knowledge_skill_id = db.Column(db.Integer, db.ForeignKey('knowledge_skills.id'), nullable=False) 
-    competence_level = db.Column(db.String(20))  
+    competence_level = db.Column(CompetenceLevelType)  # Soll-Niveau (CompetenceLevel)
 
     knowledge_skill = db.relationship('KnowledgeSkills')
 
+# Materialisierte Kompetenzabdeckung aktiver Projekte: je Projekt und gefordertem Wissen/Fähigkeit
+# das Soll-Level und das beste Level unter den zugewiesenen Nutzern (wird inkrementell gepflegt)
+class ProjectCoverage(db.Model):
+    __tablename__ = 'project_coverage'
+
+    project_id = db.Column(db.Integer, db.ForeignKey('project.id'), primary_key=True)
+    knowledge_skill_id = db.Column(db.Integer, db.ForeignKey('knowledge_skills.id'), primary_key=True)
+    required_level = db.Column(CompetenceLevelType)
+    best_level = db.Column(CompetenceLevelType)  # NULL = kein zugewiesener Nutzer hat die Kompetenz
+
+# Persistente Warteschlange für Hintergrund-Jobs (siehe Abschnitt HINTERGRUND-JOBS)
+class Job(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_status_run_after', 'status', 'run_after'),  # Nächsten fälligen Job finden
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # Name des Handlers
+    payload = db.Column(db.JSON, nullable=False, default=dict)  # Schlüsselwortargumente für den Handler
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False)  # Frühester Start (UTC), verschiebt sich bei Wiederholungen
+    created_at = db.Column(db.DateTime, nullable=False)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    worker = db.Column(db.String(50))  # Kennung des Workers, der den Job zuletzt übernommen hat
+    last_error = db.Column(db.Text)
+    result = db.Column(db.JSON)
+
+# Periodischer Snapshot der Kompetenzlücken-Analyse mit Kennzahlen für Trendkurven
+class AnalyticsSnapshot(db.Model):
+    __tablename__ = 'analytics_snapshot'
+
+    id = db.Column(db.Integer, primary_key=True)
+    taken_at = db.Column(db.DateTime, nullable=False, index=True)  # UTC
+    active_projects = db.Column(db.Integer, nullable=False)
+    requirements = db.Column(db.Integer, nullable=False)  # Anforderungen aktiver Projekte
+    undercovered = db.Column(db.Integer, nullable=False)  # davon nicht im Soll-Level abgedeckt
+    single_holder_skills = db.Column(db.Integer, nullable=False)  # Geforderte Skills mit genau einer qualifizierten Person
+    unheld_skills = db.Column(db.Integer, nullable=False)  # Geforderte Skills ohne qualifizierte Person
+
+    skills = db.relationship('SkillGapSnapshot', backref='snapshot', lazy=True, cascade='all, delete-orphan')
+
+# Kompakte Kennzahlen je Wissen/Fähigkeit in einem Snapshot (nur geforderte oder vorhandene Skills)
+class SkillGapSnapshot(db.Model):
+    __tablename__ = 'skill_gap_snapshot'
+
+    snapshot_id = db.Column(db.Integer, db.ForeignKey('analytics_snapshot.id'), primary_key=True)
+    knowledge_skill_id = db.Column(db.Integer, primary_key=True, index=True)  # Ohne FK: Verlauf bleibt beim Löschen erhalten
+    required = db.Column(db.Integer, nullable=False)  # Aktive Projekte, die den Skill fordern
+    undercovered = db.Column(db.Integer, nullable=False)  # davon nicht im Soll-Level abgedeckt
+    kenner = db.Column(db.Integer, nullable=False)  # Personen je Level (ohne Admins)
+    koenner = db.Column(db.Integer, nullable=False)
+    experte = db.Column(db.Integer, nullable=False)
+    qualified = db.Column(db.Integer)  # Personen mit mindestens dem höchsten geforderten Level (NULL = nicht gefordert)
+
+# Generationszähler je Cache-Bereich; wird bei jeder Änderung im selben Commit erhöht, damit
+# andere Worker-Prozesse ihre Caches verwerfen (siehe Abschnitt CACHE-ABGLEICH)
+class CacheGeneration(db.Model):
+    __tablename__ = 'cache_generation'
+
+    namespace = db.Column(db.String(50), primary_key=True)  # "taxonomie", "kompetenzen", "zuordnungen"
+    generation = db.Column(db.Integer, nullable=False, default=0)
+
     
 # === FORMULAR-DEFINITIONEN ===
 # Formular zum Hinzufügen neuer Nutzer
@@ -138,6 +440,228 @@ class LoginForm(FlaskForm):
 class AdminCompetenceForm(FlaskForm):
     pass  # Felder werden dynamisch im Template erstellt
 
+# === TAXONOMIE-CACHE ===
+# Der Baum CompetenceGroup → Competence → KnowledgeSkills ändert sich selten und wird
+# deshalb einmal geladen und prozessweit gehalten, bis der Generationszähler sich ändert.
+
+TaxonomyGroup = namedtuple('TaxonomyGroup', ['id', 'name', 'competences'])
+TaxonomyCompetence = namedtuple('TaxonomyCompetence', ['id', 'name', 'competence_group_id', 'knowledge_skills'])
+TaxonomySkill = namedtuple('TaxonomySkill', ['id', 'name', 'competence_id'])
+
+TAXONOMY_MODELS = (CompetenceGroup, Competence, KnowledgeSkills)
+
+_taxonomy_lock = threading.Lock()
+_taxonomy_generation = 0  # Wird nach jedem Commit mit Änderungen an der Taxonomie erhöht
+_taxonomy_cache = None
+
+# Unveränderlicher Schnappschuss der Taxonomie mit den häufig benötigten Mappings
+class Taxonomy:
+
+    def __init__(self, generation, groups):
+        self.generation = generation
+        self.groups = groups
+        self.groups_by_id = {group.id: group for group in groups}  # {competence_group_id: TaxonomyGroup}
+        self.competences = {}  # {competence_id: TaxonomyCompetence}
+        self.skills = {}  # {knowledge_skill_id: TaxonomySkill}
+        self.skill_names = {}  # {knowledge_skill_id: Name}
+        self.skill_to_group = {}  # {knowledge_skill_id: Gruppenname}
+        self._search_index = None  # Wird bei der ersten Suche aufgebaut
+
+        for group in groups:
+            for competence in group.competences:
+                self.competences[competence.id] = competence
+                for skill in competence.knowledge_skills:
+                    self.skills[skill.id] = skill
+                    self.skill_names[skill.id] = skill.name
+                    self.skill_to_group[skill.id] = group.name
+
+    # Lädt den Baum mit drei schlanken Spaltenabfragen ohne ORM-Objekte
+    @classmethod
+    def load(cls, generation):
+        skills_by_competence = defaultdict(list)
+        for row in db.session.execute(
+            db.select(KnowledgeSkills.id, KnowledgeSkills.name, KnowledgeSkills.competence_id)
+            .order_by(KnowledgeSkills.id)
+        ):
+            skills_by_competence[row.competence_id].append(TaxonomySkill(*row))
+
+        competences_by_group = defaultdict(list)
+        for row in db.session.execute(
+            db.select(Competence.id, Competence.name, Competence.competence_group_id)
+            .order_by(Competence.id)
+        ):
+            competences_by_group[row.competence_group_id].append(
+                TaxonomyCompetence(*row, tuple(skills_by_competence[row.id]))
+            )
+
+        groups = tuple(
+            TaxonomyGroup(row.id, row.name, tuple(competences_by_group[row.id]))
+            for row in db.session.execute(
+                db.select(CompetenceGroup.id, CompetenceGroup.name).order_by(CompetenceGroup.id)
+            )
+        )
+        return cls(generation, groups)
+
+    # Suchindex über die Namen (gehört zum Schnappschuss und wird mit ihm neu aufgebaut)
+    @property
+    def search_index(self):
+        if self._search_index is None:
+            self._search_index = SkillSearchIndex(self)
+        return self._search_index
+
+
+# Liefert die aktuelle Taxonomie (lädt nur neu, wenn sich die Generation geändert hat)
+def get_taxonomy():
+    global _taxonomy_cache
+    taxonomy = _taxonomy_cache
+    if taxonomy is not None and taxonomy.generation == _taxonomy_generation:
+        return taxonomy
+
+    with _taxonomy_lock:
+        generation = _taxonomy_generation
+        if _taxonomy_cache is None or _taxonomy_cache.generation != generation:
+            _taxonomy_cache = Taxonomy.load(generation)
+        return _taxonomy_cache
+
+
+# Erhöht den Generationszähler und verwirft damit den Taxonomie-Cache
+def invalidate_taxonomy():
+    global _taxonomy_generation
+    with _taxonomy_lock:
+        _taxonomy_generation += 1
+
+
+# Schreibzugriffe auf die Taxonomie-Tabellen in der Session vormerken ...
+@db.event.listens_for(Session, 'after_flush')
+def _track_taxonomy_flush(session, flush_context):
+    changed = session.new | session.dirty | session.deleted
+    if any(isinstance(obj, TAXONOMY_MODELS) for obj in changed):
+        session.info['taxonomy_changed'] = True
+
+
+@db.event.listens_for(Session, 'do_orm_execute')
+def _track_taxonomy_bulk(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and issubclass(mapper.class_, TAXONOMY_MODELS):
+            orm_execute_state.session.info['taxonomy_changed'] = True
+
+
+# ... und erst nach dem Commit die Generation erhöhen, damit kein alter Stand neu gecacht wird
+@db.event.listens_for(Session, 'after_commit')
+def _bump_taxonomy_generation(session):
+    if session.info.pop('taxonomy_changed', False):
+        invalidate_taxonomy()
+
+
+@db.event.listens_for(Session, 'after_rollback')
+def _discard_taxonomy_changes(session):
+    session.info.pop('taxonomy_changed', None)
+
+# === KOMPETENZSUCHE ===
+# Präfix- und Teilwortsuche über die Namen der Wissen/Fähigkeiten und Kompetenzen. Der Index
+# hängt am Taxonomie-Schnappschuss und wird damit automatisch neu aufgebaut, sobald sich die
+# Taxonomie ändert. Kurze Suchbegriffe (< 3 Zeichen) laufen über eine sortierte Wortliste
+# (Wortanfänge per Binärsuche), längere über einen Trigramm-Index mit anschließender Prüfung.
+
+SKILL_SEARCH_LIMIT = 20
+SKILL_SEARCH_MAX_LIMIT = 100
+
+SkillSearchEntry = namedtuple('SkillSearchEntry', ['kind', 'id', 'name', 'folded'])
+
+
+# Kleinschreibung ohne Akzente/Umlautpunkte und mit einfachen Leerzeichen ("Ähnlichkeit" → "ahnlichkeit")
+def _fold_search_text(text):
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    stripped = ''.join(c for c in decomposed if not unicodedata.combining(c))
+    return ' '.join(stripped.casefold().split())
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SkillSearchIndex:
+
+    def __init__(self, taxonomy):
+        self.taxonomy = taxonomy
+        self.entries = [
+            SkillSearchEntry('skill', skill.id, skill.name, _fold_search_text(skill.name))
+            for skill in taxonomy.skills.values()
+        ] + [
+            SkillSearchEntry('competence', competence.id, competence.name, _fold_search_text(competence.name))
+            for competence in taxonomy.competences.values()
+        ]
+
+        words = set()
+        self.trigrams = defaultdict(set)  # {Trigramm: {Eintragsindex}}
+        for index, entry in enumerate(self.entries):
+            words.add((entry.folded, index))  # Ganzer Name, damit auch "C#" o. ä. als Präfix gefunden wird
+            for word in re.findall(r'\w+', entry.folded):
+                words.add((word, index))
+            for trigram in _trigrams(entry.folded):
+                self.trigrams[trigram].add(index)
+        self.words = sorted(words)  # [(Wort bzw. Name, Eintragsindex)] für die Präfixsuche
+
+    # Einträge, bei denen ein Wort mit dem Präfix beginnt
+    def _prefix_matches(self, prefix):
+        matches = set()
+        position = bisect.bisect_left(self.words, (prefix,))
+        while position < len(self.words) and self.words[position][0].startswith(prefix):
+            matches.add(self.words[position][1])
+            position += 1
+        return matches
+
+    # Einträge, die den Suchbegriff als Teilzeichenkette enthalten
+    def _substring_matches(self, query):
+        postings = sorted((self.trigrams.get(t, ()) for t in _trigrams(query)), key=len)
+        if not postings or not postings[0]:
+            return set()
+        candidates = set(postings[0]).intersection(*postings[1:])
+        return {index for index in candidates if query in self.entries[index].folded}
+
+    # Rang: exakter Name, Namensanfang, Wortanfang, sonst Teilwort; bei Gleichstand kürzere Namen zuerst
+    def _rank(self, entry, query):
+        if entry.folded == query:
+            match = 0
+        elif entry.folded.startswith(query):
+            match = 1
+        elif any(word.startswith(query) for word in re.findall(r'\w+', entry.folded)):
+            match = 2
+        else:
+            match = 3
+        return (match, entry.kind != 'skill', len(entry.folded), entry.folded, entry.id)
+
+    def search(self, query, limit=SKILL_SEARCH_LIMIT):
+        query = _fold_search_text(query)
+        if not query:
+            return []
+
+        if len(query) < 3:
+            matches = self._prefix_matches(query)
+        else:
+            matches = self._substring_matches(query)
+
+        ranked = heapq.nsmallest(limit, (self.entries[i] for i in matches), key=lambda e: self._rank(e, query))
+        return [self._describe(entry) for entry in ranked]
+
+    def _describe(self, entry):
+        taxonomy = self.taxonomy
+        if entry.kind == 'skill':
+            competence = taxonomy.competences[taxonomy.skills[entry.id].competence_id]
+        else:
+            competence = taxonomy.competences[entry.id]
+        group = taxonomy.groups_by_id[competence.competence_group_id]
+        return {
+            "type": entry.kind,
+            "id": entry.id,
+            "name": entry.name,
+            "competence_id": competence.id,
+            "competence": competence.name,
+            "group_id": group.id,
+            "group": group.name,
+        }
+
 # === FLASK-LOGIN KONFIGURATION ===
 
 login_manager = LoginManager()
@@ -147,8 +671,541 @@ login_manager.login_view = 'login'  # Weiterleitung bei nicht autorisierten Zugr
 
 @login_manager.user_loader
 def load_user(user_id):
-    return Users.query.get(int(user_id)) 
- 
+    user_id = int(user_id)
+    view = app.view_functions.get(request.endpoint) if has_request_context() else None
+    relationships = getattr(view, 'eager_user_relationships', frozenset())
+
+    entry = _get_cached_user(user_id, relationships)
+    if entry is None:
+        entry = _load_cached_user(user_id, relationships)
+        if entry is None:
+            return None
+    # Losgelöste Kopie ohne SQL in die Request-Session übernehmen
+    return db.session.merge(entry.user, load=False)
+
+# === NUTZER-CACHE ===
+# Flask-Login lädt den Session-Nutzer bei jedem Request. Er wird deshalb samt den Beziehungen,
+# die die aufgerufene Seite braucht, als losgelöstes Objekt prozessweit gehalten (TTL + LRU).
+# Änderungen an der Nutzerzeile, seinen Kompetenzen oder Projektzuweisungen verwerfen den
+# Eintrag nach dem Commit; andere Prozesse gleichen sich über cache_generation ab (CACHE-ABGLEICH).
+
+UserCacheEntry = namedtuple('UserCacheEntry', ['user', 'relationships', 'project_ids', 'expires'])
+DashboardCacheEntry = namedtuple('DashboardCacheEntry', ['taxonomy_generation', 'kompetenzstruktur',
+                                                         'projects', 'project_ids', 'expires'])
+
+# Tabellen, deren Änderungen Nutzer bzw. Projekte betreffen: [(Vormerkung, Spalte mit der ID)]
+USER_CACHE_TABLES = {
+    'users': [('changed_users', 'id')],
+    'users_competence': [('changed_users', 'users_id')],
+    'projekt_user': [('changed_users', 'user_id'), ('changed_projects', 'project_id')],
+    'project': [('changed_projects', 'id')],
+    'project_requirement': [('changed_projects', 'project_id')],
+}
+
+_user_cache_lock = threading.Lock()
+_user_cache = OrderedDict()  # {user_id: UserCacheEntry}, zuletzt benutzte Einträge am Ende
+_dashboard_cache = OrderedDict()  # {user_id: DashboardCacheEntry}, aufbereitete Dashboard-Strukturen
+_user_cache_generation = 0  # Wird bei jeder Invalidierung erhöht, damit kein alter Stand gespeichert wird
+
+
+# Markiert eine Route: diese Beziehungen des Session-Nutzers werden mitgeladen (z. B. 'competences', 'projects')
+def eager_user(*relationships):
+    def decorator(view):
+        view.eager_user_relationships = frozenset(relationships)
+        return view
+    return decorator
+
+
+# Liefert einen gültigen Cache-Eintrag, der alle gewünschten Beziehungen enthält
+def _get_cached_user(user_id, relationships):
+    with _user_cache_lock:
+        entry = _user_cache.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic():
+            del _user_cache[user_id]
+            return None
+        if not relationships <= entry.relationships:
+            return None
+        _user_cache.move_to_end(user_id)
+        return entry
+
+
+# Lädt den Nutzer in einer eigenen Session (eine Abfrage je Beziehung) und legt ihn losgelöst im Cache ab.
+# Bereits gecachte Beziehungen werden wieder mitgeladen, damit Seiten sich den Eintrag nicht gegenseitig verdrängen.
+def _load_cached_user(user_id, relationships):
+    with _user_cache_lock:
+        generation = _user_cache_generation
+        previous = _user_cache.get(user_id)
+    if previous is not None:
+        relationships = relationships | previous.relationships
+
+    with Session(get_read_engine() or db.engine, expire_on_commit=False) as session:
+        user = session.execute(
+            db.select(Users)
+            .where(Users.id == user_id)
+            .options(*(selectinload(getattr(Users, name)) for name in sorted(relationships)))
+        ).scalar_one_or_none()
+    if user is None:
+        return None
+
+    project_ids = frozenset(p.id for p in user.projects) if 'projects' in relationships else frozenset()
+    entry = UserCacheEntry(user, relationships, project_ids,
+                           time.monotonic() + app.config['USER_CACHE_TTL_SECONDS'])
+
+    with _user_cache_lock:
+        if generation == _user_cache_generation:
+            _user_cache[user_id] = entry
+            _user_cache.move_to_end(user_id)
+            while len(_user_cache) > app.config['USER_CACHE_MAX_SIZE']:
+                _user_cache.popitem(last=False)
+    return entry
+
+
+# Liefert die gecachten Dashboard-Strukturen eines Nutzers (nur zur aktuellen Taxonomie-Generation)
+def get_cached_dashboard(user_id, taxonomy_generation):
+    with _user_cache_lock:
+        entry = _dashboard_cache.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires <= time.monotonic() or entry.taxonomy_generation != taxonomy_generation:
+            del _dashboard_cache[user_id]
+            return None
+        _dashboard_cache.move_to_end(user_id)
+        return entry
+
+
+# Legt die Dashboard-Strukturen ab, sofern seit generation keine Invalidierung stattgefunden hat
+def store_cached_dashboard(user_id, generation, entry):
+    with _user_cache_lock:
+        if generation == _user_cache_generation:
+            _dashboard_cache[user_id] = entry
+            _dashboard_cache.move_to_end(user_id)
+            while len(_dashboard_cache) > app.config['USER_CACHE_MAX_SIZE']:
+                _dashboard_cache.popitem(last=False)
+
+
+# Aktuelle Invalidierungs-Generation (vor dem Laden abfragen und beim Speichern wieder übergeben)
+def user_cache_generation():
+    with _user_cache_lock:
+        return _user_cache_generation
+
+
+# Verwirft Cache-Einträge: bestimmte Nutzer, alle Mitglieder bestimmter Projekte oder (ohne Argumente) alles
+def invalidate_user_cache(user_ids=None, project_ids=()):
+    global _user_cache_generation
+    with _user_cache_lock:
+        _user_cache_generation += 1
+        for cache in (_user_cache, _dashboard_cache):
+            if user_ids is None and not project_ids:
+                cache.clear()
+                continue
+            for user_id in user_ids or ():
+                cache.pop(user_id, None)
+            if project_ids:
+                project_ids = set(project_ids)
+                for user_id in [uid for uid, entry in cache.items() if entry.project_ids & project_ids]:
+                    del cache[user_id]
+
+
+# Betroffene Nutzer und Projekte in der Session vormerken ...
+@db.event.listens_for(Session, 'after_flush')
+def _track_user_flush(session, flush_context):
+    user_ids = set()
+    project_ids = set()
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, Users):
+            user_ids.add(obj.id)
+        elif isinstance(obj, UsersCompetence):
+            user_ids.add(obj.users_id)
+        elif isinstance(obj, Project):
+            project_ids.add(obj.id)
+            # Zuweisungen über project.users ändern die Projektliste der betroffenen Nutzer
+            history = db.inspect(obj).attrs.users.history
+            user_ids.update(user.id for user in [*(history.added or ()), *(history.deleted or ())])
+        elif isinstance(obj, ProjectRequirement):
+            project_ids.add(obj.project_id)
+    if user_ids:
+        session.info.setdefault('changed_users', set()).update(user_ids)
+    if project_ids:
+        session.info.setdefault('changed_projects', set()).update(project_ids)
+
+
+# (Bulk-Statements: Nutzer-IDs aus den Parametern, sonst wird der ganze Cache verworfen)
+@db.event.listens_for(Session, 'do_orm_execute')
+def _track_user_bulk(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    statement = orm_execute_state.statement
+    table_name = getattr(getattr(statement, 'table', None), 'name', None)
+    if table_name not in USER_CACHE_TABLES:
+        return
+
+    # Der Aufrufer hat die betroffenen Nutzer bereits mit mark_users_changed() vorgemerkt
+    if statement.get_execution_options().get('users_marked'):
+        return
+
+    session_info = orm_execute_state.session.info
+    params = orm_execute_state.parameters
+    rows = params if isinstance(params, list) else [params or {}]
+    # DELETE/UPDATE mit WHERE betrifft unbekannte Zeilen, außer die Zeilen werden ausschließlich
+    # über die Parameter ausgewählt (Execution-Option rows_from_params, siehe update_project_assignments)
+    filtered = (getattr(statement, 'whereclause', None) is not None
+                and not statement.get_execution_options().get('rows_from_params'))
+    for key, column in USER_CACHE_TABLES[table_name]:
+        if column == 'id' and orm_execute_state.is_insert:
+            continue  # neu angelegte Zeilen können noch nicht im Cache liegen
+        ids = {row.get(column) for row in rows}
+        if filtered or None in ids:
+            session_info['user_cache_reset'] = True
+            return
+        session_info.setdefault(key, set()).update(ids)
+
+
+# Nutzer ausdrücklich vormerken, etwa bei Bulk-Updates über den Primärschlüssel, deren Parameter
+# die Nutzer-ID nicht enthalten (Statement dann mit execution_options(users_marked=True) ausführen)
+def mark_users_changed(user_ids):
+    db.session.info.setdefault('changed_users', set()).update(user_ids)
+
+
+# ... und erst nach dem Commit verwerfen
+@db.event.listens_for(Session, 'after_commit')
+def _invalidate_changed_users(session):
+    user_ids = session.info.pop('changed_users', None)
+    project_ids = session.info.pop('changed_projects', None)
+    if session.info.pop('user_cache_reset', False):
+        invalidate_user_cache()
+        _profile_index.mark_stale()
+    elif user_ids or project_ids:
+        invalidate_user_cache(user_ids or (), project_ids or ())
+        if user_ids:
+            _profile_index.mark_stale(user_ids)
+
+
+@db.event.listens_for(Session, 'after_rollback')
+def _discard_user_changes(session):
+    for key in ('changed_users', 'changed_projects', 'user_cache_reset'):
+        session.info.pop(key, None)
+
+# === CACHE-ABGLEICH ZWISCHEN PROZESSEN ===
+# Taxonomie-, Nutzer- und Profil-Caches liegen pro Prozess. Damit mehrere Worker auf derselben
+# users.db konsistent bleiben, erhöht jeder Commit mit Änderungen den Zähler der betroffenen Bereiche
+# in cache_generation (in derselben Transaktion). Zu Beginn jedes Requests prüft ein Worker per
+# PRAGMA data_version auf einer eigenen Verbindung, ob überhaupt jemand geschrieben hat, liest nur
+# dann die Zähler und verwirft genau die Bereiche, deren Zähler sich geändert haben. Eigene Commits
+# wurden bereits gezielt invalidiert (after_commit) und lösen keinen zweiten Abwurf aus.
+
+CACHE_NAMESPACE_TABLES = {  # Tabelle → Cache-Bereich
+    **{model.__table__.name: 'taxonomie' for model in TAXONOMY_MODELS},
+    'users': 'kompetenzen',
+    'users_competence': 'kompetenzen',
+    'projekt_user': 'zuordnungen',
+    'project': 'zuordnungen',
+    'project_requirement': 'zuordnungen',
+}
+
+
+# Verwirft die Caches eines Bereichs nach Änderungen aus einem anderen Prozess
+def _drop_cache_namespace(namespace):
+    if namespace == 'taxonomie':
+        invalidate_taxonomy()  # Fragment-Cache, Suchindex und Dashboard-Cache hängen an der Generation
+    elif namespace == 'kompetenzen':
+        invalidate_user_cache()
+        _profile_index.mark_stale()
+    elif namespace == 'zuordnungen':
+        invalidate_user_cache()
+
+
+class CacheSync:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._known = None  # {namespace: generation}, None = noch nie abgeglichen
+        self._data_version = None
+        self._connection = None
+        self._connection_pid = None
+
+    # PRAGMA data_version einer eigenen Verbindung: ändert sich, sobald eine andere Verbindung committet.
+    # None, wenn die Datenbank keine Datei ist (dann wird immer die Tabelle gelesen).
+    def _poll_data_version(self):
+        path = db.engine.url.database
+        if db.engine.url.get_backend_name() != 'sqlite' or not path or path == ':memory:':
+            return None
+        try:
+            # Nach einem Fork gehört die Verbindung dem Elternprozess
+            if self._connection is None or self._connection_pid != os.getpid():
+                self._connection = sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+                self._connection_pid = os.getpid()
+            return self._connection.execute('PRAGMA data_version').fetchone()[0]
+        except sqlite3.Error:
+            self._connection = None
+            return None
+
+    # Gleicht die Caches mit der Datenbank ab; gibt die verworfenen Bereiche zurück
+    def check(self):
+        with self._lock:
+            data_version = self._poll_data_version()
+            if data_version is not None and data_version == self._data_version:
+                return []
+            generations = dict(db.session.execute(
+                db.select(CacheGeneration.namespace, CacheGeneration.generation)
+            ).all())
+            self._data_version = data_version
+            if self._known is None:
+                self._known = generations
+                return []
+            changed = sorted(ns for ns, generation in generations.items() if self._known.get(ns) != generation)
+            self._known = generations
+        for namespace in changed:
+            _drop_cache_namespace(namespace)
+        return changed
+
+    # Eigenen Commit verbuchen: nur übernehmen, wenn kein anderer Prozess dazwischen gezählt hat
+    def record_own(self, generations):
+        with self._lock:
+            if self._known is None:
+                return
+            for namespace, generation in generations.items():
+                if self._known.get(namespace, 0) == generation - 1:
+                    self._known[namespace] = generation
+
+
+_cache_sync = CacheSync()
+
+
+@app.before_request
+def _sync_caches():
+    if app.config['CACHE_SYNC_ENABLED'] and request.endpoint != 'static':
+        _cache_sync.check()
+
+
+# Geänderte Bereiche in der Session vormerken (ORM-Objekte und Bulk-Statements) ...
+@db.event.listens_for(Session, 'after_flush')
+def _track_cache_namespaces_flush(session, flush_context):
+    namespaces = {
+        CACHE_NAMESPACE_TABLES.get(obj.__table__.name)
+        for obj in session.new | session.dirty | session.deleted
+    } - {None}
+    if namespaces:
+        session.info.setdefault('cache_namespaces', set()).update(namespaces)
+
+
+@db.event.listens_for(Session, 'do_orm_execute')
+def _track_cache_namespaces_bulk(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table_name = getattr(getattr(orm_execute_state.statement, 'table', None), 'name', None)
+        namespace = CACHE_NAMESPACE_TABLES.get(table_name)
+        if namespace:
+            orm_execute_state.session.info.setdefault('cache_namespaces', set()).add(namespace)
+
+
+# ... vor dem Commit die Zähler in derselben Transaktion erhöhen ...
+@db.event.listens_for(Session, 'before_commit')
+def _bump_cache_generations(session):
+    if not app.config['CACHE_SYNC_ENABLED']:
+        return
+    session.flush()
+    namespaces = session.info.pop('cache_namespaces', None)
+    if not namespaces:
+        return
+
+    bumped = {}
+    upsert = session.get_bind().dialect.name == 'sqlite'
+    for namespace in sorted(namespaces):
+        if upsert:
+            statement = sqlite_insert(CacheGeneration).values(namespace=namespace, generation=1)
+            statement = statement.on_conflict_do_update(
+                index_elements=[CacheGeneration.namespace],
+                set_={"generation": CacheGeneration.generation + 1},
+            ).returning(CacheGeneration.generation)
+            bumped[namespace] = session.execute(statement).scalar_one()
+            continue
+
+        # Andere Datenbanken: erhöhen, fehlende Zeile anlegen, neuen Stand lesen
+        updated = session.execute(
+            db.update(CacheGeneration)
+            .where(CacheGeneration.namespace == namespace)
+            .values(generation=CacheGeneration.generation + 1)
+        )
+        if updated.rowcount == 0:
+            session.execute(db.insert(CacheGeneration).values(namespace=namespace, generation=1))
+        bumped[namespace] = session.execute(
+            db.select(CacheGeneration.generation).where(CacheGeneration.namespace == namespace)
+        ).scalar_one()
+    session.info['cache_generations_bumped'] = bumped
+
+
+# ... und nach dem Commit als bereits verarbeitet verbuchen
+@db.event.listens_for(Session, 'after_commit')
+def _record_cache_generations(session):
+    bumped = session.info.pop('cache_generations_bumped', None)
+    if bumped:
+        _cache_sync.record_own(bumped)
+
+
+@db.event.listens_for(Session, 'after_rollback')
+def _discard_cache_namespaces(session):
+    session.info.pop('cache_namespaces', None)
+    session.info.pop('cache_generations_bumped', None)
+
+# === MONITORING ===
+# Pro Request: Anzahl SQL-Statements, DB-Zeit, langsamste Statements und wiederholte Statements
+# (gleicher SQL-Text mit anderen Parametern = N+1-Verdacht). Prozessweit: Histogramme je Endpoint.
+
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Histogramm im Prometheus-Textformat mit dem Endpoint als Label
+class Histogram:
+
+    def __init__(self, name, description, buckets=HISTOGRAM_BUCKETS):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self._values = {}  # {endpoint: [Zähler je Bucket..., Summe, Anzahl]}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, value):
+        with self._lock:
+            values = self._values.setdefault(endpoint, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    values[i] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for endpoint, values in sorted(self._values.items()):
+                label = f'endpoint="{endpoint}"'
+                for bound, count in zip(self.buckets, values):
+                    lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {values[-1]}')
+                lines.append(f'{self.name}_sum{{{label}}} {values[-2]:.6f}')
+                lines.append(f'{self.name}_count{{{label}}} {values[-1]}')
+        return lines
+
+# Zähler im Prometheus-Textformat mit dem Endpoint als Label
+class Counter:
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def inc(self, endpoint, amount=1):
+        with self._lock:
+            self._values[endpoint] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for endpoint, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{{endpoint="{endpoint}"}} {value}')
+        return lines
+
+
+METRICS = {
+    'request_seconds': Histogram('dss_request_duration_seconds', 'Gesamtdauer der Requests'),
+    'db_seconds': Histogram('dss_request_db_seconds', 'Summierte SQL-Zeit je Request'),
+    'template_seconds': Histogram('dss_template_render_seconds', 'Renderzeit von render_template ohne SQL-Zeit'),
+    'queries': Histogram('dss_request_queries', 'Anzahl SQL-Statements je Request', QUERY_COUNT_BUCKETS),
+    'slow_queries': Counter('dss_slow_queries_total', 'Langsame SQL-Statements'),
+    'repeated_statements': Counter('dss_repeated_statements_total', 'Requests mit wiederholten SQL-Statements (N+1-Verdacht)'),
+    'db_lock_retries': Counter('dss_db_lock_retries_total', 'Wiederholungen nach "database is locked"'),
+}
+
+# SQL-Statistik eines Requests
+class RequestSqlStats:
+
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statement_counts = defaultdict(int)
+        self.slowest = []  # Min-Heap mit den langsamsten Statements (Dauer, Statement)
+
+    def record(self, statement, duration):
+        self.query_count += 1
+        self.db_time += duration
+        self.statement_counts[statement] += 1
+        if len(self.slowest) < 5:
+            heapq.heappush(self.slowest, (duration, statement))
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, (duration, statement))
+
+    # Statements, die sich nur in den Parametern unterscheiden und oft wiederholt wurden
+    def repeated_statements(self, threshold):
+        return [(statement, count) for statement, count in self.statement_counts.items() if count >= threshold]
+
+
+@db.event.listens_for(Engine, 'before_cursor_execute')
+def _sql_start(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@db.event.listens_for(Engine, 'after_cursor_execute')
+def _sql_end(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info['query_start'].pop()
+    stats = g.get('sql_stats') if has_app_context() else None
+    if stats is None:
+        return
+
+    stats.record(statement, duration)
+    if duration >= app.config['SQL_SLOW_QUERY_SECONDS']:
+        METRICS['slow_queries'].inc(request.endpoint)
+        app.logger.warning("Langsames SQL (%.3f s) in %s: %s", duration, request.endpoint, statement)
+
+
+@app.before_request
+def _start_request_metrics():
+    g.sql_stats = RequestSqlStats()
+    g.request_start = time.perf_counter()
+    g.template_time = 0.0
+
+
+@before_render_template.connect_via(app)
+def _start_template_metrics(sender, template, context, **extra):
+    stats = g.get('sql_stats')
+    g.template_start = (time.perf_counter(), stats.db_time if stats else 0.0)
+
+
+@template_rendered.connect_via(app)
+def _stop_template_metrics(sender, template, context, **extra):
+    started, db_time_before = g.pop('template_start', (None, 0.0))
+    stats = g.get('sql_stats')
+    if started is None or stats is None:
+        return
+    # Lazy-Loads während des Renderns zählen als DB-Zeit, nicht als Renderzeit
+    g.template_time += (time.perf_counter() - started) - (stats.db_time - db_time_before)
+
+
+@app.after_request
+def _record_request_metrics(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+
+    endpoint = request.endpoint or 'unbekannt'
+    METRICS['request_seconds'].observe(endpoint, time.perf_counter() - g.request_start)
+    METRICS['db_seconds'].observe(endpoint, stats.db_time)
+    METRICS['queries'].observe(endpoint, stats.query_count)
+    if g.template_time:
+        METRICS['template_seconds'].observe(endpoint, g.template_time)
+
+    repeated = stats.repeated_statements(app.config['SQL_REPEATED_STATEMENT_THRESHOLD'])
+    if repeated:
+        METRICS['repeated_statements'].inc(endpoint)
+        for statement, count in repeated:
+            app.logger.warning("N+1-Verdacht in %s: %d× %s", endpoint, count, statement)
+
+    response.headers['Server-Timing'] = (
+        f"db;dur={stats.db_time * 1000:.1f};desc=\"{stats.query_count} Queries\", "
+        f"tpl;dur={g.template_time * 1000:.1f}"
+    )
+    return response
+
 # === ROUTEN ===
 
 @app.route('/')
@@ -185,62 +1242,89 @@ def logout():
 # Dashboard
 @app.route('/dashboard', methods=['GET', 'POST'])
 @login_required
+@eager_user('competences', 'projects')
+@read_only_db
 def dashboard():
-    # Alle Kompetenzen des aktuellen Benutzers laden
-    user_competences = UsersCompetence.query.filter_by(users_id=current_user.id).all()
+    taxonomy = get_taxonomy()
+    cached = get_cached_dashboard(current_user.id, taxonomy.generation)
+    if cached is None:
+        cached = _load_dashboard(current_user, taxonomy)
 
-    # Verschachtelte Struktur erstellen: {category: {group: [kompetenzen]}}
-    kompetenzstruktur = defaultdict(lambda: defaultdict(list))
+    return render_template('dashboard.html', 
+                         kompetenzstruktur=cached.kompetenzstruktur, 
+                         show_competence_update_hint=current_user.should_update_competences, 
+                         user_projects=cached.projects,
+                         form=AdminCompetenceForm())
 
-    # Kompetenzen nach Kategorie und Gruppe organisieren
-    for uc in user_competences:
-        knowledge_skill = uc.knowledge_skill  # Zugehörige Kompetenz laden
+# Leichtgewichtige Knoten und Projekte für das Dashboard (unabhängig von der Session cachebar)
+StructureNode = namedtuple('StructureNode', ['id', 'name'])
+DashboardProject = namedtuple('DashboardProject', ['id', 'project_name', 'status', 'users', 'competence_structure'])
 
-        # Prüfen ob alle Beziehungen existieren 
-        if not knowledge_skill or not knowledge_skill.competence or not knowledge_skill.competence.competence_group:
-            continue  
+# Baut die Dashboard-Strukturen eines Nutzers mit einer festen Anzahl Abfragen
+# (Kompetenzen und Projekte kommen aus dem Nutzer-Cache, dazu je eine Abfrage für
+# Anforderungen und Teammitglieder aller Projekte) und legt sie im Cache ab
+def _load_dashboard(user, taxonomy):
+    generation = user_cache_generation()
 
-        competence = knowledge_skill.competence  
-        competence_group = competence.competence_group  
+    # Verschachtelte Struktur erstellen: {group: {competence: [kompetenzen]}}
+    kompetenzstruktur = _structure_by_taxonomy(
+        taxonomy,
+        ((uc.knowledge_skill_id, uc.competence_level.label) for uc in sorted(user.competences, key=lambda uc: uc.id))
+    )
 
-        # Kompetenz zur entsprechenden Kategorie/Gruppe hinzufügen
-        kompetenzstruktur[competence_group][competence].append({
-            "name": knowledge_skill.name,
-            "level": uc.competence_level
-        })
+    projects = sorted(user.projects, key=lambda p: p.id)
+    project_ids = [p.id for p in projects]
+    requirements = defaultdict(list)
+    team = defaultdict(list)
+    if project_ids:
+        for row in db.session.execute(
+            db.select(ProjectRequirement.project_id, ProjectRequirement.knowledge_skill_id, ProjectRequirement.competence_level)
+            .where(ProjectRequirement.project_id.in_(project_ids))
+            .order_by(ProjectRequirement.id)
+        ):
+            requirements[row.project_id].append((row.knowledge_skill_id, row.competence_level))
+        for row in db.session.execute(
+            db.select(projekt_user.c.project_id, Users.id, Users.name)
+            .join(Users, Users.id == projekt_user.c.user_id)
+            .where(projekt_user.c.project_id.in_(project_ids))
+            .order_by(Users.id)
+        ):
+            team[row.project_id].append(StructureNode(row.id, row.name))
 
-    # Projekte des aktuellen Benutzers laden (mit allen notwendigen Beziehungen)
-    user_projects = Project.query.filter(Project.users.contains(current_user)).options(
-        db.joinedload(Project.requirements).joinedload(ProjectRequirement.knowledge_skill).joinedload(KnowledgeSkills.competence).joinedload(Competence.competence_group),
-        db.joinedload(Project.users)
-    ).all()
+    user_projects = [
+        DashboardProject(p.id, p.project_name, p.status, team[p.id],
+                         _structure_by_taxonomy(taxonomy, requirements[p.id]))
+        for p in projects
+    ]
 
-    # Projektkompetenzen strukturieren
-    def structure_project_competences(project):
-        project_competence_structure = defaultdict(lambda: defaultdict(list))
-        for requirement in project.requirements:
-            if (requirement.knowledge_skill and 
-                requirement.knowledge_skill.competence and 
-                requirement.knowledge_skill.competence.competence_group):
-                
-                group = requirement.knowledge_skill.competence.competence_group
-                competence = requirement.knowledge_skill.competence
-                
-                project_competence_structure[group][competence].append({
-                    "name": requirement.knowledge_skill.name,
-                    "level": requirement.competence_level
-                })
-        return dict(project_competence_structure)
-
-    # Projektkompetenzen für jedes Projekt strukturieren
-    for project in user_projects:
-        project.competence_structure = structure_project_competences(project)
+    entry = DashboardCacheEntry(taxonomy.generation, kompetenzstruktur, user_projects, frozenset(project_ids),
+                                time.monotonic() + app.config['USER_CACHE_TTL_SECONDS'])
+    store_cached_dashboard(user.id, generation, entry)
+    return entry
 
-    return render_template('dashboard.html', 
-                         kompetenzstruktur=kompetenzstruktur, 
-                         show_competence_update_hint=current_user.should_update_competences, 
-                         user_projects=user_projects,
-                         form=AdminCompetenceForm())
+# Gruppiert (knowledge_skill_id, Level)-Paare als {Gruppe: {Kompetenz: [{"name", "level"}]}};
+# Wissen und Fähigkeiten ohne vollständige Zuordnung in der Taxonomie werden übersprungen
+def _structure_by_taxonomy(taxonomy, entries):
+    structure = {}
+    for knowledge_skill_id, level in entries:
+        skill = taxonomy.skills.get(knowledge_skill_id)
+        if skill is None:
+            continue
+        competence = taxonomy.competences[skill.competence_id]
+        group = taxonomy.groups_by_id[competence.competence_group_id]
+
+        group_node = structure.setdefault(StructureNode(group.id, group.name), {})
+        group_node.setdefault(StructureNode(competence.id, competence.name), []).append({
+            "name": skill.name,
+            "level": level
+        })
+    return structure
+
+# Blendet den Kompetenz-Update-Hinweis eines Nutzers aus (eigene Transaktion)
+@retry_on_db_lock
+def clear_competence_hint(user_id):
+    db.session.get(Users, user_id).should_update_competences = False
+    db.session.commit()
 
 # Kompetenz-Update-Hinweis ausblenden
 @app.route('/dismiss_competence_hint', methods=['POST'])
@@ -252,9 +1336,8 @@ def dismiss_competence_hint():
         flash('Ungültige Anfrage.', 'error')
         return redirect(url_for('dashboard'))
         
-    current_user.should_update_competences = False
-    db.session.commit()
-    
+    clear_competence_hint(current_user.id)
+
     # Prüfen ob zur Kompetenz-Seite weitergeleitet werden soll
     if request.form.get('redirect_to_competence') == 'true':
         return redirect(url_for('competence'))
@@ -269,68 +1352,48 @@ def project():
     form = AdminCompetenceForm()
     
     if request.method == "POST" and form.validate_on_submit(): 
-        neuer_name = request.form.get('project_name')
-        notiz = request.form.get('notiz', '')  
-        
-        neues_projekt = Project(project_name=neuer_name, notiz=notiz)
-        db.session.add(neues_projekt)
-        db.session.commit()  
-
-        # Projektanforderungen verarbeiten und speichern
-        for key in request.form:
-            # Suche nach Formularfeldern die Kompetenzen definieren
-            if key.startswith('projektkompetenzen['):
-                knowledge_skill_id_str = key[len('projektkompetenzen['):-1]
-                level = request.form.get(key) 
-
-                try:
-                    knowledge_skill_id = int(knowledge_skill_id_str)
-                except ValueError:
-                    continue 
-
-                # Neue Projektanforderung erstellen
-                neue_anforderung = ProjectRequirement(
-                    project_id=neues_projekt.id,
-                    knowledge_skill_id=knowledge_skill_id,
-                    competence_level=level
-                )
-                db.session.add(neue_anforderung)
-        
-        db.session.commit() 
-        flash('Projekt wurde erfolgreich erstellt.', 'success')
-        return redirect(url_for('admin')) 
+        # Projekt und Anforderungen werden geprüft und in einer Transaktion angelegt
+        spec = _project_spec(
+            request.form.get('project_name'),
+            request.form.get('notiz', ''),
+            _read_level_pairs(request.form, 'projektkompetenzen['),
+        )
+        project_ids, errors = commit_projects([spec])
+        if errors:
+            for _, message in errors:
+                flash(message, 'error')
+        else:
+            flash('Projekt wurde erfolgreich erstellt.', 'success')
+            return redirect(url_for('admin')) 
 
-    # Alle Kategorien mit zugehörigen Gruppen und Kompetenzen laden 
-    competence_groups = CompetenceGroup.query.options(
-        db.joinedload(CompetenceGroup.competences).joinedload(Competence.knowledge_skills)
-    ).all()
+    # Gruppen aus dem Cache laden (Inhalt wird beim Aufklappen nachgeladen)
+    competence_groups = get_taxonomy().groups
 
     return render_template('project.html', competence_groups=competence_groups, form=form)
 
+# Legt einen Nutzer an, sofern die E-Mail-Adresse noch frei ist (eigene Transaktion); sonst None
+@retry_on_db_lock
+def create_user(name, email, password_hash, admin):
+    if Users.query.filter_by(email=email).first() is not None:
+        return None
+    user = Users(name=name, email=email, password_hash=password_hash, admin=admin)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
 # Nutzer hinzufügen
 @app.route("/adduser", methods=['GET', 'POST'])
-@login_required 
+@login_required
 def add_user():
     
     form = AddUserForm() 
     
     
     if form.validate_on_submit():
-        user = Users.query.filter_by(email=form.email.data).first()
-        
-        if user is None: 
-            hashed_password = generate_password_hash(form.password_hash.data)
-            
-            # Neuen Benutzer erstellen
-            user = Users(
-                name=form.name.data, 
-                email=form.email.data, 
-                password_hash=hashed_password, 
-                admin=form.admin.data
-            )
-            db.session.add(user)
-            db.session.commit()
-            
+        hashed_password = generate_password_hash(form.password_hash.data)
+        user = create_user(form.name.data, form.email.data, hashed_password, form.admin.data)
+
+        if user is not None:
             flash(f'Nutzer {form.name.data} wurde erfolgreich erstellt.', 'success')
     
             # Formularfelder nach erfolgreichem Speichern leeren
@@ -349,310 +1412,2237 @@ def add_user():
 # Kompetenzen mit Level pflegen
 @app.route("/competence", methods=['GET', 'POST'])
 @login_required
+@eager_user('competences')
 def competence():
     # Form für CSRF-Schutz erstellen
     form = AdminCompetenceForm()
     
     if request.method == 'POST' and form.validate_on_submit():
-        for key in request.form:
-            if key.startswith("kompetenzen["):
-                knowledge_skill_id_str = key[12:-1] 
-                level = request.form[key] 
-
-              
-                try:
-                    knowledge_skill_id = int(knowledge_skill_id_str)
-                except ValueError:
-                    continue 
-
-                # Prüfen ob Benutzer bereits ein Level für diese Wissen und Fähigkeiten hat
-                existing = UsersCompetence.query.filter_by(
-                    users_id=current_user.id,
-                    knowledge_skill_id=knowledge_skill_id
-                ).first()
-
-                if existing:
-                    existing.competence_level = level
-                else: 
-                    new_competence = UsersCompetence(
-                        users_id=current_user.id,
-                        knowledge_skill_id=knowledge_skill_id,
-                        competence_level=level
-                    )
-                    db.session.add(new_competence)
-        
-        db.session.commit()  
+        levels = _parse_level_form(request.form, 'kompetenzen[')
+        save_user_competences(current_user.id, levels)
         flash('Kompetenzen wurden erfolgreich gespeichert.', 'success')
         return redirect(url_for('competence'))
 
   
-    competence_groups = CompetenceGroup.query.options(
-        db.joinedload(CompetenceGroup.competences).joinedload(Competence.knowledge_skills)
-    ).all()
-    # Kompetenzen des aktuellen Nutzers als Dictionary für die Vorauswahl
-    current_competences = {uc.knowledge_skill_id: uc.competence_level for uc in current_user.competences}
+    # Nur die Gruppen-Kopfzeilen rendern, der Inhalt wird beim Aufklappen nachgeladen
+    competence_groups = get_taxonomy().groups
+    group_counts = _count_levels_by_group(uc.knowledge_skill_id for uc in current_user.competences)
 
     return render_template('competence.html', 
                            competence_groups=competence_groups, 
-                           current_competences=current_competences,
+                           group_counts=group_counts,
                            form=form)
 
-# Admin-Bereich
-@app.route("/admin", methods=['GET', 'POST'])
-@login_required
-def admin():
-    # Form für CSRF-Schutz erstellen
-    form = AdminCompetenceForm()
-    
-    projekte = Project.query.options(db.joinedload(Project.users)).all()
-    all_users = Users.query.all()
-    competence_to_group = {}
-    all_knowledge_skills = KnowledgeSkills.query.options(
-        db.joinedload(KnowledgeSkills.competence).joinedload(Competence.competence_group)
-    ).all()
+# === PROJEKTE: ANLEGEN UND MASSENIMPORT ===
+# Ein oder viele Projekte samt Anforderungen und Erstbesetzung in einer Transaktion anlegen. Alle
+# Wissen/Fähigkeiten- und Nutzer-IDs werden vorab mit je einer IN-Abfrage geprüft; bei einem Fehler
+# wird nichts geschrieben. Anforderungen und Zuweisungen gehen gesammelt per Bulk-Insert in die DB.
 
-    for knowledge_skill in all_knowledge_skills:
-        if knowledge_skill.competence and knowledge_skill.competence.competence_group:
-            competence_to_group[knowledge_skill.id] = knowledge_skill.competence.competence_group.name
+PROJECT_IMPORT_MAX_PROJECTS = 2000  # Höchstzahl Projekte je Import, hält die Laufzeit begrenzt
+PROJECT_IMPORT_CSV_FIELDS = ('project_name', 'notiz', 'requirements', 'users')
 
-    selected_project = None
-    vergleich = []
-    anforderungen = {}
-    strukturierte_anforderungen = {}
-    
-    level_map = {"Kenner": 1, "Könner": 2, "Experte": 3}
+# Ein anzulegendes Projekt; requirements = {knowledge_skill_id: Level}, errors = Fehler beim Einlesen
+ProjectSpec = namedtuple('ProjectSpec', ['name', 'notiz', 'requirements', 'user_ids', 'errors'])
 
-    if request.method == 'POST':
-        project_id = request.form.get('project_id', type=int)
-        if project_id:
-            selected_project = Project.query.get_or_404(project_id)
-            anforderungen = _get_project_requirements(project_id)
-            strukturierte_anforderungen = _structure_requirements(anforderungen)
-            vergleich = _compare_user_skills(all_users, anforderungen, level_map)
 
+# Baut aus Rohwerten (Formular, JSON, CSV) ein ProjectSpec; Lesefehler landen in spec.errors
+def _project_spec(name, notiz, requirement_pairs, user_ids=()):
+    errors = []
+    name = (name or '').strip()
+    if not name:
+        errors.append("Projektname fehlt.")
+    elif len(name) > 100:
+        errors.append("Projektname ist länger als 100 Zeichen.")
 
-    ampel_info = {projekt.id: check_kompetenz_abdeckung(projekt) for projekt in projekte}
-    fehlende_kompetenzen = _calculate_missing_competences(projekte)
-    competence_to_group = _get_competence_to_group_mapping()
-    
-    # Bereits zugewiesene Benutzer für das ausgewählte Projekt ermitteln
-    already_assigned_user_ids = []
-    if selected_project:
-        already_assigned_user_ids = [user.id for user in selected_project.users]
+    requirements = {}
+    for knowledge_skill_id, label in requirement_pairs:
+        try:
+            knowledge_skill_id = int(knowledge_skill_id)
+        except (TypeError, ValueError):
+            errors.append(f"Ungültige Wissen/Fähigkeit-ID: {knowledge_skill_id!r}")
+            continue
+        level = CompetenceLevel.from_label(label)
+        if level is None:
+            errors.append(f"Unbekanntes Level {label!r} für Wissen/Fähigkeit {knowledge_skill_id}.")
+            continue
+        requirements[knowledge_skill_id] = level
 
-    return render_template(
-        'admin.html',
-        projekte=projekte,
-        selected_project=selected_project,
-        vergleich=vergleich,
-        anforderungen=anforderungen,
-        strukturierte_anforderungen=strukturierte_anforderungen,
-        competence_to_group=competence_to_group,
-        ampel_info=ampel_info,
-        fehlende_kompetenzen=fehlende_kompetenzen,
+    users = []
+    for user_id in user_ids:
+        try:
+            users.append(int(user_id))
+        except (TypeError, ValueError):
+            errors.append(f"Ungültige Nutzer-ID: {user_id!r}")
+
+    return ProjectSpec(name, notiz or '', requirements, list(dict.fromkeys(users)), errors)
+
+
+# Legt die Projekte an (ohne Commit) und gibt (Projekt-IDs, []) zurück. Bei Fehlern wird nichts
+# geschrieben und ([], [(Index des Projekts, Meldung), ...]) zurückgegeben.
+def create_projects(specs):
+    errors = [(index, message) for index, spec in enumerate(specs) for message in spec.errors]
+
+    skill_ids = {knowledge_skill_id for spec in specs for knowledge_skill_id in spec.requirements}
+    user_ids = {user_id for spec in specs for user_id in spec.user_ids}
+    known_skills = set(db.session.scalars(
+        db.select(KnowledgeSkills.id).where(KnowledgeSkills.id.in_(skill_ids))
+    )) if skill_ids else set()
+    known_users = set(db.session.scalars(
+        db.select(Users.id).where(Users.id.in_(user_ids))
+    )) if user_ids else set()
+
+    for index, spec in enumerate(specs):
+        unknown_skills = sorted(spec.requirements.keys() - known_skills)
+        if unknown_skills:
+            errors.append((index, "Unbekannte Wissen/Fähigkeiten: " + ", ".join(map(str, unknown_skills))))
+        unknown_users = sorted(set(spec.user_ids) - known_users)
+        if unknown_users:
+            errors.append((index, "Unbekannte Nutzer: " + ", ".join(map(str, unknown_users))))
+    if errors:
+        return [], sorted(errors)
+
+    if not specs:
+        return [], []
+
+    # SQLite vergibt die IDs innerhalb eines INSERTs aufsteigend in der Reihenfolge der Zeilen;
+    # sortiert passen sie damit zu specs (RETURNING selbst liefert keine garantierte Reihenfolge)
+    project_ids = sorted(db.session.scalars(
+        db.insert(Project).returning(Project.id),
+        [{"project_name": spec.name, "notiz": spec.notiz} for spec in specs],
+    ))
+
+    requirement_rows = [
+        {"project_id": project_id, "knowledge_skill_id": knowledge_skill_id, "competence_level": level}
+        for project_id, spec in zip(project_ids, specs)
+        for knowledge_skill_id, level in spec.requirements.items()
+    ]
+    assignment_rows = [
+        {"project_id": project_id, "user_id": user_id}
+        for project_id, spec in zip(project_ids, specs)
+        for user_id in spec.user_ids
+    ]
+    if requirement_rows:
+        db.session.execute(db.insert(ProjectRequirement), requirement_rows)
+    if assignment_rows:
+        db.session.execute(projekt_user.insert(), assignment_rows)
+
+    refresh_project_coverage(project_ids)
+    index_project_fts(project_ids)
+    return project_ids, []
+
+
+# JSON: {"projects": [{"name": ..., "notiz": ..., "requirements": {"<skill_id>": "Kenner"}, "users": [<id>]}]}
+def _project_specs_from_json(data):
+    items = data.get('projects') if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        return None
+
+    specs = []
+    for item in items:
+        if not isinstance(item, dict):
+            specs.append(ProjectSpec('', '', {}, [], ["Eintrag ist kein Objekt."]))
+            continue
+        requirements = item.get('requirements') or {}
+        users = item.get('users') or []
+        spec = _project_spec(
+            item.get('name', item.get('project_name')),
+            item.get('notiz'),
+            requirements.items() if isinstance(requirements, dict) else [],
+            users if isinstance(users, list) else [],
+        )
+        if not isinstance(requirements, dict) or not isinstance(users, list):
+            spec.errors.append("requirements muss ein Objekt, users eine Liste sein.")
+        specs.append(spec)
+    return specs
+
+
+# CSV mit Kopfzeile project_name,notiz,requirements,users; requirements als "12=Kenner;15=Experte",
+# users als "3;4"
+def _project_specs_from_csv(text):
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or 'project_name' not in reader.fieldnames:
+        return None
+
+    def split(value):
+        return [part.strip() for part in (value or '').split(';') if part.strip()]
+
+    return [
+        _project_spec(
+            row.get('project_name'),
+            row.get('notiz'),
+            [tuple(part.split('=', 1)) if '=' in part else (part, None) for part in split(row.get('requirements'))],
+            split(row.get('users')),
+        )
+        for row in reader
+    ]
+
+
+# Legt die Projekte in einer eigenen Transaktion an; bei Fehlern wird nichts geschrieben
+@retry_on_db_lock
+def commit_projects(specs):
+    project_ids, errors = create_projects(specs)
+    if errors:
+        db.session.rollback()
+    else:
+        db.session.commit()
+    return project_ids, errors
+
+
+# Massenimport von Projekten als JSON-Body oder CSV (Upload-Feld "datei" bzw. Content-Type text/csv).
+# Alles oder nichts: bei einem Fehler 400 mit den Fehlern je Projekt (Index ab 0), sonst 201.
+@app.route('/admin/projekte/import', methods=['POST'])
+@login_required
+def projekte_import():
+    if not current_user.admin:
+        abort(403)
+    form = AdminCompetenceForm()
+    if not form.validate_on_submit():
+        abort(400)
+
+    if request.is_json:
+        specs = _project_specs_from_json(request.get_json(silent=True))
+    elif 'datei' in request.files:
+        specs = _project_specs_from_csv(request.files['datei'].read().decode('utf-8-sig', errors='replace'))
+    else:
+        specs = _project_specs_from_csv(request.get_data(as_text=True))
+    if specs is None:
+        return jsonify({"error": "Erwartet JSON mit \"projects\" oder CSV mit Kopfzeile "
+                                 + ",".join(PROJECT_IMPORT_CSV_FIELDS) + "."}), 400
+    if len(specs) > PROJECT_IMPORT_MAX_PROJECTS:
+        return jsonify({"error": f"Höchstens {PROJECT_IMPORT_MAX_PROJECTS} Projekte je Import."}), 413
+
+    project_ids, errors = commit_projects(specs)
+    if errors:
+        return jsonify({"errors": [{"index": index, "error": message} for index, message in errors]}), 400
+
+    return jsonify({"created": len(project_ids), "project_ids": project_ids}), 201
+
+
+# === PROJEKTE: ZUWEISUNGEN ===
+# Nutzer gesammelt Projekten zuweisen bzw. daraus entfernen: Projekte, Nutzer und bestehende Paare
+# werden mit je einer IN-Abfrage geladen und als Menge abgeglichen, neue Paare per Bulk-Insert
+# geschrieben und entfernte per executemany-DELETE gelöscht.
+
+ASSIGNMENT_MAX_PAIRS = 50000  # Höchstzahl (Projekt, Nutzer)-Paare je Request
+
+AssignmentResult = namedtuple('AssignmentResult', ['assigned', 'unassigned', 'unknown_projects', 'unknown_users'])
+
+
+# IDs aus Formular/JSON lesen, ungültige Werte werden übersprungen
+def _parse_ids(values):
+    ids = []
+    for value in values:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+# Übernimmt Zuweisungen (ohne Commit). assign/unassign: Paare (project_id, user_id); Paare in beiden
+# Listen werden ignoriert. Gibt die tatsächlich hinzugefügten/entfernten Paare und unbekannte IDs zurück.
+def update_project_assignments(assign=(), unassign=()):
+    assign, unassign = set(assign), set(unassign)
+    assign, unassign = assign - unassign, unassign - assign
+    requested = assign | unassign
+    if not requested:
+        return AssignmentResult([], [], [], [])
+
+    project_ids = {project_id for project_id, _ in requested}
+    user_ids = {user_id for _, user_id in requested}
+    known_projects = set(db.session.scalars(db.select(Project.id).where(Project.id.in_(project_ids))))
+    known_users = set(db.session.scalars(db.select(Users.id).where(Users.id.in_(user_ids))))
+    existing = {
+        tuple(row) for row in db.session.execute(
+            db.select(projekt_user.c.project_id, projekt_user.c.user_id)
+            .where(projekt_user.c.project_id.in_(known_projects), projekt_user.c.user_id.in_(known_users))
+        )
+    } if known_projects and known_users else set()
+
+    added = sorted(
+        (project_id, user_id) for project_id, user_id in assign - existing
+        if project_id in known_projects and user_id in known_users
+    )
+    removed = sorted(unassign & existing)
+
+    if added:
+        db.session.execute(projekt_user.insert(), [
+            {"project_id": project_id, "user_id": user_id} for project_id, user_id in added
+        ])
+    if removed:
+        db.session.execute(
+            projekt_user.delete()
+            .where(projekt_user.c.project_id == db.bindparam('project_id'),
+                   projekt_user.c.user_id == db.bindparam('user_id'))
+            .execution_options(rows_from_params=True),
+            [{"project_id": project_id, "user_id": user_id} for project_id, user_id in removed],
+        )
+    if added or removed:
+        refresh_project_coverage({project_id for project_id, _ in added + removed})
+
+    return AssignmentResult(added, removed, sorted(project_ids - known_projects), sorted(user_ids - known_users))
+
+
+# Übernimmt Zuweisungen in einer eigenen Transaktion
+@retry_on_db_lock
+def commit_project_assignments(assign=(), unassign=()):
+    result = update_project_assignments(assign, unassign)
+    db.session.commit()
+    return result
+
+
+# JSON-Einträge {"project_id"|"project_ids": ..., "user_id"|"user_ids": ...} als [(Projekt-IDs, Nutzer-IDs)]
+def _assignment_entries(entries):
+    parsed = []
+    for entry in entries if isinstance(entries, list) else []:
+        if not isinstance(entry, dict):
+            continue
+        project_ids = entry.get('project_ids') or [entry.get('project_id')]
+        user_ids = entry.get('user_ids') or [entry.get('user_id')]
+        parsed.append((
+            _parse_ids(project_ids if isinstance(project_ids, list) else [project_ids]),
+            _parse_ids(user_ids if isinstance(user_ids, list) else [user_ids]),
+        ))
+    return parsed
+
+# Obergrenze der Paare (ohne Duplikate abzuziehen), prüfbar bevor das Kreuzprodukt gebildet wird
+def _assignment_pair_count(parsed):
+    return sum(len(project_ids) * len(user_ids) for project_ids, user_ids in parsed)
+
+# Kreuzprodukt der Einträge als Menge von (project_id, user_id)-Paaren
+def _assignment_pairs(parsed):
+    pairs = set()
+    for project_ids, user_ids in parsed:
+        pairs.update((project_id, user_id) for project_id in project_ids for user_id in user_ids)
+    return pairs
+
+
+# Viele Nutzer in vielen Projekten auf einmal zuweisen bzw. entfernen (nur für Admins), z. B.
+# {"assign": [{"project_ids": [1, 2], "user_ids": [3, 4]}], "unassign": [{"project_id": 5, "user_id": 3}]}
+@app.route('/admin/zuweisungen', methods=['POST'])
+@login_required
+def zuweisungen():
+    if not current_user.admin:
+        abort(403)
+    form = AdminCompetenceForm()
+    if not form.validate_on_submit():
+        abort(400)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Erwartet JSON mit \"assign\" und/oder \"unassign\"."}), 400
+    assign = _assignment_entries(data.get('assign'))
+    unassign = _assignment_entries(data.get('unassign'))
+    if _assignment_pair_count(assign) + _assignment_pair_count(unassign) > ASSIGNMENT_MAX_PAIRS:
+        return jsonify({"error": f"Höchstens {ASSIGNMENT_MAX_PAIRS} Zuweisungen je Request."}), 413
+
+    result = commit_project_assignments(_assignment_pairs(assign), _assignment_pairs(unassign))
+
+    def pairs(items):
+        return [{"project_id": project_id, "user_id": user_id} for project_id, user_id in items]
+
+    return jsonify({
+        "assigned": pairs(result.assigned),
+        "unassigned": pairs(result.unassigned),
+        "unknown_projects": result.unknown_projects,
+        "unknown_users": result.unknown_users,
+    })
+
+
+# === KOMPETENZKATALOG: SUCHE UND NACHLADEN ===
+# Die Formulare in competence(), admin_competence() und project() rendern nur die Gruppen-Kopfzeilen.
+# Aufgeklappte Gruppen werden über kompetenz_gruppe() nachgeladen, die Suche läuft über
+# kompetenz_suche(). Nicht geladene Gruppen senden keine Felder und bleiben beim Speichern unverändert.
+
+CATALOG_FIELDS = {  # Formular → Präfix der Radio-Felder
+    'competence': 'kompetenzen',
+    'admin_competence': 'kompetenzen',
+    'project': 'projektkompetenzen',
+}
+
+
+# Das Markup einer Gruppe hängt nur von der Taxonomie und dem Feldpräfix ab. Es wird deshalb je
+# Taxonomie-Generation einmal gerendert und gecacht; an den Stellen der Vorauswahl setzt das
+# Template Platzhalter (level_slot), die pro Anfrage mit den Leveln des Nutzers gefüllt werden.
+
+RenderedFragment = namedtuple('RenderedFragment', ['parts', 'slots'])  # len(parts) == len(slots) + 1
+
+FRAGMENT_SLOT_MARK = '\x00'  # Kommt in gerendertem HTML sonst nicht vor
+
+_fragment_lock = threading.Lock()
+_fragment_cache = {}  # {(Generation, Template, Schlüssel): RenderedFragment}
+
+
+# Platzhalter für "checked" beim Radio-Button des Levels label einer Wissen/Fähigkeit
+def _level_slot(knowledge_skill_id, label):
+    return Markup(f'{FRAGMENT_SLOT_MARK}{knowledge_skill_id}:{label}{FRAGMENT_SLOT_MARK}')
+
+
+# Rendert das Template ohne Vorauswahl einmal je Taxonomie-Generation und liefert das zerlegte Ergebnis.
+# Der Kontext muss aus demselben Taxonomie-Schnappschuss stammen.
+def get_cached_fragment(taxonomy, template, key, **context):
+    cache_key = (taxonomy.generation, template, key)
+    fragment = _fragment_cache.get(cache_key)
+    if fragment is not None:
+        return fragment
+
+    pieces = render_template(template, level_slot=_level_slot, **context).split(FRAGMENT_SLOT_MARK)
+    slots = []
+    for slot in pieces[1::2]:
+        knowledge_skill_id, label = slot.split(':', 1)
+        slots.append((int(knowledge_skill_id), label))
+    fragment = RenderedFragment(tuple(pieces[0::2]), tuple(slots))
+
+    with _fragment_lock:
+        # Einträge älterer Generationen verwerfen
+        for stale in [k for k in _fragment_cache if k[0] < taxonomy.generation]:
+            del _fragment_cache[stale]
+        _fragment_cache[cache_key] = fragment
+    return fragment
+
+
+# Setzt die Vorauswahl {knowledge_skill_id: Level-Anzeigename} in ein gecachtes Fragment ein
+def apply_level_selection(fragment, current_competences):
+    html = [fragment.parts[0]]
+    for (knowledge_skill_id, label), part in zip(fragment.slots, fragment.parts[1:]):
+        if current_competences.get(knowledge_skill_id) == label:
+            html.append('checked')
+        html.append(part)
+    return Markup(''.join(html))
+
+
+# Anzahl gesetzter Level je Kompetenzgruppe: {competence_group_id: Anzahl}
+def _count_levels_by_group(skill_ids):
+    taxonomy = get_taxonomy()
+    counts = defaultdict(int)
+    for skill_id in skill_ids:
+        skill = taxonomy.skills.get(skill_id)
+        if skill is not None:
+            counts[taxonomy.competences[skill.competence_id].competence_group_id] += 1
+    return counts
+
+
+# Autovervollständigung für Kompetenzen und Wissen/Fähigkeiten, z. B. /kompetenzen/suche?q=pyth&limit=10
+@app.route('/kompetenzen/suche', methods=['GET'])
+@login_required
+def kompetenz_suche():
+    query = request.args.get('q', '')
+    limit = min(max(request.args.get('limit', SKILL_SEARCH_LIMIT, type=int), 1), SKILL_SEARCH_MAX_LIMIT)
+    return jsonify({
+        "query": query,
+        "results": get_taxonomy().search_index.search(query, limit),
+    })
+
+
+# Inhalt einer Kompetenzgruppe als HTML-Fragment mit der Vorauswahl des jeweiligen Formulars
+@app.route('/kompetenzen/gruppe/<int:group_id>', methods=['GET'])
+@login_required
+@eager_user('competences')
+def kompetenz_gruppe(group_id):
+    taxonomy = get_taxonomy()
+    group = taxonomy.groups_by_id.get(group_id)
+    formular = request.args.get('formular', 'competence')
+    if group is None:
+        abort(404)
+    if formular not in CATALOG_FIELDS:
+        abort(400)
+
+    current_competences = {}
+    if formular == 'competence':
+        current_competences = {uc.knowledge_skill_id: uc.competence_level.label for uc in current_user.competences}
+    elif formular == 'admin_competence':
+        if not current_user.admin:
+            abort(403)
+        skill_ids = [skill.id for competence in group.competences for skill in competence.knowledge_skills]
+        current_competences = {
+            knowledge_skill_id: level.label
+            for knowledge_skill_id, level in db.session.execute(
+                db.select(UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+                .where(UsersCompetence.users_id == request.args.get('user_id', type=int),
+                       UsersCompetence.knowledge_skill_id.in_(skill_ids))
+            )
+        }
+
+    field = CATALOG_FIELDS[formular]
+    fragment = get_cached_fragment(taxonomy, '_competence_group.html', (group_id, field), group=group, field=field)
+    return apply_level_selection(fragment, current_competences)
+
+# Liest Formularfelder der Form "<prefix><knowledge_skill_id>]" ungeprüft als (ID-Text, Level-Text)
+def _read_level_pairs(form, prefix):
+    return [(key[len(prefix):-1], form.get(key)) for key in form if key.startswith(prefix)]
+
+# Liest Formularfelder der Form "<prefix><knowledge_skill_id>]" als {knowledge_skill_id: Level}
+# (ungültige IDs, unbekannte Wissen/Fähigkeiten und unbekannte Level werden übersprungen)
+def _parse_level_form(form, prefix):
+    known_skills = get_taxonomy().skills
+    levels = {}
+
+    for knowledge_skill_id, label in _read_level_pairs(form, prefix):
+        try:
+            knowledge_skill_id = int(knowledge_skill_id)
+        except ValueError:
+            continue
+
+        level = CompetenceLevel.from_label(label)
+        if knowledge_skill_id in known_skills and level is not None:
+            levels[knowledge_skill_id] = level
+
+    return levels
+
+# Speichert Kompetenzlevel eines Nutzers gesammelt: bestehende Zeilen werden einmal geladen,
+# nur neue bzw. geänderte Level werden per Bulk-Insert/-Update geschrieben und im selben Zug
+# in competence_change protokolliert. Gibt die IDs der geänderten Wissen und Fähigkeiten zurück.
+def _save_user_competences(user_id, levels):
+    existing = {
+        row.knowledge_skill_id: row
+        for row in db.session.execute(
+            db.select(UsersCompetence.id, UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+            .where(UsersCompetence.users_id == user_id)
+        )
+    }
+
+    inserts = []
+    updates = []
+    changes = []
+    changed_at = _utcnow()
+    for knowledge_skill_id, level in levels.items():
+        row = existing.get(knowledge_skill_id)
+        if row is None:
+            inserts.append({"users_id": user_id, "knowledge_skill_id": knowledge_skill_id, "competence_level": level})
+        elif row.competence_level != level:
+            updates.append({"id": row.id, "competence_level": level})
+        else:
+            continue
+        changes.append({
+            "users_id": user_id,
+            "knowledge_skill_id": knowledge_skill_id,
+            "old_level": row.competence_level if row is not None else None,
+            "new_level": level,
+            "changed_at": changed_at,
+        })
+
+    if inserts:
+        db.session.execute(db.insert(UsersCompetence), inserts)
+    if updates:
+        db.session.execute(db.update(UsersCompetence).execution_options(users_marked=True), updates)
+        mark_users_changed([user_id])
+    if changes:
+        db.session.execute(db.insert(CompetenceChange), changes)
+
+    changed_skill_ids = [change["knowledge_skill_id"] for change in changes]
+
+    return changed_skill_ids
+
+# Transaktion "Kompetenzen speichern": Level schreiben, Abdeckung nachziehen, committen
+@retry_on_db_lock
+def save_user_competences(user_id, levels):
+    changed_skill_ids = _save_user_competences(user_id, levels)
+    refresh_user_project_coverage(user_id, changed_skill_ids)
+    db.session.commit()
+    return changed_skill_ids
+
+# Admin-Bereich
+@app.route("/admin", methods=['GET', 'POST'])
+@login_required
+@read_only_db
+def admin():
+    # Form für CSRF-Schutz erstellen
+    form = AdminCompetenceForm()
+    
+    # Nur aktive Projekte werden angezeigt; Anforderungen und Team je eine Abfrage für alle Projekte
+    projekte = (
+        Project.query.filter(_active_project_filter())
+        .options(db.selectinload(Project.requirements), db.selectinload(Project.users))
+        .all()
+    )
+
+    selected_project = None
+    vergleich = []
+    anforderungen = {}
+    strukturierte_anforderungen = {}
+    teamvorschlaege = []
+    vergleich_seite = None
+    vergleich_filter = _comparison_params(request.values)
+    vergleich_urls = {}
+
+    # Projektauswahl per POST, Blättern und Filtern per GET-Parameter
+    project_id = request.values.get('project_id', type=int)
+    if project_id:
+        selected_project = Project.query.get_or_404(project_id)
+        anforderungen = _get_project_requirements(project_id)
+        strukturierte_anforderungen = _structure_requirements(anforderungen)
+        vergleich_seite = _paginate_comparison(anforderungen, **vergleich_filter)
+        vergleich = vergleich_seite.entries
+        vergleich_urls = _comparison_page_urls(project_id, vergleich_filter, vergleich_seite)
+        recommender = TeamRecommender(anforderungen, _load_skill_postings(list(anforderungen)))
+        # Nur die Greedy-Vorschläge: die Seite wird bei jedem Blättern/Filtern neu gerendert;
+        # die exakte Suche bleibt über /admin/team_empfehlung/<id>?exact=1 abrufbar
+        teamvorschlaege = _describe_teams(recommender, recommender.recommend(limit=3))
+
+    # Ampel und fehlende Kompetenzen der aktiven Projekte aus der materialisierten Abdeckung lesen
+    abdeckung = CoverageReport.from_coverage_table(projekte)
+    ampel_info = abdeckung.ampel_info
+    fehlende_kompetenzen = abdeckung.fehlende_kompetenzen
+    competence_to_group = _get_competence_to_group_mapping()
+    
+    # Bereits zugewiesene Benutzer für das ausgewählte Projekt ermitteln
+    already_assigned_user_ids = []
+    if selected_project:
+        already_assigned_user_ids = [user.id for user in selected_project.users]
+
+    return render_template(
+        'admin.html',
+        projekte=projekte,
+        selected_project=selected_project,
+        vergleich=vergleich,
+        anforderungen=anforderungen,
+        strukturierte_anforderungen=strukturierte_anforderungen,
+        competence_to_group=competence_to_group,
+        ampel_info=ampel_info,
+        fehlende_kompetenzen=fehlende_kompetenzen,
         already_assigned_user_ids=already_assigned_user_ids,
-        all_users=all_users,
+        teamvorschlaege=teamvorschlaege,
+        vergleich_seite=vergleich_seite,
+        vergleich_filter=vergleich_filter,
+        vergleich_urls=vergleich_urls,
         form=form
     )
 
-# Projektanforderungen laden
-def _get_project_requirements(project_id):
-    anforderungen_query = ProjectRequirement.query.filter_by(project_id=project_id).all()
-    return {r.knowledge_skill_id: r.competence_level for r in anforderungen_query}
+# Projektanforderungen laden
+def _get_project_requirements(project_id):
+    anforderungen_query = ProjectRequirement.query.filter_by(project_id=project_id).all()
+    return {r.knowledge_skill_id: r.competence_level for r in anforderungen_query}
+
+# Strukturiert Anforderungen hierarchisch
+def _structure_requirements(anforderungen):
+    strukturierte_anforderungen = {}
+
+    for competence_group in get_taxonomy().groups:
+        strukturierte_anforderungen[competence_group.name] = {}
+        for competence in competence_group.competences:
+            knowledge_skills_list = []
+            for knowledge_skill in competence.knowledge_skills:
+                if knowledge_skill.id in anforderungen:
+                    knowledge_skills_list.append({
+                        "id": knowledge_skill.id,
+                        "name": knowledge_skill.name,
+                        "level": anforderungen[knowledge_skill.id]
+                    })
+            if knowledge_skills_list:
+                strukturierte_anforderungen[competence_group.name][competence.name] = knowledge_skills_list
+
+    return strukturierte_anforderungen
+
+
+# Bewertet die Nutzer gegen die Projektanforderungen. Statt die Kompetenzen jedes Nutzers zu laden,
+# werden nur die Postings der geforderten Wissen/Fähigkeiten aus dem invertierten Index zusammengeführt;
+# Nutzer ohne passende Posting teilen sich einen gemeinsamen "❌"-Eintrag.
+# Liefert ({user_id: {skill: info}}, {user_id: erfüllte Anforderungen}, gemeinsame "❌"-Infos)
+def _score_user_skills(anforderungen):
+    index = _load_skill_index(list(anforderungen))
+
+    # Für jede Projektanforderung die Nutzer mit dieser Kompetenz bewerten: {user_id: {skill: info}}
+    user_infos = defaultdict(dict)
+    erfuellt = defaultdict(int)  # Anzahl erfüllter Anforderungen je Nutzer
+    for skill, projekt_level in anforderungen.items():
+        for user_id, user_level in index.get(skill, ()):
+            if user_level >= (projekt_level or 0):
+                symbol = "✅"  # Nutzer erfüllt Anforderung (richtige oder höhere Bewertungsgruppe)
+                erfuellt[user_id] += 1
+            else:
+                symbol = "⚠️"  # Nutzer hat die Kompetenz, aber in niedrigerer Bewertungsgruppe
+            user_infos[user_id][skill] = {
+                "user_level": user_level,
+                "projekt_level": projekt_level,
+                "symbol": symbol
+            }
+
+    # Nutzer hat diese Kompetenz gar nicht
+    missing = {
+        skill: {"user_level": "Nichts", "projekt_level": projekt_level, "symbol": "❌"}
+        for skill, projekt_level in anforderungen.items()
+    }
+    return user_infos, erfuellt, missing
+
+# Eintrag eines Nutzers mit seinen Kompetenz-Infos und Trefferzahlen für die Vergleichsliste
+def _comparison_entry(user, user_infos, erfuellt, missing):
+    infos = user_infos.get(user.id)
+    return {
+        "user": user,
+        "skills": {**missing, **infos} if infos else missing,
+        "erfuellt": erfuellt.get(user.id, 0),
+        "teilweise": len(infos) - erfuellt.get(user.id, 0) if infos else 0,
+    }
+
+# Vergleicht Benutzer-Skills mit Projektanforderungen (vollständige Liste aller Nicht-Admins)
+def _compare_user_skills(all_users, anforderungen):
+    user_infos, erfuellt, missing = _score_user_skills(anforderungen)
+    return [_comparison_entry(user, user_infos, erfuellt, missing) for user in all_users if not user.admin]
+
+# === KOMPETENZVERGLEICH: FILTER, SORTIERUNG, SEITEN ===
+
+COMPARISON_PAGE_SIZE = 25  # Nutzer je Seite im Kompetenzvergleich
+COMPARISON_MAX_PAGE_SIZE = 200
+COMPARISON_SORTS = ('score', 'name')  # score = meiste erfüllte, dann teilweise erfüllte Anforderungen
+COMPARISON_SYMBOLS = ("✅", "⚠️", "❌")
+COMPARISON_DEFAULTS = {"min_erfuellt": 0, "skill_id": None, "symbol": None, "name": '', "sort": 'score',
+                       "page": 1, "per_page": COMPARISON_PAGE_SIZE}
+
+ComparisonPage = namedtuple('ComparisonPage', ['entries', 'page', 'per_page', 'total', 'pages'])
+
+# Liest Filter, Sortierung und Seite des Kompetenzvergleichs aus den Request-Parametern
+def _comparison_params(values):
+    symbol = values.get('symbol')
+    sort = values.get('sort')
+    return {
+        "min_erfuellt": max(values.get('min_erfuellt', 0, type=int), 0),
+        "skill_id": values.get('skill_id', type=int),
+        "symbol": symbol if symbol in COMPARISON_SYMBOLS else None,
+        "name": (values.get('name') or '').strip(),
+        "sort": sort if sort in COMPARISON_SORTS else 'score',
+        "page": max(values.get('page', 1, type=int), 1),
+        "per_page": min(max(values.get('per_page', COMPARISON_PAGE_SIZE, type=int), 1), COMPARISON_MAX_PAGE_SIZE),
+    }
+
+# Filtert ("mindestens N Anforderungen erfüllt", "Symbol X bei Wissen/Fähigkeit Y", Namensteil)
+# und sortiert nur über IDs, Namen und Trefferzahlen der Nicht-Admins; Nutzerobjekte und
+# Vergleichseinträge entstehen erst für die angeforderte Seite
+def _paginate_comparison(anforderungen, min_erfuellt=0, skill_id=None, symbol=None, name='', sort='score',
+                         page=1, per_page=COMPARISON_PAGE_SIZE):
+    user_infos, erfuellt, missing = _score_user_skills(anforderungen)
+
+    def teilweise(user_id):
+        infos = user_infos.get(user_id)
+        return len(infos) - erfuellt.get(user_id, 0) if infos else 0
+
+    users = db.session.execute(
+        db.select(Users.id, Users.name).where(Users.admin.isnot(True))
+    ).all()
+    if min_erfuellt:
+        users = [u for u in users if erfuellt.get(u.id, 0) >= min_erfuellt]
+    if skill_id is not None and symbol:
+        if skill_id in missing:
+            users = [u for u in users
+                     if user_infos.get(u.id, {}).get(skill_id, missing[skill_id])["symbol"] == symbol]
+        else:
+            users = []
+    if name:
+        name = name.casefold()
+        users = [u for u in users if name in u.name.casefold()]
+
+    if sort == 'name':
+        users = sorted(users, key=lambda u: (u.name.casefold(), u.id))
+    else:
+        users = sorted(users, key=lambda u: (-erfuellt.get(u.id, 0), -teilweise(u.id), u.name.casefold(), u.id))
+
+    total = len(users)
+    pages = max(1, -(-total // per_page))
+    page = min(page, pages)
+    page_ids = [u.id for u in users[(page - 1) * per_page:page * per_page]]
+
+    page_users = {user.id: user for user in Users.query.filter(Users.id.in_(page_ids))} if page_ids else {}
+    entries = [_comparison_entry(page_users[user_id], user_infos, erfuellt, missing) for user_id in page_ids]
+    return ComparisonPage(entries, page, per_page, total, pages)
+
+# Links für vorherige/nächste Seite mit den aktuellen Filtern (nur vom Standard abweichende Parameter)
+def _comparison_page_urls(project_id, params, seite):
+    args = {key: value for key, value in params.items()
+            if key != 'page' and value != COMPARISON_DEFAULTS[key]}
+
+    def page_url(page):
+        return url_for('admin', project_id=project_id, page=page, **args) + '#Kompetenzvergleich'
+
+    return {
+        "prev": page_url(seite.page - 1) if seite.page > 1 else None,
+        "next": page_url(seite.page + 1) if seite.page < seite.pages else None,
+    }
+
+# Kompetenzvergleich seitenweise als JSON (nur für Admins), gleiche Parameter wie die Admin-Seite:
+# /admin/kompetenzvergleich/3?page=2&per_page=50&min_erfuellt=2&skill_id=7&symbol=✅&sort=name
+@app.route('/admin/kompetenzvergleich/<int:project_id>', methods=['GET'])
+@login_required
+def kompetenzvergleich_json(project_id):
+    if not current_user.admin:
+        abort(403)
+
+    db.get_or_404(Project, project_id)
+    anforderungen = _get_project_requirements(project_id)
+    seite = _paginate_comparison(anforderungen, **_comparison_params(request.args))
+    skill_names = get_taxonomy().skill_names
+
+    def level_label(level):
+        return level.label if isinstance(level, CompetenceLevel) else None
+
+    return jsonify({
+        "project_id": project_id,
+        "page": seite.page,
+        "per_page": seite.per_page,
+        "total": seite.total,
+        "pages": seite.pages,
+        "requirements": [
+            {"id": skill_id, "name": skill_names.get(skill_id), "level": level_label(level)}
+            for skill_id, level in anforderungen.items()
+        ],
+        "users": [
+            {
+                "id": e["user"].id,
+                "name": e["user"].name,
+                "erfuellt": e["erfuellt"],
+                "teilweise": e["teilweise"],
+                "skills": {
+                    str(skill_id): {"user_level": level_label(info["user_level"]), "symbol": info["symbol"]}
+                    for skill_id, info in e["skills"].items()
+                },
+            }
+            for e in seite.entries
+        ],
+    })
+
+# Invertierter Index für die angegebenen Wissen/Fähigkeiten: {knowledge_skill_id: [(user_id, Level)]}
+# (eine Abfrage, nur Nicht-Admins)
+def _load_skill_index(skill_ids):
+    index = defaultdict(list)
+    for users_id, knowledge_skill_id, level in _load_skill_postings(skill_ids):
+        index[knowledge_skill_id].append((users_id, level))
+    return index
+
+# === TEAMEMPFEHLUNG ===
+# Schlägt für die Anforderungen eines Projekts möglichst kleine Teams vor, die jede geforderte
+# Wissen/Fähigkeit mindestens im Soll-Level abdecken (Mengenüberdeckung). Jeder Nutzer wird als
+# Bitmenge der von ihm erfüllten Anforderungen dargestellt; gleiche Bitmengen und echte Teilmengen
+# anderer Nutzer fallen vorab weg, sodass nur wenige Kandidaten übrig bleiben.
+
+TEAM_EXACT_MAX_REQUIREMENTS = 24  # Exakte Suche nur bis zu so vielen Anforderungen ...
+TEAM_EXACT_MAX_CANDIDATES = 300  # ... und so vielen nicht dominierten Kandidaten
+TEAM_EXACT_MAX_NODES = 200000  # Suchbudget der exakten Suche, danach gilt das beste bisherige Team
+
+TeamRecommendation = namedtuple('TeamRecommendation', ['user_ids', 'uncovered', 'strength', 'exact'])
+
+# Lädt die Kompetenzen aller Nicht-Admins zu den angegebenen Wissen/Fähigkeiten
+# als [(users_id, knowledge_skill_id, Level)] mit einer Abfrage
+def _load_skill_postings(skill_ids):
+    if not skill_ids:
+        return []
+    return db.session.execute(
+        db.select(UsersCompetence.users_id, UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+        .join(Users, Users.id == UsersCompetence.users_id)
+        .where(UsersCompetence.knowledge_skill_id.in_(skill_ids), Users.admin.isnot(True))
+    ).all()
+
+
+class TeamRecommender:
+
+    def __init__(self, anforderungen, postings):
+        self.skill_ids = sorted(anforderungen)  # Bit i steht für die Anforderung skill_ids[i]
+        self.target_mask = (1 << len(self.skill_ids)) - 1
+        bits = {skill_id: i for i, skill_id in enumerate(self.skill_ids)}
+
+        user_masks = defaultdict(int)
+        user_strength = defaultdict(int)  # Summe der Level auf erfüllten Anforderungen
+        for user_id, knowledge_skill_id, level in postings:
+            if level >= (anforderungen[knowledge_skill_id] or 0):
+                user_masks[user_id] |= 1 << bits[knowledge_skill_id]
+                user_strength[user_id] += level
+
+        # Je Bitmenge nur der stärkste Nutzer (bei Gleichstand die kleinste ID)
+        best = {}
+        for user_id, mask in user_masks.items():
+            key = (user_strength[user_id], -user_id)
+            if mask not in best or key > best[mask]:
+                best[mask] = key
+
+        # Kandidaten absteigend nach Abdeckung; Teilmengen bereits aufgenommener Kandidaten fallen weg
+        self.candidates = []  # [(mask, strength, user_id)]
+        self.coverable_mask = 0
+        for mask in sorted(best, key=lambda m: (-m.bit_count(), -best[m][0], m)):
+            if any(mask & other == mask for other, _, _ in self.candidates):
+                continue
+            strength, negative_id = best[mask]
+            self.candidates.append((mask, strength, -negative_id))
+            self.coverable_mask |= mask
+
+    @classmethod
+    def for_project(cls, project_id):
+        anforderungen = _get_project_requirements(project_id)
+        return cls(anforderungen, _load_skill_postings(list(anforderungen)))
+
+    # Anforderungen, die kein Nutzer im Soll-Level erfüllt
+    def uncovered_skill_ids(self):
+        missing = self.target_mask & ~self.coverable_mask
+        return [skill_id for i, skill_id in enumerate(self.skill_ids) if missing >> i & 1]
+
+    # Rangliste von bis zu limit Teams: zuerst vollständige Abdeckung, dann Teamgröße, dann Level-Summe.
+    # Neben dem Greedy-Team wird je stärkstem Startkandidaten ein weiteres Team gebildet;
+    # mit exact=True wird bei kleinen Instanzen zusätzlich das kleinstmögliche Team gesucht.
+    def recommend(self, limit=5, exact=False):
+        if not self.candidates:
+            return []
+
+        teams = set()
+        minimum_size = None  # Nachgewiesen kleinste Teamgröße (nur nach vollständiger exakter Suche)
+        if exact and len(self.skill_ids) <= TEAM_EXACT_MAX_REQUIREMENTS \
+                and len(self.candidates) <= TEAM_EXACT_MAX_CANDIDATES:
+            team, optimal = self._exact()
+            teams.add(frozenset(team))
+            if optimal:
+                minimum_size = len(team)
+        teams.add(frozenset(self._greedy()))
+        for start in range(min(len(self.candidates), 2 * limit)):
+            teams.add(frozenset(self._greedy(start)))
+
+        uncovered = tuple(self.uncovered_skill_ids())
+        recommendations = []
+        for team in teams:
+            members = sorted(team, key=lambda i: (-self.candidates[i][0].bit_count(), self.candidates[i][2]))
+            recommendations.append(TeamRecommendation(
+                tuple(self.candidates[i][2] for i in members),
+                uncovered,
+                sum(self.candidates[i][1] for i in members),
+                len(team) == minimum_size,
+            ))
+        recommendations.sort(key=lambda r: (len(r.user_ids), -r.strength, r.user_ids))
+        return recommendations[:limit]
+
+    # Greedy-Mengenüberdeckung: immer den Kandidaten mit den meisten noch offenen Anforderungen wählen
+    def _greedy(self, start=None):
+        team = []
+        covered = 0
+        if start is not None:
+            team.append(start)
+            covered = self.candidates[start][0]
+
+        while covered != self.coverable_mask:
+            best = max(
+                range(len(self.candidates)),
+                key=lambda i: ((self.candidates[i][0] & ~covered).bit_count(), self.candidates[i][1])
+            )
+            team.append(best)
+            covered |= self.candidates[best][0]
+        return team
+
+    # Exakte Suche (Branch and Bound): für die offene Anforderung mit den wenigsten Kandidaten
+    # wird jeder passende Kandidat probiert. Liefert (Team, optimal); optimal ist False,
+    # wenn das Suchbudget aufgebraucht wurde und nur das beste bisher gefundene Team vorliegt.
+    def _exact(self):
+        covering = [
+            [i for i, (mask, _, _) in enumerate(self.candidates) if mask >> bit & 1]
+            for bit in range(len(self.skill_ids))
+        ]
+        max_cover = self.candidates[0][0].bit_count()
+        best = self._greedy()
+        nodes = 0
+
+        def search(team, covered):
+            nonlocal best, nodes
+            nodes += 1
+            if nodes > TEAM_EXACT_MAX_NODES:
+                return False
+            open_mask = self.coverable_mask & ~covered
+            if not open_mask:
+                if len(team) < len(best):
+                    best = list(team)
+                return True
+            # Untere Schranke: jeder weitere Kandidat deckt höchstens max_cover Anforderungen
+            if len(team) + -(-open_mask.bit_count() // max_cover) >= len(best):
+                return True
+
+            bit = min((b for b in range(len(covering)) if open_mask >> b & 1), key=lambda b: len(covering[b]))
+            for i in covering[bit]:
+                team.append(i)
+                finished = search(team, covered | self.candidates[i][0])
+                team.pop()
+                if not finished:
+                    return False
+            return True
+
+        optimal = search([], 0)
+        return best, optimal
+
+
+# Bereitet Teamvorschläge mit Namen für Template und JSON auf
+def _describe_teams(recommender, recommendations):
+    user_ids = {user_id for r in recommendations for user_id in r.user_ids}
+    names = dict(db.session.execute(
+        db.select(Users.id, Users.name).where(Users.id.in_(user_ids))
+    ).all()) if user_ids else {}
+    skill_names = get_taxonomy().skill_names
+
+    return [
+        {
+            "users": [{"id": user_id, "name": names.get(user_id)} for user_id in r.user_ids],
+            "size": len(r.user_ids),
+            "strength": r.strength,
+            "exact": r.exact,
+            "uncovered": [{"id": skill_id, "name": skill_names.get(skill_id)} for skill_id in r.uncovered],
+        }
+        for r in recommendations
+    ]
+
+
+# Teamvorschläge als JSON (nur für Admins), z. B. /admin/team_empfehlung/3?limit=5&exact=1
+@app.route('/admin/team_empfehlung/<int:project_id>', methods=['GET'])
+@login_required
+def team_empfehlung(project_id):
+    if not current_user.admin:
+        abort(403)
+
+    db.get_or_404(Project, project_id)
+    limit = min(max(request.args.get('limit', 5, type=int), 1), 20)
+    exact = request.args.get('exact', '0').lower() in ('1', 'true', 'ja')
+
+    recommender = TeamRecommender.for_project(project_id)
+    return jsonify({
+        "project_id": project_id,
+        "requirements": len(recommender.skill_ids),
+        "candidates": len(recommender.candidates),
+        "teams": _describe_teams(recommender, recommender.recommend(limit=limit, exact=exact)),
+    })
+
+# === KOMPETENZPROFILE: ÄHNLICHKEITSSUCHE ===
+# Jeder Nicht-Admin ist ein dünn besetzter Vektor über alle Wissen/Fähigkeiten (Wert = Level 1–3).
+# Die Vektoren liegen prozessweit im Koordinatenformat (Zeile, Spalte, Wert) vor; eine Abfrage
+# über die ganze Belegschaft ist damit ein einziges np.bincount über alle Einträge. Änderungen
+# werden inkrementell übernommen: nach dem Commit markiert die Nutzer-Cache-Invalidierung die
+# betroffenen Nutzer, vor der nächsten Abfrage werden nur deren Zeilen neu gelesen (alte Einträge
+# auf 0 gesetzt, neue angehängt; gelegentlich wird kompaktiert).
+
+PROFILE_TOP_K = 10
+PROFILE_MAX_K = 100
+
+ProfileMatch = namedtuple('ProfileMatch', ['user_id', 'score', 'skill_ids'])  # skill_ids: gemeinsame bzw. abgedeckte Skills
+
+
+class SkillProfileIndex:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.stale = set()  # Nutzer, deren Zeilen vor der nächsten Abfrage neu gelesen werden
+        self._clear()
+
+    def _clear(self):
+        self.row_of = {}  # {user_id: Zeile}
+        self.user_ids = np.zeros(0, dtype=np.int64)  # Zeile → user_id
+        self.norms = np.zeros(0, dtype=np.float32)  # Euklidische Norm je Zeile (0 = inaktiv)
+        self.active = np.zeros(0, dtype=bool)
+        self.col_of = {}  # {knowledge_skill_id: Spalte}
+        self.skill_ids = []  # Spalte → knowledge_skill_id
+        self.rows = np.zeros(1024, dtype=np.int32)
+        self.cols = np.zeros(1024, dtype=np.int32)
+        self.vals = np.zeros(1024, dtype=np.float32)
+        self.size = 0  # Belegte Einträge (inkl. gelöschter mit Wert 0)
+        self.dead = 0
+        self.positions = {}  # {user_id: Positionen seiner Einträge}
+
+    def _column(self, knowledge_skill_id):
+        col = self.col_of.get(knowledge_skill_id)
+        if col is None:
+            col = self.col_of[knowledge_skill_id] = len(self.skill_ids)
+            self.skill_ids.append(knowledge_skill_id)
+        return col
+
+    def _row(self, user_id):
+        row = self.row_of.get(user_id)
+        if row is None:
+            row = self.row_of[user_id] = len(self.user_ids)
+            self.user_ids = np.append(self.user_ids, user_id)
+            self.norms = np.append(self.norms, np.float32(0))
+            self.active = np.append(self.active, False)
+        return row
+
+    def _remove_entries(self, user_id):
+        positions = self.positions.pop(user_id, None)
+        if positions is not None:
+            self.vals[positions] = 0
+            self.dead += len(positions)
+
+    # Ersetzt den Vektor eines Nutzers; levels = [(knowledge_skill_id, Level)]
+    def _set_user(self, user_id, levels):
+        self._remove_entries(user_id)
+        row = self._row(user_id)
+        count = len(levels)
+        if self.size + count > len(self.vals):
+            capacity = max(2 * len(self.vals), self.size + count)
+            for name in ('rows', 'cols', 'vals'):
+                grown = np.zeros(capacity, dtype=getattr(self, name).dtype)
+                grown[:self.size] = getattr(self, name)[:self.size]
+                setattr(self, name, grown)
+
+        positions = np.arange(self.size, self.size + count)
+        self.rows[positions] = row
+        self.cols[positions] = [self._column(skill_id) for skill_id, _ in levels]
+        self.vals[positions] = [int(level) for _, level in levels]
+        self.size += count
+        if count:
+            self.positions[user_id] = positions
+        self.norms[row] = np.sqrt(np.square(self.vals[positions]).sum())
+        self.active[row] = True
+
+    def _deactivate(self, user_id):
+        self._remove_entries(user_id)
+        row = self.row_of.get(user_id)
+        if row is not None:
+            self.norms[row] = 0
+            self.active[row] = False
+
+    # Positionen je Nutzer aus den Zeilennummern neu bestimmen
+    def _index_positions(self):
+        order = np.argsort(self.rows[:self.size], kind='stable')
+        bounds = np.searchsorted(self.rows[:self.size][order], np.arange(len(self.user_ids) + 1))
+        self.positions = {
+            int(self.user_ids[row]): order[bounds[row]:bounds[row + 1]]
+            for row in np.flatnonzero(bounds[1:] > bounds[:-1])
+        }
+
+    # Entfernt gelöschte Einträge, sobald sie die Hälfte ausmachen
+    def _compact(self):
+        if self.dead < 1024 or self.dead * 2 < self.size:
+            return
+        keep = np.flatnonzero(self.vals[:self.size])
+        self.rows, self.cols, self.vals = self.rows[keep], self.cols[keep], self.vals[keep]
+        self.size = len(keep)
+        self.dead = 0
+        self._index_positions()
+
+    # Liest alle Nicht-Admins mit ihren Kompetenzen in einem Rutsch (eigene Session → aktueller Stand)
+    def _load(self, session):
+        self._clear()
+        user_ids = session.scalars(db.select(Users.id).where(Users.admin.isnot(True)).order_by(Users.id)).all()
+        entries = session.execute(
+            # Level als Rohwert lesen, spart die Umwandlung in CompetenceLevel je Zeile
+            db.select(UsersCompetence.users_id, UsersCompetence.knowledge_skill_id,
+                      db.type_coerce(UsersCompetence.competence_level, db.SmallInteger))
+            .join(Users, Users.id == UsersCompetence.users_id)
+            .where(Users.admin.isnot(True))
+        ).all()
+
+        self.row_of = {user_id: row for row, user_id in enumerate(user_ids)}
+        self.user_ids = np.array(user_ids, dtype=np.int64)
+        self.active = np.ones(len(user_ids), dtype=bool)
+        self.rows = np.fromiter((self.row_of[e[0]] for e in entries), dtype=np.int32, count=len(entries))
+        self.cols = np.fromiter((self._column(e[1]) for e in entries), dtype=np.int32, count=len(entries))
+        self.vals = np.fromiter((e[2] for e in entries), dtype=np.float32, count=len(entries))
+        self.size = len(entries)
+        self.norms = np.sqrt(np.bincount(self.rows, weights=np.square(self.vals), minlength=len(user_ids))).astype(np.float32)
+        self._index_positions()
+        self.loaded = True
+
+    # Liest nur die markierten Nutzer neu (gelöschte Nutzer und Admins werden deaktiviert)
+    def _refresh(self, session, user_ids):
+        members = set(session.scalars(
+            db.select(Users.id).where(Users.id.in_(user_ids), Users.admin.isnot(True))
+        ))
+        levels = defaultdict(list)
+        for users_id, knowledge_skill_id, level in session.execute(
+            db.select(UsersCompetence.users_id, UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+            .where(UsersCompetence.users_id.in_(members))
+        ):
+            levels[users_id].append((knowledge_skill_id, level))
+
+        for user_id in user_ids:
+            if user_id in members:
+                self._set_user(user_id, levels.get(user_id, []))
+            else:
+                self._deactivate(user_id)
+        self._compact()
+
+    # Bringt den Index auf den aktuellen Stand (Aufrufer hält self.lock)
+    def _ensure_current(self):
+        if self.loaded and not self.stale:
+            return
+        with Session(get_read_engine() or db.engine) as session:
+            # Bei vielen geänderten Nutzern ist ein kompletter Neuaufbau günstiger als Einzelupdates
+            if not self.loaded or len(self.stale) > max(1000, len(self.user_ids) // 4):
+                self.stale.clear()
+                self._load(session)
+            else:
+                stale, self.stale = self.stale, set()
+                self._refresh(session, stale)
+
+    # Nach dem Commit: betroffene Nutzer (None = alle) vor der nächsten Abfrage neu lesen
+    def mark_stale(self, user_ids=None):
+        with self.lock:
+            if user_ids is None:
+                self.loaded = False
+            else:
+                self.stale.update(user_ids)
+
+    def _dense(self, values):
+        vector = np.zeros(len(self.skill_ids), dtype=np.float32)
+        for knowledge_skill_id, value in values.items():
+            col = self.col_of.get(knowledge_skill_id)
+            if col is not None:
+                vector[col] = value
+        return vector
+
+    def _top_k(self, scores, k, exclude):
+        scores = np.where(self.active, scores, -np.inf)
+        for user_id in exclude:
+            row = self.row_of.get(user_id)
+            if row is not None:
+                scores[row] = -np.inf
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        return sorted(candidates, key=lambda row: (-scores[row], self.user_ids[row]))
+
+    # Kosinus-Ähnlichkeit des Nutzers zu allen anderen; liefert die k ähnlichsten als ProfileMatch
+    def similar(self, user_id, k=PROFILE_TOP_K):
+        with self.lock:
+            self._ensure_current()
+            positions = self.positions.get(user_id)
+            row = self.row_of.get(user_id)
+            if positions is None or row is None or not self.active[row]:
+                return []
+
+            query = np.zeros(len(self.skill_ids), dtype=np.float32)
+            query[self.cols[positions]] = self.vals[positions]
+            rows, cols, vals = self.rows[:self.size], self.cols[:self.size], self.vals[:self.size]
+            dots = np.bincount(rows, weights=vals * query[cols], minlength=len(self.user_ids))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = np.nan_to_num(dots / (self.norms * self.norms[row]))
+
+            own_skills = set(self.cols[positions].tolist())
+            return [
+                ProfileMatch(int(self.user_ids[r]), round(float(scores[r]), 4), sorted(
+                    self.skill_ids[c] for c in set(self.cols[self.positions[int(self.user_ids[r])]].tolist()) & own_skills
+                ))
+                for r in self._top_k(scores, k, {user_id})
+            ]
+
+    # Gewichtete Überdeckung: needs = {knowledge_skill_id: (Soll-Level, Gewicht)}. Score je Nutzer =
+    # Σ Gewicht · min(Level, Soll) / Soll ÷ Σ Gewicht, also 1.0 = alle Bedarfe im Soll-Level erfüllt.
+    def best_candidates(self, needs, k=PROFILE_TOP_K, exclude=()):
+        with self.lock:
+            self._ensure_current()
+            if not needs:
+                return []
+
+            required = self._dense({skill_id: int(level) for skill_id, (level, _) in needs.items()})
+            weights = self._dense({skill_id: weight for skill_id, (_, weight) in needs.items()})
+            rows, cols, vals = self.rows[:self.size], self.cols[:self.size], self.vals[:self.size]
+            mask = (required[cols] > 0) & (vals > 0)
+            needed = required[cols[mask]]
+            gains = weights[cols[mask]] * np.minimum(vals[mask], needed) / needed
+            total = sum(weight for _, weight in needs.values())
+            scores = np.bincount(rows[mask], weights=gains, minlength=len(self.user_ids)) / total
+
+            matches = []
+            for r in self._top_k(scores, k, exclude):
+                positions = self.positions[int(self.user_ids[r])]
+                matches.append(ProfileMatch(int(self.user_ids[r]), round(float(scores[r]), 4), sorted(
+                    self.skill_ids[c] for c, v in zip(self.cols[positions].tolist(), self.vals[positions].tolist())
+                    if required[c] and v >= required[c]
+                )))
+            return matches
+
+
+_profile_index = SkillProfileIndex()
+
+
+# Bedarf für die Nachbesetzung, wenn user_id das Projekt verlässt: alle Anforderungen, die das übrige Team
+# nicht im Soll-Level abdeckt. Was erst durch den Weggang fehlt, zählt doppelt.
+# Rückgabe: {knowledge_skill_id: (Soll-Level, Gewicht)}
+def _backfill_needs(project_id, user_id):
+    anforderungen = _get_project_requirements(project_id)
+    team_levels = defaultdict(dict)  # {knowledge_skill_id: {user_id: Level}}
+    for users_id, knowledge_skill_id, level in db.session.execute(
+        db.select(UsersCompetence.users_id, UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+        .join(projekt_user, projekt_user.c.user_id == UsersCompetence.users_id)
+        .where(projekt_user.c.project_id == project_id, UsersCompetence.knowledge_skill_id.in_(anforderungen))
+    ):
+        team_levels[knowledge_skill_id][users_id] = level
+
+    needs = {}
+    for knowledge_skill_id, required in anforderungen.items():
+        required = required or CompetenceLevel.KENNER
+        levels = team_levels.get(knowledge_skill_id, {})
+        others = max((level for uid, level in levels.items() if uid != user_id), default=0)
+        if others >= required:
+            continue
+        lost = levels.get(user_id, 0) >= required
+        needs[knowledge_skill_id] = (required, 2 if lost else 1)
+    return needs
+
+
+def _describe_matches(matches):
+    names = dict(db.session.execute(
+        db.select(Users.id, Users.name).where(Users.id.in_([m.user_id for m in matches]))
+    ).all()) if matches else {}
+    skill_names = get_taxonomy().skill_names
+    return [
+        {
+            "id": m.user_id,
+            "name": names.get(m.user_id),
+            "score": m.score,
+            "skills": [{"id": skill_id, "name": skill_names.get(skill_id)} for skill_id in m.skill_ids],
+        }
+        for m in matches
+    ]
+
+
+# Ähnlichste Kolleginnen und Kollegen (Kosinus über die Kompetenzprofile), nur für Admins
+@app.route('/admin/aehnliche_nutzer/<int:user_id>', methods=['GET'])
+@login_required
+def aehnliche_nutzer(user_id):
+    if not current_user.admin:
+        abort(403)
+
+    db.get_or_404(Users, user_id)
+    k = min(max(request.args.get('k', PROFILE_TOP_K, type=int), 1), PROFILE_MAX_K)
+    return jsonify({
+        "user_id": user_id,
+        "similar": _describe_matches(_profile_index.similar(user_id, k)),
+    })
+
+
+# Beste Nachbesetzung, wenn user_id das Projekt verlässt (Teammitglieder sind ausgeschlossen), nur für Admins
+@app.route('/admin/nachbesetzung/<int:project_id>/<int:user_id>', methods=['GET'])
+@login_required
+def nachbesetzung(project_id, user_id):
+    if not current_user.admin:
+        abort(403)
+
+    db.get_or_404(Project, project_id)
+    db.get_or_404(Users, user_id)
+    k = min(max(request.args.get('k', PROFILE_TOP_K, type=int), 1), PROFILE_MAX_K)
+    needs = _backfill_needs(project_id, user_id)
+    team = set(db.session.scalars(db.select(projekt_user.c.user_id).where(projekt_user.c.project_id == project_id)))
+    skill_names = get_taxonomy().skill_names
+
+    return jsonify({
+        "project_id": project_id,
+        "user_id": user_id,
+        "needs": [
+            {"id": skill_id, "name": skill_names.get(skill_id), "level": level.label, "lost": weight > 1}
+            for skill_id, (level, weight) in needs.items()
+        ],
+        "candidates": _describe_matches(_profile_index.best_candidates(needs, k, exclude=team | {user_id})),
+    })
+
+
+# === PORTFOLIO-BESETZUNG ===
+# Besetzt alle aktiven Projekte gemeinsam unter einer Kapazitätsgrenze je Nutzer. Ziel ist die
+# Anzahl abgedeckter Anforderungen im Sinne von check_kompetenz_abdeckung (bestes Level im Team
+# mindestens Soll-Level). Das Ziel ist nicht additiv (mehrere Personen können dieselbe Anforderung
+# abdecken), deshalb wird in Runden optimiert: je Runde erhält jedes Projekt höchstens eine neue
+# Person, sodass der Zugewinn jeder Kante exakt ist, und die Runde wird als Zuordnungsproblem mit
+# minimalen Kosten (Kosten = -Zugewinn, Kapazität als Spaltenkopien) exakt gelöst.
+
+STAFFING_MAX_PROJECTS_PER_USER = 2  # Standard-Kapazität: aktive Projekte je Nutzer
+STAFFING_CANDIDATES_PER_PROJECT = 10  # Je Runde und Projekt nur die besten Kandidaten als Kanten
+STAFFING_MAX_ROUNDS = 20
+
+StaffingAssignment = namedtuple('StaffingAssignment', ['project_id', 'user_id', 'gain', 'round'])
+
+
+# Zuordnung mit minimalen Kosten für eine Matrix mit höchstens so vielen Zeilen wie Spalten
+# (kürzeste augmentierende Pfade mit Dualvariablen, vektorisiert je Schritt; np.inf = verbotene Kante).
+# Liefert je Zeile den Spaltenindex.
+def _min_cost_assignment(cost):
+    n_rows, n_cols = cost.shape
+    u = np.zeros(n_rows)
+    v = np.zeros(n_cols)
+    col_for_row = np.full(n_rows, -1, dtype=np.intp)
+    row_for_col = np.full(n_cols, -1, dtype=np.intp)
+
+    for current_row in range(n_rows):
+        shortest = np.full(n_cols, np.inf)
+        path = np.full(n_cols, -1, dtype=np.intp)
+        visited_rows = np.zeros(n_rows, dtype=bool)
+        visited_cols = np.zeros(n_cols, dtype=bool)
+        min_value = 0.0
+        row = current_row
+        sink = -1
+
+        while sink == -1:
+            visited_rows[row] = True
+            reduced = min_value + cost[row] - u[row] - v
+            improved = ~visited_cols & (reduced < shortest)
+            shortest[improved] = reduced[improved]
+            path[improved] = row
+
+            candidates = np.where(visited_cols, np.inf, shortest)
+            min_value = candidates.min()
+            if min_value == np.inf:
+                raise ValueError("Zuordnung nicht möglich")
+            # Bei Gleichstand eine freie Spalte bevorzugen (beendet die Suche)
+            ties = np.flatnonzero((candidates == min_value) & (row_for_col == -1))
+            col = ties[0] if len(ties) else int(candidates.argmin())
+            visited_cols[col] = True
+            if row_for_col[col] == -1:
+                sink = col
+            else:
+                row = row_for_col[col]
+
+        # Dualvariablen anpassen
+        u[current_row] += min_value
+        others = visited_rows.copy()
+        others[current_row] = False
+        u[others] += min_value - shortest[col_for_row[others]]
+        v[visited_cols] -= min_value - shortest[visited_cols]
+
+        # Zuordnung entlang des Pfads umlegen
+        col = sink
+        while True:
+            row = path[col]
+            row_for_col[col] = row
+            col_for_row[row], col = col, col_for_row[row]
+            if row == current_row:
+                break
+
+    return col_for_row
+
+
+class StaffingOptimizer:
+
+    def __init__(self, project_ids, user_ids, candidate_mask, user_levels, requirements, members, capacity):
+        self.project_ids = project_ids
+        self.user_ids = user_ids
+        self.candidate_mask = candidate_mask  # bool [Nutzer]: darf vorgeschlagen werden (keine Admins)
+        self.user_levels = user_levels  # uint8 [Nutzer × Wissen/Fähigkeiten]
+        self.requirements = requirements  # je Projekt (Spaltenindizes, benötigtes Level >= 1)
+        self.members = members  # je Projekt Menge der Nutzerindizes (bestehend + vorgeschlagen)
+        self.capacity = capacity
+
+        # Freie Kapazität je Nutzer: bestehende Zuweisungen auf aktive Projekte zählen mit
+        load = np.zeros(len(user_ids), dtype=np.int64)
+        for team in members:
+            for user in team:
+                load[user] += 1
+        self.remaining = np.maximum(capacity - load, 0)
+        self.covered = [self._covered(i) for i in range(len(project_ids))]
+        self.ampel_before = self.ampel()
+        self.assignments = []
+
+    # Lädt aktive Projekte, Anforderungen, Zuweisungen und die relevanten Nutzerlevel mit je einer Abfrage
+    @classmethod
+    def load(cls, capacity=STAFFING_MAX_PROJECTS_PER_USER):
+        project_ids = db.session.execute(
+            db.select(Project.id).where(_active_project_filter()).order_by(Project.id)
+        ).scalars().all()
+        active_ids = db.select(Project.id).where(_active_project_filter())
+
+        required = defaultdict(dict)  # {project_id: {knowledge_skill_id: Level}} (Maximum bei Duplikaten)
+        for project_id, skill_id, level in db.session.execute(
+            db.select(ProjectRequirement.project_id, ProjectRequirement.knowledge_skill_id,
+                      ProjectRequirement.competence_level)
+            .where(ProjectRequirement.project_id.in_(active_ids))
+        ):
+            required[project_id][skill_id] = max(required[project_id].get(skill_id, 0), level or 0)
+
+        users = db.session.execute(db.select(Users.id, Users.admin).order_by(Users.id)).all()
+        user_ids = [row.id for row in users]
+        user_index = {user_id: i for i, user_id in enumerate(user_ids)}
+        candidate_mask = np.array([not row.admin for row in users], dtype=bool)
+
+        skill_ids = sorted({skill_id for skills in required.values() for skill_id in skills})
+        skill_index = {skill_id: i for i, skill_id in enumerate(skill_ids)}
+        user_levels = np.zeros((len(user_ids), len(skill_ids)), dtype=np.uint8)
+        for users_id, skill_id, level in db.session.execute(
+            db.select(UsersCompetence.users_id, UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+            .where(UsersCompetence.knowledge_skill_id.in_(
+                db.select(ProjectRequirement.knowledge_skill_id).where(ProjectRequirement.project_id.in_(active_ids))
+            ))
+        ):
+            if users_id in user_index:
+                user_levels[user_index[users_id], skill_index[skill_id]] = level
+
+        project_index = {project_id: i for i, project_id in enumerate(project_ids)}
+        members = [set() for _ in project_ids]
+        for project_id, user_id in db.session.execute(
+            db.select(projekt_user.c.project_id, projekt_user.c.user_id)
+            .where(projekt_user.c.project_id.in_(active_ids))
+        ):
+            if project_id in project_index and user_id in user_index:
+                members[project_index[project_id]].add(user_index[user_id])
+
+        # Ohne Soll-Level genügt jedes vorhandene Level (>= 1)
+        requirements = [
+            (np.array([skill_index[s] for s in required[project_id]], dtype=np.intp),
+             np.array([max(level, 1) for level in required[project_id].values()], dtype=np.uint8))
+            for project_id in project_ids
+        ]
+        return cls(project_ids, np.array(user_ids), candidate_mask, user_levels, requirements, members, capacity)
+
+    def _covered(self, project):
+        cols, needed = self.requirements[project]
+        if not self.members[project] or not len(cols):
+            return np.zeros(len(cols), dtype=bool)
+        best = self.user_levels[list(self.members[project])][:, cols].max(axis=0)
+        return best >= needed
+
+    # Anzahl abgedeckter Anforderungen über alle aktiven Projekte
+    def covered_count(self):
+        return int(sum(covered.sum() for covered in self.covered))
+
+    def requirement_count(self):
+        return sum(len(cols) for cols, _ in self.requirements)
+
+    # Ampel je Projekt nach der Logik von check_kompetenz_abdeckung für den aktuellen (Vorschlags-)Stand
+    def ampel(self):
+        ampel = {}
+        for i, project_id in enumerate(self.project_ids):
+            cols, _ = self.requirements[i]
+            if not self.members[i]:
+                ampel[project_id] = "rot"
+            elif not len(cols) or self.covered[i].all():
+                ampel[project_id] = "gruen"
+            elif self.user_levels[list(self.members[i])][:, cols].max(axis=0).any():
+                ampel[project_id] = "gelb"
+            else:
+                ampel[project_id] = "rot"
+        return ampel
+
+    # Besten Kandidaten je Projekt mit ihrem Zugewinn an abgedeckten Anforderungen: {Projekt: [(Nutzer, Zugewinn)]}
+    def _round_candidates(self):
+        available = self.candidate_mask & (self.remaining > 0)
+        if not available.any():
+            return {}
+
+        candidates = {}
+        for i in range(len(self.project_ids)):
+            cols, needed = self.requirements[i]
+            open_requirements = ~self.covered[i]
+            if not open_requirements.any():
+                continue
+            gains = (self.user_levels[:, cols[open_requirements]] >= needed[open_requirements]).sum(axis=1)
+            gains[~available] = 0
+            gains[list(self.members[i])] = 0
+
+            k = min(STAFFING_CANDIDATES_PER_PROJECT, len(gains))
+            top = np.argpartition(-gains, k - 1)[:k]
+            top = top[gains[top] > 0]
+            if len(top):
+                candidates[i] = [(int(user), int(gains[user])) for user in top]
+        return candidates
+
+    # Eine Runde: je Projekt höchstens eine neue Person, Summe der Zugewinne maximal. Gibt die Anzahl Zuweisungen zurück.
+    def _solve_round(self, round_number):
+        candidates = self._round_candidates()
+        if not candidates:
+            return 0
+
+        # Spalten: je Nutzer so viele Kopien wie freie Kapazität (höchstens so viele, wie er Projekte bedienen kann)
+        demand = defaultdict(int)
+        for edges in candidates.values():
+            for user, _ in edges:
+                demand[user] += 1
+        columns = []
+        user_columns = {}
+        for user, count in demand.items():
+            copies = int(min(self.remaining[user], count))
+            user_columns[user] = range(len(columns), len(columns) + copies)
+            columns.extend([user] * copies)
+
+        rows = list(candidates)
+        # Zusätzlich eine kostenlose Dummy-Spalte je Projekt (Projekt bleibt in dieser Runde unbesetzt)
+        cost = np.full((len(rows), len(columns) + len(rows)), np.inf)
+        cost[:, len(columns):] = 0.0
+        for r, project in enumerate(rows):
+            for user, gain in candidates[project]:
+                cost[r, user_columns[user]] = -gain
+
+        assigned = 0
+        for r, col in enumerate(_min_cost_assignment(cost)):
+            if col >= len(columns):
+                continue
+            project, user = rows[r], columns[col]
+            gain = int(-cost[r, col])
+            self.members[project].add(user)
+            self.remaining[user] -= 1
+            self.covered[project] = self._covered(project)
+            self.assignments.append(StaffingAssignment(self.project_ids[project], int(self.user_ids[user]),
+                                                       gain, round_number))
+            assigned += 1
+        return assigned
+
+    # Optimiert, bis keine Runde mehr etwas verbessert; gibt die vorgeschlagenen Zuweisungen zurück
+    def optimize(self, max_rounds=STAFFING_MAX_ROUNDS):
+        for round_number in range(1, max_rounds + 1):
+            if not self._solve_round(round_number):
+                break
+        return self.assignments
+
+
+# Übernimmt ausgewählte Zuweisungen ("<project_id>:<user_id>") gesammelt; nur aktive Projekte,
+# keine Admins und keine bestehenden Zuweisungen. Gibt die Anzahl neuer Zuweisungen zurück.
+def _apply_staffing(pairs):
+    requested = set()
+    for pair in pairs:
+        try:
+            project_id, user_id = (int(part) for part in pair.split(':'))
+        except ValueError:
+            continue
+        requested.add((project_id, user_id))
+    if not requested:
+        return 0
+
+    project_ids = {project_id for project_id, _ in requested}
+    user_ids = {user_id for _, user_id in requested}
+    active = set(db.session.execute(
+        db.select(Project.id).where(Project.id.in_(project_ids), _active_project_filter())
+    ).scalars())
+    allowed_users = set(db.session.execute(
+        db.select(Users.id).where(Users.id.in_(user_ids), Users.admin.isnot(True))
+    ).scalars())
+    existing = set(db.session.execute(
+        db.select(projekt_user.c.project_id, projekt_user.c.user_id)
+        .where(projekt_user.c.project_id.in_(project_ids))
+    ).tuples())
+
+    rows = [
+        {"project_id": project_id, "user_id": user_id}
+        for project_id, user_id in sorted(requested - existing)
+        if project_id in active and user_id in allowed_users
+    ]
+    if rows:
+        db.session.execute(projekt_user.insert(), rows)
+        refresh_project_coverage({row["project_id"] for row in rows})
+    return len(rows)
+
+
+# Übernimmt die ausgewählten Zuweisungen in einer eigenen Transaktion
+@retry_on_db_lock
+def commit_staffing(pairs):
+    assigned = _apply_staffing(pairs)
+    db.session.commit()
+    return assigned
+
+
+# Portfolio-Besetzung: Vorschlag berechnen, prüfen und gesammelt übernehmen (nur für Admins)
+@app.route('/admin/staffing', methods=['GET', 'POST'])
+@login_required
+def staffing():
+    if not current_user.admin:
+        return redirect(url_for('dashboard'))
+
+    form = AdminCompetenceForm()
+    capacity = request.values.get('capacity', STAFFING_MAX_PROJECTS_PER_USER, type=int)
+    capacity = min(max(capacity, 1), 20)
+
+    if request.method == 'POST' and form.validate_on_submit() and request.form.get('action') == 'apply':
+        assigned = commit_staffing(request.form.getlist('assignments[]'))
+        flash(f'{assigned} Zuweisung(en) wurden übernommen.', 'success')
+        return redirect(url_for('staffing', capacity=capacity))
+
+    proposal = None
+    if request.method == 'POST' and form.validate_on_submit():
+        optimizer = StaffingOptimizer.load(capacity)
+        covered_before = optimizer.covered_count()
+        assignments = optimizer.optimize()
+
+        names = dict(db.session.execute(db.select(Users.id, Users.name).where(
+            Users.id.in_({a.user_id for a in assignments})
+        )).all()) if assignments else {}
+        project_names = dict(db.session.execute(db.select(Project.id, Project.project_name).where(
+            Project.id.in_(optimizer.project_ids)
+        )).all())
+        ampel_after = optimizer.ampel()
+
+        by_project = defaultdict(list)
+        for assignment in assignments:
+            by_project[assignment.project_id].append({
+                "user_id": assignment.user_id,
+                "name": names.get(assignment.user_id),
+                "gain": assignment.gain,
+                "round": assignment.round,
+            })
+        proposal = {
+            "requirements": optimizer.requirement_count(),
+            "covered_before": covered_before,
+            "covered_after": optimizer.covered_count(),
+            "assignments": len(assignments),
+            "projects": [
+                {
+                    "id": project_id,
+                    "name": project_names.get(project_id),
+                    "ampel_before": optimizer.ampel_before[project_id],
+                    "ampel_after": ampel_after[project_id],
+                    "users": by_project[project_id],
+                }
+                for project_id in optimizer.project_ids if by_project[project_id]
+            ],
+        }
+
+    return render_template('staffing.html', form=form, capacity=capacity, proposal=proposal)
+
+# === KOMPETENZABDECKUNG ===
+
+# Abdeckungsbericht: Ampel und fehlende Kompetenzen je Projekt, entweder live aus einer
+# gruppierten Abfrage oder aus der materialisierten Tabelle project_coverage
+class CoverageReport:
+
+    def __init__(self, project_ids, rows, team_sizes):
+        self.ampel_info = {}
+        self.fehlende_kompetenzen = {}
+
+        rows_by_project = defaultdict(list)
+        for row in rows:
+            if row.knowledge_skill_id is not None:
+                rows_by_project[row.project_id].append(row)
+
+        for project_id in project_ids:
+            requirements = rows_by_project.get(project_id, [])
+            fehlende_namen = []
+            partially_covered = False
+
+            for row in requirements:
+                # Kompetenz fehlt komplett oder ist nur mit zu niedrigem Level vorhanden
+                if row.best_level is None or row.best_level < (row.required_level or 0):
+                    fehlende_namen.append(row.skill_name or f"Unbekannt (ID {row.knowledge_skill_id})")
+                if row.best_level is not None:
+                    partially_covered = True
+
+            self.fehlende_kompetenzen[project_id] = fehlende_namen
+
+            # Ampel-Logik: ohne Nutzer rot, ohne Anforderungen grün, sonst nach Abdeckung
+            if team_sizes.get(project_id, 0) == 0:
+                self.ampel_info[project_id] = "rot"
+            elif not requirements or not fehlende_namen:
+                self.ampel_info[project_id] = "gruen"
+            elif partially_covered:
+                self.ampel_info[project_id] = "gelb"
+            else:
+                self.ampel_info[project_id] = "rot"
+
+    # Live-Berechnung aus einer gruppierten Abfrage über projekt_user, users_competence und project_requirement
+    @classmethod
+    def load(cls, projekte):
+        project_ids = [projekt.id for projekt in projekte]
+
+        # MAX über das Level aller zugewiesenen Nutzer je Projekt und Wissen/Fähigkeit
+        rows = db.session.execute(
+            db.select(
+                Project.id.label('project_id'),
+                ProjectRequirement.knowledge_skill_id,
+                KnowledgeSkills.name.label('skill_name'),
+                db.func.max(ProjectRequirement.competence_level).label('required_level'),
+                db.func.max(UsersCompetence.competence_level).label('best_level'),
+                db.func.count(db.distinct(projekt_user.c.user_id)).label('team_size'),
+            )
+            .select_from(Project)
+            .outerjoin(ProjectRequirement, ProjectRequirement.project_id == Project.id)
+            .outerjoin(KnowledgeSkills, KnowledgeSkills.id == ProjectRequirement.knowledge_skill_id)
+            .outerjoin(projekt_user, projekt_user.c.project_id == Project.id)
+            .outerjoin(UsersCompetence, db.and_(
+                UsersCompetence.users_id == projekt_user.c.user_id,
+                UsersCompetence.knowledge_skill_id == ProjectRequirement.knowledge_skill_id
+            ))
+            .where(Project.id.in_(project_ids))
+            .group_by(Project.id, ProjectRequirement.knowledge_skill_id)
+            .order_by(Project.id, db.func.min(ProjectRequirement.id))
+        ).all()
+        team_sizes = {row.project_id: row.team_size for row in rows}
+        return cls(project_ids, rows, team_sizes)
+
+    # Indizierter Lesezugriff auf die materialisierte Tabelle project_coverage
+    @classmethod
+    def from_coverage_table(cls, projekte):
+        project_ids = [projekt.id for projekt in projekte]
+
+        rows = db.session.execute(
+            db.select(
+                ProjectCoverage.project_id,
+                ProjectCoverage.knowledge_skill_id,
+                KnowledgeSkills.name.label('skill_name'),
+                ProjectCoverage.required_level,
+                ProjectCoverage.best_level,
+            )
+            .outerjoin(KnowledgeSkills, KnowledgeSkills.id == ProjectCoverage.knowledge_skill_id)
+            .where(ProjectCoverage.project_id.in_(project_ids))
+            .order_by(ProjectCoverage.project_id, ProjectCoverage.knowledge_skill_id)
+        ).all()
+        team_sizes = dict(db.session.execute(
+            db.select(projekt_user.c.project_id, db.func.count())
+            .where(projekt_user.c.project_id.in_(project_ids))
+            .group_by(projekt_user.c.project_id)
+        ).all())
+        return cls(project_ids, rows, team_sizes)
+
+
+# Filter für Projekte, die noch nicht abgeschlossen sind (Status ist bei aktiven Projekten leer)
+def _active_project_filter():
+    return db.or_(Project.status.is_(None), Project.status != 'Abgeschlossen')
+
+# Gruppierte Abfrage: Soll-Level und bestes Level der zugewiesenen Nutzer je Projekt und Wissen/Fähigkeit
+def _coverage_select(project_ids, skill_ids=None):
+    query = (
+        db.select(
+            ProjectRequirement.project_id,
+            ProjectRequirement.knowledge_skill_id,
+            db.func.max(ProjectRequirement.competence_level),
+            db.func.max(UsersCompetence.competence_level),
+        )
+        .outerjoin(projekt_user, projekt_user.c.project_id == ProjectRequirement.project_id)
+        .outerjoin(UsersCompetence, db.and_(
+            UsersCompetence.users_id == projekt_user.c.user_id,
+            UsersCompetence.knowledge_skill_id == ProjectRequirement.knowledge_skill_id
+        ))
+        .where(ProjectRequirement.project_id.in_(project_ids))
+        .group_by(ProjectRequirement.project_id, ProjectRequirement.knowledge_skill_id)
+    )
+    if skill_ids is not None:
+        query = query.where(ProjectRequirement.knowledge_skill_id.in_(skill_ids))
+    return query
+
+# Berechnet die materialisierte Abdeckung für Projekte neu (optional nur für einzelne Wissen/Fähigkeiten).
+# Läuft in der Transaktion des Aufrufers; abgeschlossene Projekte werden nicht mehr gepflegt.
+def refresh_project_coverage(project_ids, skill_ids=None):
+    project_ids = list(project_ids)
+    if not project_ids or (skill_ids is not None and not skill_ids):
+        return
+
+    db.session.flush()
+    active_ids = db.select(Project.id).where(Project.id.in_(project_ids), _active_project_filter())
+
+    delete = db.delete(ProjectCoverage).where(ProjectCoverage.project_id.in_(project_ids))
+    if skill_ids is not None:
+        delete = delete.where(ProjectCoverage.knowledge_skill_id.in_(skill_ids))
+    db.session.execute(delete)
+
+    db.session.execute(
+        db.insert(ProjectCoverage).from_select(
+            ['project_id', 'knowledge_skill_id', 'required_level', 'best_level'],
+            _coverage_select(active_ids, skill_ids)
+        )
+    )
+
+# Aktualisiert die Abdeckung aller aktiven Projekte eines Nutzers nach Änderung seiner Kompetenzen
+def refresh_user_project_coverage(user_id, skill_ids):
+    project_ids = db.session.execute(
+        db.select(projekt_user.c.project_id)
+        .join(Project, Project.id == projekt_user.c.project_id)
+        .where(projekt_user.c.user_id == user_id, _active_project_filter())
+    ).scalars().all()
+    refresh_project_coverage(project_ids, skill_ids)
+
+# Soll-Zustand der Tabelle project_coverage für alle aktiven Projekte
+def _expected_project_coverage():
+    active_ids = db.select(Project.id).where(_active_project_filter())
+    return _coverage_select(active_ids)
+
+
+# CLI: materialisierte Abdeckung komplett neu aufbauen bzw. auf Abweichungen prüfen
+@app.cli.command('coverage-rebuild')
+@click.option('--check', is_flag=True, help='Nur auf Abweichungen prüfen, nichts schreiben.')
+def coverage_rebuild_command(check):
+    expected = {tuple(row[:2]): tuple(row[2:]) for row in db.session.execute(_expected_project_coverage())}
+
+    if check:
+        stored = {
+            (row.project_id, row.knowledge_skill_id): (row.required_level, row.best_level)
+            for row in ProjectCoverage.query
+        }
+        drift = sorted(set(expected) ^ set(stored) | {
+            key for key in set(expected) & set(stored) if expected[key] != stored[key]
+        })
+        for project_id, skill_id in drift:
+            click.echo(f"Projekt {project_id}, Wissen/Fähigkeit {skill_id}: "
+                       f"erwartet {expected.get((project_id, skill_id))}, "
+                       f"gespeichert {stored.get((project_id, skill_id))}")
+        click.echo(f"{len(drift)} Abweichung(en) in project_coverage gefunden.")
+        sys.exit(1 if drift else 0)
+
+    rebuild_project_coverage()
+    db.session.commit()
+    click.echo(f"project_coverage neu aufgebaut: {len(expected)} Zeile(n).")
+
+# Baut project_coverage in der Transaktion des Aufrufers komplett neu auf
+def rebuild_project_coverage():
+    db.session.execute(db.delete(ProjectCoverage))
+    db.session.execute(
+        db.insert(ProjectCoverage).from_select(
+            ['project_id', 'knowledge_skill_id', 'required_level', 'best_level'],
+            _expected_project_coverage()
+        )
+    )
+
+# Berechnet fehlende Kompetenzen für Projekte (inkl. Kompetenzen mit zu niedrigem Level)
+def _calculate_missing_competences(projekte):
+    return CoverageReport.load(projekte).fehlende_kompetenzen
+
+# Erstellt Mapping von Kompetenz-ID zu Gruppenname
+def _get_competence_to_group_mapping():
+    return get_taxonomy().skill_to_group
+
+
+# Ampel-Status eines Projekts; für viele Projekte einen gemeinsamen Bericht übergeben
+# (CoverageReport.load(projekte) bzw. from_coverage_table), statt je Projekt neu zu laden
+def check_kompetenz_abdeckung(projekt, report=None):
+    if report is None:
+        report = CoverageReport.load([projekt])
+    return report.ampel_info[projekt.id]
+
+
+# === HINTERGRUND-JOBS ===
+# Aufwändige Folgearbeiten (z. B. nach dem Abschließen eines Projekts) laufen nicht im Request,
+# sondern als Job. Jobs stehen in der Tabelle job und überleben damit Neustarts: enqueue_job()
+# legt sie in der Transaktion des Aufrufers an, sodass ein Job nur existiert, wenn auch die
+# auslösende Änderung committet wurde. Ein Worker übernimmt einen Job per bedingtem UPDATE
+# (status queued → running), das funktioniert auch mit mehreren Prozessen. Die Arbeit des Handlers
+# und der Abschluss des Jobs werden gemeinsam committet; bei einem Fehler wird alles zurückgerollt
+# und der Job mit exponentiell wachsender Wartezeit erneut eingeplant.
+#
+# Im Webprozess startet der JobRunner mit dem ersten Request (JOB_RUNNER_IN_PROCESS), alternativ
+# arbeitet "flask jobs-worker" die Warteschlange in einem eigenen Prozess ab.
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)
+
+_job_handlers = {}  # {kind: Funktion(**payload) → JSON-fähiges Ergebnis}
+_job_wakeup = threading.Event()  # Weckt den JobRunner nach einem Commit mit neuen Jobs
+_job_runner = None
+_job_runner_lock = threading.Lock()
+
+
+# Naive UTC-Zeit (SQLite speichert DateTime ohne Zeitzone)
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+# Registriert eine Funktion als Handler für einen Job-Typ
+def job_handler(kind):
+    def decorator(func):
+        _job_handlers[kind] = func
+        return func
+    return decorator
+
+
+# Legt einen Job in der aktuellen Session an (wird mit dem nächsten Commit sichtbar)
+def enqueue_job(kind, **payload):
+    if kind not in _job_handlers:
+        raise ValueError(f"Unbekannter Job-Typ: {kind}")
+
+    now = _utcnow()
+    job = Job(kind=kind, payload=payload, status=JOB_QUEUED, attempts=0,
+              max_attempts=app.config['JOB_MAX_ATTEMPTS'], run_after=now, created_at=now)
+    db.session.add(job)
+    db.session.info['jobs_enqueued'] = True
+    return job
+
+
+# Legt einen Job in einer eigenen Transaktion an und committet sofort
+@retry_on_db_lock
+def submit_job(kind, **payload):
+    job = enqueue_job(kind, **payload)
+    db.session.commit()
+    return job
+
+
+@db.event.listens_for(Session, 'after_commit')
+def _wake_job_runner(session):
+    if session.info.pop('jobs_enqueued', False):
+        _job_wakeup.set()
+
+
+@db.event.listens_for(Session, 'after_rollback')
+def _discard_job_wakeup(session):
+    session.info.pop('jobs_enqueued', None)
+
+
+# Wartezeit vor dem nächsten Versuch (5 s, 10 s, 20 s, ... bei JOB_RETRY_BASE_SECONDS = 5)
+def _job_retry_delay(attempts):
+    return timedelta(seconds=app.config['JOB_RETRY_BASE_SECONDS'] * 2 ** max(attempts - 1, 0))
+
+
+# Gibt Jobs frei, deren Worker abgestürzt ist (läuft länger als JOB_STALE_SECONDS)
+@retry_on_db_lock
+def _release_stale_jobs():
+    now = _utcnow()
+    db.session.execute(
+        db.update(Job)
+        .where(Job.status == JOB_RUNNING,
+               Job.started_at < now - timedelta(seconds=app.config['JOB_STALE_SECONDS']))
+        .values(
+            status=db.case((Job.attempts < Job.max_attempts, JOB_QUEUED), else_=JOB_FAILED),
+            finished_at=db.case((Job.attempts < Job.max_attempts, None), else_=now),
+            run_after=now,
+            last_error='Zeitüberschreitung: Worker hat den Job nicht abgeschlossen.',
+        )
+    )
+    db.session.commit()
+
 
-# Strukturiert Anforderungen hierarchisch
-def _structure_requirements(anforderungen):
-    strukturierte_anforderungen = {}
-    competence_groups = CompetenceGroup.query.options(
-        db.joinedload(CompetenceGroup.competences).joinedload(Competence.knowledge_skills)
+# Übernimmt den nächsten fälligen Job für den Worker und gibt seine ID zurück (None = nichts zu tun)
+@retry_on_db_lock
+def claim_next_job(worker):
+    now = _utcnow()
+    candidates = db.session.scalars(
+        db.select(Job.id)
+        .where(Job.status == JOB_QUEUED, Job.run_after <= now)
+        .order_by(Job.run_after, Job.id)
+        .limit(10)
     ).all()
 
-    for competence_group in competence_groups:
-        strukturierte_anforderungen[competence_group.name] = {}
-        for competence in competence_group.competences:
-            knowledge_skills_list = []
-            for knowledge_skill in competence.knowledge_skills:
-                if knowledge_skill.id in anforderungen:
-                    knowledge_skills_list.append({
-                        "id": knowledge_skill.id,
-                        "name": knowledge_skill.name,
-                        "level": anforderungen[knowledge_skill.id]
-                    })
-            if knowledge_skills_list:
-                strukturierte_anforderungen[competence_group.name][competence.name] = knowledge_skills_list
+    for job_id in candidates:
+        claimed = db.session.execute(
+            db.update(Job)
+            .where(Job.id == job_id, Job.status == JOB_QUEUED)
+            .values(status=JOB_RUNNING, attempts=Job.attempts + 1, started_at=now, worker=worker)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return job_id
+    return None
 
-    return strukturierte_anforderungen
 
+# Führt einen übernommenen Job aus; Fehler führen zu einer Wiederholung oder zum Status failed
+def run_job(job_id):
+    if app.config['CACHE_SYNC_ENABLED']:
+        _cache_sync.check()
+    job = db.session.get(Job, job_id)
+    if job is None or job.status != JOB_RUNNING:
+        return
+    kind = job.kind
+    handler = _job_handlers.get(kind)
+    try:
+        if handler is None:
+            raise LookupError(f"Kein Handler für Job-Typ {kind}")
+        job.result = handler(**job.payload)
+        job.status = JOB_DONE
+        job.finished_at = _utcnow()
+        job.last_error = None
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        app.logger.exception("Job %s (%s) fehlgeschlagen (Versuch %s)", job_id, kind, job.attempts)
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        if handler is not None and job.attempts < job.max_attempts:
+            job.status = JOB_QUEUED
+            job.run_after = _utcnow() + _job_retry_delay(job.attempts)
+        else:
+            job.status = JOB_FAILED
+            job.finished_at = _utcnow()
+        db.session.commit()
 
-# Vergleicht Benutzer-Skills mit Projektanforderungen
-def _compare_user_skills(all_users, anforderungen, level_map):
-    vergleich = []
-    
-    for user in all_users:
-        if user.admin:
-            continue
-        
-       
-        user_skills = {c.knowledge_skill_id: c.competence_level for c in user.competences}
-        skills_info = {}  
-
-        # Für jede Projektanforderung prüfen wie gut der Benutzer passt
-        for skill, projekt_level in anforderungen.items():
-            user_level = user_skills.get(skill)  
-            
-            nutzer_val = level_map.get(user_level, 0)
-            projekt_val = level_map.get(projekt_level, 0)
-
-            # Symbol basierend auf Kompetenz-Vergleich bestimmen
-            if user_level is None:
-                symbol = "❌"  # Nutzer hat diese Kompetenz gar nicht
-                user_level = "Nichts"
-            elif nutzer_val >= projekt_val:
-                symbol = "✅"  # Nutzer erfüllt Anforderung (richtige oder höhere Bewertungsgruppe)
-            else:
-                symbol = "⚠️"  # Nutzer hat die Kompetenz, aber in niedrigerer Bewertungsgruppe
 
-            skills_info[skill] = {
-                "user_level": user_level,
-                "projekt_level": projekt_level,
-                "symbol": symbol
-            }
+# Holt fällige Jobs aus der Tabelle und verteilt sie auf einen Thread-Pool
+class JobRunner:
 
-        # Nutzer mit seinen Kompetenz-Infos zur Vergleichsliste hinzufügen
-        vergleich.append({"user": user, "skills": skills_info})
-    
-    return vergleich
+    def __init__(self, app, workers):
+        self.app = app
+        self.worker = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dss-job')
+        self.slots = threading.Semaphore(workers)  # Nur so viele Jobs übernehmen, wie Threads frei sind
+        self.stopping = threading.Event()
+        self.thread = None
+        self.maintained_at = 0.0  # Zeitpunkt (monotonic) der letzten Wartung (abgebrochene Jobs, Snapshot)
 
-# Berechnet fehlende Kompetenzen für Projekte (inkl. Kompetenzen mit zu niedrigem Level)
-def _calculate_missing_competences(projekte):
-    fehlende_kompetenzen = {}
-    alle_knowledge_skills = {c.id: c.name for c in KnowledgeSkills.query.all()}
-    level_map = {"Kenner": 1, "Könner": 2, "Experte": 3}
-
-    for projekt in projekte:
-        # Sammle alle Anforderungen mit ihren Leveln
-        required_skills = {}
-        for requirement in projekt.requirements:
-            required_skills[requirement.knowledge_skill_id] = requirement.competence_level
-        
-        # Sammle alle Kompetenzen aller zugewiesenen Nutzer mit ihren höchsten Leveln
-        combined_user_skills = {}
-        if projekt.users:
-            for user in projekt.users:
-                user_competences = UsersCompetence.query.filter_by(users_id=user.id).all()
-                for competence in user_competences:
-                    skill_id = competence.knowledge_skill_id
-                    user_level = competence.competence_level
-                    
-                    # Behalte das höchste Level pro Kompetenz unter allen Nutzern
-                    if skill_id not in combined_user_skills:
-                        combined_user_skills[skill_id] = user_level
-                    else:
-                        current_level_val = level_map.get(combined_user_skills[skill_id], 0)
-                        new_level_val = level_map.get(user_level, 0)
-                        if new_level_val > current_level_val:
-                            combined_user_skills[skill_id] = user_level
-
-        # Prüfe welche Kompetenzen fehlen oder zu niedrig sind
-        fehlende_namen = []
-        for skill_id, required_level in required_skills.items():
-            skill_name = alle_knowledge_skills.get(skill_id, f"Unbekannt (ID {skill_id})")
-            
-            if skill_id not in combined_user_skills:
-                # Kompetenz fehlt komplett
-                fehlende_namen.append(f"{skill_name}")
-            else:
-                user_level = combined_user_skills[skill_id]
-                required_level_val = level_map.get(required_level, 0)
-                user_level_val = level_map.get(user_level, 0)
-                
-                if user_level_val < required_level_val:
-                    # Kompetenz ist vorhanden, aber Level zu niedrig
-                    fehlende_namen.append(f"{skill_name}")
-        
-        fehlende_kompetenzen[projekt.id] = fehlende_namen
+    def start(self):
+        self.thread = threading.Thread(target=self.dispatch, name='dss-job-dispatcher', daemon=True)
+        self.thread.start()
+        return self
 
-    return fehlende_kompetenzen
+    def stop(self):
+        self.stopping.set()
+        _job_wakeup.set()
+        self.executor.shutdown(wait=True)
 
-# Erstellt Mapping von Kompetenz-ID zu Gruppenname
-def _get_competence_to_group_mapping():
-    competence_to_group = {}
-    all_knowledge_skills = KnowledgeSkills.query.options(
-        db.joinedload(KnowledgeSkills.competence).joinedload(Competence.competence_group)
-    ).all()
-    
-    for knowledge_skill in all_knowledge_skills:
-        if knowledge_skill.competence and knowledge_skill.competence.competence_group:
-            competence_to_group[knowledge_skill.id] = knowledge_skill.competence.competence_group.name
-    
-    return competence_to_group
+    # Schleife des Dispatchers; mit once=True nur bis die Warteschlange (vorerst) leer ist
+    def dispatch(self, once=False):
+        while not self.stopping.is_set():
+            self.slots.acquire()
+            try:
+                with self.app.app_context():
+                    if time.monotonic() - self.maintained_at >= 60:
+                        _release_stale_jobs()
+                        schedule_analytics_snapshot()
+                        self.maintained_at = time.monotonic()
+                    job_id = claim_next_job(self.worker)
+            except Exception:
+                # z. B. Datenbank dauerhaft gesperrt: Slot freigeben und nach dem Abfrageintervall erneut versuchen
+                self.app.logger.exception("Job-Dispatcher %s: Abfrage der Warteschlange fehlgeschlagen", self.worker)
+                self.slots.release()
+                if once:
+                    break
+                self.stopping.wait(self.app.config['JOB_POLL_SECONDS'])
+                continue
 
+            if job_id is not None:
+                self.executor.submit(self._run, job_id)
+                continue
 
-# Berechnet Ampel-Status für Projektkompetenzen
-def check_kompetenz_abdeckung(projekt):
-    # Wenn keine Nutzer zugewiesen sind → Rot
-    if not projekt.users:
-        return "rot"
+            self.slots.release()
+            if once:
+                break
+            _job_wakeup.wait(self.app.config['JOB_POLL_SECONDS'])
+            _job_wakeup.clear()
+
+    def _run(self, job_id):
+        try:
+            with self.app.app_context():
+                run_job(job_id)
+        finally:
+            self.slots.release()
 
-    # Level-Mapping für Vergleiche
-    level_map = {"Kenner": 1, "Könner": 2, "Experte": 3}
-    
-    # Sammle alle Anforderungen mit ihren Leveln
-    required_skills = {}
-    for requirement in projekt.requirements:
-        required_skills[requirement.knowledge_skill_id] = requirement.competence_level
-    
-    if not required_skills:
-        return "gruen"  # Keine Anforderungen definiert
-    
-    # Sammle alle Kompetenzen aller zugewiesenen Nutzer mit ihren Leveln
-    combined_user_skills = {}
-    for user in projekt.users:
-        user_competences = UsersCompetence.query.filter_by(users_id=user.id).all()
-        for competence in user_competences:
-            skill_id = competence.knowledge_skill_id
-            user_level = competence.competence_level
-            
-            # Behalte das höchste Level pro Kompetenz unter allen Nutzern
-            if skill_id not in combined_user_skills:
-                combined_user_skills[skill_id] = user_level
-            else:
-                current_level_val = level_map.get(combined_user_skills[skill_id], 0)
-                new_level_val = level_map.get(user_level, 0)
-                if new_level_val > current_level_val:
-                    combined_user_skills[skill_id] = user_level
-    
-    # Prüfe jede Anforderung
-    fully_covered = True
-    partially_covered = False
-    
-    for skill_id, required_level in required_skills.items():
-        if skill_id not in combined_user_skills:
-            # Kompetenz fehlt komplett
-            fully_covered = False
-        else:
-            user_level = combined_user_skills[skill_id]
-            required_level_val = level_map.get(required_level, 0)
-            user_level_val = level_map.get(user_level, 0)
-            
-            if user_level_val >= required_level_val:
-                # Kompetenz ist ausreichend abgedeckt
-                partially_covered = True
-            else:
-                # Kompetenz ist vorhanden, aber Level zu niedrig
-                fully_covered = False
-                partially_covered = True
-    
-    # Ampel-Logik:
-    if fully_covered and len(required_skills) > 0:
-        return "gruen"  # Alle Anforderungen mit richtigem Level abgedeckt
-    elif partially_covered:
-        return "gelb"   # Teilweise abgedeckt oder Level zu niedrig
-    else:
-        return "rot"    # Keine Abdeckung
 
+# Startet den JobRunner des Prozesses (einmalig)
+def start_job_runner():
+    global _job_runner
+    with _job_runner_lock:
+        if _job_runner is None:
+            _job_runner = JobRunner(app, app.config['JOB_WORKERS']).start()
+    return _job_runner
 
 
+@app.before_request
+def _ensure_job_runner():
+    if _job_runner is None and app.config['JOB_RUNNER_IN_PROCESS'] and not app.testing:
+        start_job_runner()
+
+
+# CLI: Warteschlange in einem eigenen Prozess abarbeiten (--once: nur fällige Jobs, dann beenden)
+@app.cli.command('jobs-worker')
+@click.option('--workers', type=int, default=None, help='Anzahl Threads (Standard: JOB_WORKERS).')
+@click.option('--once', is_flag=True, help='Nur die aktuell fälligen Jobs abarbeiten und beenden.')
+def jobs_worker_command(workers, once):
+    runner = JobRunner(app, workers or app.config['JOB_WORKERS'])
+    click.echo(f"Job-Worker {runner.worker} gestartet.")
+    try:
+        runner.dispatch(once=once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        runner.stop()
+    click.echo("Job-Worker beendet.")
+
+
+def _describe_job(job):
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "payload": job.payload,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "run_after": job.run_after.isoformat() + 'Z',
+        "created_at": job.created_at.isoformat() + 'Z',
+        "started_at": job.started_at.isoformat() + 'Z' if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() + 'Z' if job.finished_at else None,
+        "last_error": job.last_error,
+        "result": job.result,
+        "status_url": url_for('job_status', job_id=job.id),
+    }
+
+
+# Letzte Jobs als JSON (nur für Admins), z. B. /admin/jobs?status=failed&limit=20
+@app.route('/admin/jobs', methods=['GET'])
+@login_required
+def job_list():
+    if not current_user.admin:
+        abort(403)
+
+    limit = min(max(request.args.get('limit', 50, type=int), 1), 200)
+    query = db.select(Job).order_by(Job.id.desc()).limit(limit)
+    status = request.args.get('status')
+    if status in JOB_STATUSES:
+        query = query.where(Job.status == status)
+    return jsonify({"jobs": [_describe_job(job) for job in db.session.scalars(query)]})
+
+
+# Status eines Jobs als JSON (nur für Admins)
+@app.route('/admin/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    if not current_user.admin:
+        abort(403)
+    return jsonify(_describe_job(db.get_or_404(Job, job_id)))
+
+
+# Setzt einen fehlgeschlagenen Job mit vollem Kontingent an Versuchen zurück in die Warteschlange
+# (eigene Transaktion). Gibt (Job oder None, neu eingeplant ja/nein) zurück.
+@retry_on_db_lock
+def requeue_failed_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None or job.status != JOB_FAILED:
+        return job, False
+
+    job.status = JOB_QUEUED
+    job.attempts = 0
+    job.run_after = _utcnow()
+    job.finished_at = None
+    db.session.info['jobs_enqueued'] = True
+    db.session.commit()
+    return job, True
+
+
+# Fehlgeschlagenen Job erneut einplanen (mit vollem Kontingent an Versuchen)
+@app.route('/admin/jobs/<int:job_id>/retry', methods=['POST'])
+@login_required
+def job_retry(job_id):
+    if not current_user.admin:
+        abort(403)
+    form = AdminCompetenceForm()
+    if not form.validate_on_submit():
+        abort(400)
+
+    job, requeued = requeue_failed_job(job_id)
+    if job is None:
+        abort(404)
+    if not requeued:
+        return jsonify({"error": "Nur fehlgeschlagene Jobs können wiederholt werden.", **_describe_job(job)}), 409
+    return jsonify(_describe_job(job)), 202
+
+
+# project_coverage im Hintergrund komplett neu aufbauen (nur für Admins)
+@app.route('/admin/jobs/coverage-rebuild', methods=['POST'])
+@login_required
+def job_coverage_rebuild():
+    if not current_user.admin:
+        abort(403)
+    form = AdminCompetenceForm()
+    if not form.validate_on_submit():
+        abort(400)
+
+    job = submit_job('coverage_rebuild')
+    return jsonify(_describe_job(job)), 202
+
+
+# Folgearbeiten nach dem Abschließen eines Projekts: Team zur Aktualisierung der Kompetenzen
+# auffordern und das Projekt aus project_coverage entfernen
+@job_handler('projekt_abschluss')
+def _job_projekt_abschluss(project_id):
+    team = db.select(projekt_user.c.user_id).where(projekt_user.c.project_id == project_id)
+    flagged = db.session.execute(
+        db.update(Users)
+        .where(Users.id.in_(team), Users.admin.isnot(True))
+        .values(should_update_competences=True)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    refresh_project_coverage([project_id])
+    return {"users_flagged": flagged}
+
+
+@job_handler('coverage_rebuild')
+def _job_coverage_rebuild():
+    rebuild_project_coverage()
+    return {"rows": db.session.scalar(db.select(db.func.count()).select_from(ProjectCoverage))}
+
+
+# Schließt ein Projekt ab und plant die Folgearbeiten ein (eine Transaktion). Gibt den Projektnamen
+# zurück bzw. None, wenn es das Projekt nicht gibt.
+@retry_on_db_lock
+def close_project(project_id, notiz):
+    projekt = db.session.get(Project, project_id)
+    if projekt is None:
+        return None
+
+    projekt.status = 'Abgeschlossen'
+    projekt.notiz = notiz
+    projekt.closed_at = _utcnow()
+    index_project_fts([projekt.id])  # Notiz ist jetzt durchsuchbar
+
+    # Benachrichtigung des Teams und Abdeckung laufen im Hintergrund (gleiche Transaktion wie der Status)
+    enqueue_job('projekt_abschluss', project_id=projekt.id)
+    project_name = projekt.project_name
+    db.session.commit()
+    return project_name
+
 # Projekt abschließen
 @app.route('/projekt_abschliessen', methods=['POST'])
 @login_required
@@ -663,40 +3653,638 @@ def projekt_abschliessen():
         flash('Ungültige Anfrage.', 'error')
         return redirect(url_for('admin'))
         
-    project_id = request.form.get('project_id')  
-    notiz = request.form.get('notiz')  
+    project_id = request.form.get('project_id', type=int)
+    notiz = request.form.get('notiz')
 
     if not project_id:
-        return redirect(url_for('admin')) 
-    
- 
-    projekt = Project.query.get(project_id)
-    if projekt:
-        projekt.status = 'Abgeschlossen' 
-        projekt.notiz = notiz  
-        
-        # Flag für alle zugewiesenen Mitarbeiter setzen, dass sie ihre Kompetenzen aktualisieren sollen
-        for user in projekt.users:
-            if not user.admin:
-                user.should_update_competences = True
-        
-        db.session.commit()
-        flash(f'Projekt "{projekt.project_name}" wurde erfolgreich abgeschlossen.', 'success')
-    
+        return redirect(url_for('admin'))
+
+    project_name = close_project(project_id, notiz)
+    if project_name is not None:
+        flash(f'Projekt "{project_name}" wurde erfolgreich abgeschlossen.', 'success')
+
     return redirect(url_for('admin'))
 
-# History-Route: Zeigt abgeschlossene Projekte
+# === KOMPETENZLÜCKEN-ANALYSE ===
+# Organisationsweite Sicht über alle aktiven Projekte: welche Wissen/Fähigkeiten und Kompetenzgruppen
+# am häufigsten unterdeckt sind, wie viele Personen welches Level haben und wo nur eine (oder keine)
+# Person das geforderte Level erreicht (Konzentrationsrisiko). Die aktuelle Analyse entsteht aus drei
+# gruppierten Abfragen (project_coverage, users_competence und ein Join beider). Für Trends werden
+# kompakte Snapshots gespeichert (ein Kopfsatz plus eine Zeile je relevantem Skill), automatisch
+# höchstens alle ANALYTICS_SNAPSHOT_INTERVAL_HOURS als Hintergrund-Job (eingeplant vom JobRunner)
+# oder per "flask analytics-snapshot".
+
+ANALYTICS_TOP_SKILLS = 20  # Zeilen in den Ranglisten der Analyse-Seite
+
+SkillGap = namedtuple('SkillGap', [
+    'knowledge_skill_id', 'required', 'undercovered', 'required_level', 'holders', 'qualified',
+])  # holders: {CompetenceLevel: Anzahl Personen}
+GroupGap = namedtuple('GroupGap', ['id', 'name', 'required', 'undercovered', 'single_holder_skills', 'unheld_skills'])
+
+
+class SkillGapAnalysis:
+
+    def __init__(self, active_projects, skills):
+        self.active_projects = active_projects
+        self.skills = skills  # {knowledge_skill_id: SkillGap}
+
+    # Berechnet die Analyse mit gruppierten Abfragen (keine Schleifen über Projekte oder Nutzer)
+    @classmethod
+    def compute(cls):
+        undercovered = db.or_(
+            ProjectCoverage.best_level.is_(None),
+            ProjectCoverage.best_level < db.func.coalesce(ProjectCoverage.required_level, 0),
+        )
+        demand = (
+            db.select(
+                ProjectCoverage.knowledge_skill_id,
+                db.func.count().label('required'),
+                db.func.sum(db.case((undercovered, 1), else_=0)).label('undercovered'),
+                db.func.max(ProjectCoverage.required_level).label('required_level'),
+            )
+            .group_by(ProjectCoverage.knowledge_skill_id)
+            .subquery()
+        )
+
+        skills = {}
+        for row in db.session.execute(db.select(demand)):
+            skills[row.knowledge_skill_id] = SkillGap(
+                row.knowledge_skill_id, row.required, row.undercovered or 0,
+                CompetenceLevel(row.required_level) if row.required_level else None, {}, 0,
+            )
+
+        # Personen je Wissen/Fähigkeit und Level (ohne Admins)
+        for knowledge_skill_id, level, count in db.session.execute(
+            db.select(UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level, db.func.count())
+            .join(Users, Users.id == UsersCompetence.users_id)
+            .where(Users.admin.isnot(True))
+            .group_by(UsersCompetence.knowledge_skill_id, UsersCompetence.competence_level)
+        ):
+            gap = skills.get(knowledge_skill_id)
+            if gap is None:
+                gap = skills[knowledge_skill_id] = SkillGap(knowledge_skill_id, 0, 0, None, {}, None)
+            gap.holders[level] = count
+
+        # Personen, die das höchste geforderte Level erreichen
+        for knowledge_skill_id, qualified in db.session.execute(
+            db.select(demand.c.knowledge_skill_id, db.func.count())
+            .join(UsersCompetence, db.and_(
+                UsersCompetence.knowledge_skill_id == demand.c.knowledge_skill_id,
+                UsersCompetence.competence_level >= db.func.coalesce(demand.c.required_level, 0),
+            ))
+            .join(Users, Users.id == UsersCompetence.users_id)
+            .where(Users.admin.isnot(True))
+            .group_by(demand.c.knowledge_skill_id)
+        ):
+            skills[knowledge_skill_id] = skills[knowledge_skill_id]._replace(qualified=qualified)
+
+        active_projects = db.session.scalar(
+            db.select(db.func.count()).select_from(Project).where(_active_project_filter())
+        )
+        return cls(active_projects, skills)
+
+    @property
+    def requirements(self):
+        return sum(gap.required for gap in self.skills.values())
+
+    @property
+    def undercovered(self):
+        return sum(gap.undercovered for gap in self.skills.values())
+
+    def concentration_risks(self):
+        return [gap for gap in self.skills.values() if gap.required and gap.qualified <= 1]
+
+    # Geforderte Wissen/Fähigkeiten, absteigend nach Anzahl unterdeckter Projekte
+    def top_undercovered(self, limit=ANALYTICS_TOP_SKILLS):
+        gaps = [gap for gap in self.skills.values() if gap.undercovered]
+        return heapq.nsmallest(limit, gaps, key=lambda g: (-g.undercovered, -g.required, g.knowledge_skill_id))
+
+    # Aggregation je Kompetenzgruppe über die Taxonomie, absteigend nach unterdeckten Anforderungen
+    def groups(self, taxonomy):
+        totals = {}
+        for gap in self.skills.values():
+            skill = taxonomy.skills.get(gap.knowledge_skill_id)
+            if skill is None or not gap.required:
+                continue
+            group = taxonomy.groups_by_id[taxonomy.competences[skill.competence_id].competence_group_id]
+            current = totals.get(group.id, GroupGap(group.id, group.name, 0, 0, 0, 0))
+            totals[group.id] = current._replace(
+                required=current.required + gap.required,
+                undercovered=current.undercovered + gap.undercovered,
+                single_holder_skills=current.single_holder_skills + (gap.qualified == 1),
+                unheld_skills=current.unheld_skills + (gap.qualified == 0),
+            )
+        return sorted(totals.values(), key=lambda g: (-g.undercovered, -g.required, g.name))
+
+    # Speichert die Analyse als Snapshot in der Transaktion des Aufrufers
+    def store_snapshot(self):
+        risks = self.concentration_risks()
+        snapshot = AnalyticsSnapshot(
+            taken_at=_utcnow(),
+            active_projects=self.active_projects,
+            requirements=self.requirements,
+            undercovered=self.undercovered,
+            single_holder_skills=sum(1 for gap in risks if gap.qualified == 1),
+            unheld_skills=sum(1 for gap in risks if gap.qualified == 0),
+        )
+        db.session.add(snapshot)
+        db.session.flush()
+        if not self.skills:
+            return snapshot
+        db.session.execute(db.insert(SkillGapSnapshot), [
+            {
+                "snapshot_id": snapshot.id,
+                "knowledge_skill_id": gap.knowledge_skill_id,
+                "required": gap.required,
+                "undercovered": gap.undercovered,
+                "kenner": gap.holders.get(CompetenceLevel.KENNER, 0),
+                "koenner": gap.holders.get(CompetenceLevel.KOENNER, 0),
+                "experte": gap.holders.get(CompetenceLevel.EXPERTE, 0),
+                "qualified": gap.qualified,
+            }
+            for gap in self.skills.values()
+        ])
+        return snapshot
+
+
+@job_handler('analytics_snapshot')
+def _job_analytics_snapshot():
+    analyse = SkillGapAnalysis.compute()
+    snapshot = analyse.store_snapshot()
+    return {"snapshot_id": snapshot.id, "skills": len(analyse.skills)}
+
+
+# Plant einen Snapshot ein, wenn der letzte älter als das Intervall ist und keiner ansteht
+# (aufgerufen vom Dispatcher des JobRunners, nicht aus den lesenden Analyse-Routen)
+@retry_on_db_lock
+def schedule_analytics_snapshot():
+    latest = db.session.scalar(db.select(db.func.max(AnalyticsSnapshot.taken_at)))
+    due = _utcnow() - timedelta(hours=app.config['ANALYTICS_SNAPSHOT_INTERVAL_HOURS'])
+    if latest is not None and latest > due:
+        return None
+
+    pending = db.session.scalar(
+        db.select(Job.id).where(Job.kind == 'analytics_snapshot', Job.status.in_((JOB_QUEUED, JOB_RUNNING))).limit(1)
+    )
+    if pending is not None:
+        return None
+
+    job = enqueue_job('analytics_snapshot')
+    db.session.commit()
+    return job
+
+
+# Verlauf der Kopfzahlen, optional zusätzlich die Reihe eines Skills: [{...}] aufsteigend nach Zeit
+def _analytics_trend(knowledge_skill_id=None, limit=365):
+    snapshots = db.session.execute(
+        db.select(AnalyticsSnapshot).order_by(AnalyticsSnapshot.taken_at.desc()).limit(limit)
+    ).scalars().all()[::-1]
+
+    per_skill = {}
+    if knowledge_skill_id is not None and snapshots:
+        per_skill = {
+            row.snapshot_id: row
+            for row in db.session.scalars(
+                db.select(SkillGapSnapshot).where(
+                    SkillGapSnapshot.knowledge_skill_id == knowledge_skill_id,
+                    SkillGapSnapshot.snapshot_id >= snapshots[0].id,
+                )
+            )
+        }
+
+    trend = []
+    for snapshot in snapshots:
+        point = {
+            "taken_at": snapshot.taken_at.isoformat() + 'Z',
+            "active_projects": snapshot.active_projects,
+            "requirements": snapshot.requirements,
+            "undercovered": snapshot.undercovered,
+            "single_holder_skills": snapshot.single_holder_skills,
+            "unheld_skills": snapshot.unheld_skills,
+        }
+        if knowledge_skill_id is not None:
+            row = per_skill.get(snapshot.id)
+            point["skill"] = None if row is None else {
+                "required": row.required,
+                "undercovered": row.undercovered,
+                "holders": {"Kenner": row.kenner, "Könner": row.koenner, "Experte": row.experte},
+                "qualified": row.qualified,
+            }
+        trend.append(point)
+    return trend
+
+
+def _describe_skill_gap(gap, taxonomy):
+    return {
+        "id": gap.knowledge_skill_id,
+        "name": taxonomy.skill_names.get(gap.knowledge_skill_id, f"Unbekannt (ID {gap.knowledge_skill_id})"),
+        "group": taxonomy.skill_to_group.get(gap.knowledge_skill_id),
+        "required": gap.required,
+        "undercovered": gap.undercovered,
+        "required_level": gap.required_level.label if gap.required_level else None,
+        "holders": {level.label: gap.holders.get(level, 0) for level in CompetenceLevel},
+        "qualified": gap.qualified,
+    }
+
+
+# Analyse-Seite (nur für Admins)
+@app.route('/admin/analytics', methods=['GET'])
+@login_required
+@read_only_db
+def analytics():
+    if not current_user.admin:
+        return redirect(url_for('dashboard'))
+
+    taxonomy = get_taxonomy()
+    analyse = SkillGapAnalysis.compute()
+    risiken = sorted(analyse.concentration_risks(), key=lambda g: (g.qualified, -g.required, g.knowledge_skill_id))
+
+    return render_template(
+        'analytics.html',
+        analyse=analyse,
+        gruppen=analyse.groups(taxonomy),
+        top_skills=[_describe_skill_gap(gap, taxonomy) for gap in analyse.top_undercovered()],
+        risiken=[_describe_skill_gap(gap, taxonomy) for gap in risiken[:ANALYTICS_TOP_SKILLS]],
+        risiken_gesamt=len(risiken),
+        einzelpersonen=sum(1 for gap in risiken if gap.qualified == 1),
+        trend=_analytics_trend(limit=52),
+    )
+
+
+# Analyse als JSON (nur für Admins), z. B. /admin/analytics/json?skill=12 für die Trendreihe eines Skills
+@app.route('/admin/analytics/json', methods=['GET'])
+@login_required
+@read_only_db
+def analytics_json():
+    if not current_user.admin:
+        abort(403)
+
+    taxonomy = get_taxonomy()
+    analyse = SkillGapAnalysis.compute()
+    return jsonify({
+        "active_projects": analyse.active_projects,
+        "requirements": analyse.requirements,
+        "undercovered": analyse.undercovered,
+        "groups": [group._asdict() for group in analyse.groups(taxonomy)],
+        "skills": [
+            _describe_skill_gap(gap, taxonomy)
+            for gap in sorted(analyse.skills.values(), key=lambda g: (-g.undercovered, -g.required, g.knowledge_skill_id))
+        ],
+        "concentration_risks": [gap.knowledge_skill_id for gap in analyse.concentration_risks()],
+        "trend": _analytics_trend(request.args.get('skill', type=int)),
+    })
+
+
+# CLI: Snapshot sofort speichern (z. B. per Cron), unabhängig vom Intervall
+@app.cli.command('analytics-snapshot')
+def analytics_snapshot_command():
+    analyse = SkillGapAnalysis.compute()
+    snapshot = analyse.store_snapshot()
+    db.session.commit()
+    click.echo(f"Snapshot {snapshot.id} gespeichert ({len(analyse.skills)} Wissen/Fähigkeiten).")
+
+
+# === KOMPETENZHISTORIE ===
+# competence_change protokolliert jede Leveländerung (alt → neu) mit Zeitstempel. Der Stand zu einem
+# Zeitpunkt ist je Nutzer und Wissen/Fähigkeit die letzte Änderung bis dahin; über den Index
+# (users_id, knowledge_skill_id, changed_at) werden dafür nur die Einträge der gefragten Nutzer und
+# Skills gelesen. IDs steigen mit der Zeit, die letzte Änderung ist deshalb die mit der größten ID.
+# Der bei Einführung des Protokolls vorhandene Stand ist mit 1970-01-01 eingetragen (Zeitpunkt unbekannt).
+
+CoverageRow = namedtuple('CoverageRow', ['project_id', 'knowledge_skill_id', 'skill_name', 'required_level', 'best_level'])
+
+
+# Stand laut Protokoll zum Zeitpunkt at: {(users_id, knowledge_skill_id): Level} (entfernte Level fehlen)
+def competence_levels_at(user_ids, skill_ids, at):
+    user_ids, skill_ids = list(user_ids), list(skill_ids)
+    if not user_ids or not skill_ids:
+        return {}
+
+    latest = (
+        db.select(db.func.max(CompetenceChange.id).label('id'))
+        .where(CompetenceChange.users_id.in_(user_ids),
+               CompetenceChange.knowledge_skill_id.in_(skill_ids),
+               CompetenceChange.changed_at <= at)
+        .group_by(CompetenceChange.users_id, CompetenceChange.knowledge_skill_id)
+        .subquery()
+    )
+    return {
+        (users_id, knowledge_skill_id): level
+        for users_id, knowledge_skill_id, level in db.session.execute(
+            db.select(CompetenceChange.users_id, CompetenceChange.knowledge_skill_id, CompetenceChange.new_level)
+            .join(latest, latest.c.id == CompetenceChange.id)
+        )
+        if level is not None
+    }
+
+
+# Abdeckung eines Projekts mit den Leveln seines Teams zum Zeitpunkt at (Ampel-Logik wie CoverageReport)
+def coverage_as_of(projekt, at):
+    anforderungen = _get_project_requirements(projekt.id)
+    team = db.session.scalars(db.select(projekt_user.c.user_id).where(projekt_user.c.project_id == projekt.id)).all()
+    levels = competence_levels_at(team, anforderungen, at)
+    skill_names = get_taxonomy().skill_names
+
+    rows = [
+        CoverageRow(
+            projekt.id, knowledge_skill_id, skill_names.get(knowledge_skill_id), required,
+            max((levels[(user_id, knowledge_skill_id)] for user_id in team if (user_id, knowledge_skill_id) in levels),
+                default=None),
+        )
+        for knowledge_skill_id, required in anforderungen.items()
+    ]
+    return CoverageReport([projekt.id], rows, {projekt.id: len(team)}), rows
+
+
+# Entwicklung je Wissen/Fähigkeit im Zeitraum [since, until): Anzahl Auf-/Abstufungen, Nettozuwachs an
+# Levelstufen und betroffene Personen (optional nur für bestimmte Nutzer)
+def skill_growth(since, until, user_ids=None):
+    delta = db.func.coalesce(CompetenceChange.new_level, 0) - db.func.coalesce(CompetenceChange.old_level, 0)
+    query = (
+        db.select(
+            CompetenceChange.knowledge_skill_id,
+            db.func.sum(db.case((delta > 0, 1), else_=0)).label('upgrades'),
+            db.func.sum(db.case((delta < 0, 1), else_=0)).label('downgrades'),
+            db.func.sum(delta).label('net'),
+            db.func.count(db.distinct(CompetenceChange.users_id)).label('users'),
+        )
+        .where(CompetenceChange.changed_at >= since, CompetenceChange.changed_at < until)
+        .group_by(CompetenceChange.knowledge_skill_id)
+        .order_by(db.desc('net'), CompetenceChange.knowledge_skill_id)
+    )
+    if user_ids is not None:
+        query = query.where(CompetenceChange.users_id.in_(user_ids))
+    return db.session.execute(query).all()
+
+
+# Liest ein Datum bzw. einen Zeitpunkt im ISO-Format ("2026-03-31" oder "2026-03-31T12:00"), sonst default
+def _parse_timestamp(value, default):
+    if not value:
+        return default
+    try:
+        return datetime.fromisoformat(value.rstrip('Z')).replace(tzinfo=None)
+    except ValueError:
+        abort(400)
+
+
+# Abdeckung eines Projekts zu einem Zeitpunkt (Standard: Abschluss bzw. jetzt) im Vergleich zu heute, nur für Admins
+@app.route('/admin/projekt/<int:project_id>/abdeckung', methods=['GET'])
+@login_required
+def projekt_abdeckung_historisch(project_id):
+    if not current_user.admin:
+        abort(403)
+
+    projekt = db.get_or_404(Project, project_id)
+    stand = _parse_timestamp(request.args.get('stand'), projekt.closed_at or _utcnow())
+    report, rows = coverage_as_of(projekt, stand)
+    _, rows_now = coverage_as_of(projekt, _utcnow())
+    best_now = {row.knowledge_skill_id: row.best_level for row in rows_now}
+
+    def label(level):
+        return level.label if level else None
+
+    return jsonify({
+        "project_id": projekt.id,
+        "closed_at": projekt.closed_at.isoformat() + 'Z' if projekt.closed_at else None,
+        "as_of": stand.isoformat() + 'Z',
+        "ampel": report.ampel_info[projekt.id],
+        "missing": report.fehlende_kompetenzen[projekt.id],
+        "skills": [
+            {
+                "id": row.knowledge_skill_id,
+                "name": row.skill_name,
+                "required_level": label(row.required_level),
+                "best_level": label(row.best_level),
+                "best_level_now": label(best_now.get(row.knowledge_skill_id)),
+            }
+            for row in rows
+        ],
+    })
+
+
+# Kompetenzentwicklung im Zeitraum, z. B. /admin/kompetenzentwicklung?von=2026-01-01&bis=2026-07-01&user_id=4
+@app.route('/admin/kompetenzentwicklung', methods=['GET'])
+@login_required
+def kompetenzentwicklung():
+    if not current_user.admin:
+        abort(403)
+
+    bis = _parse_timestamp(request.args.get('bis'), _utcnow())
+    von = _parse_timestamp(request.args.get('von'), bis - timedelta(days=90))
+    user_id = request.args.get('user_id', type=int)
+    skill_names = get_taxonomy().skill_names
+
+    return jsonify({
+        "from": von.isoformat() + 'Z',
+        "until": bis.isoformat() + 'Z',
+        "user_id": user_id,
+        "skills": [
+            {
+                "id": row.knowledge_skill_id,
+                "name": skill_names.get(row.knowledge_skill_id),
+                "upgrades": row.upgrades,
+                "downgrades": row.downgrades,
+                "net": row.net,
+                "users": row.users,
+            }
+            for row in skill_growth(von, bis, [user_id] if user_id else None)
+        ],
+    })
+
+
+# Änderungsprotokoll eines Nutzers (neueste zuerst, optional nur eine Wissen/Fähigkeit), nur für Admins
+@app.route('/admin/kompetenzhistorie/<int:user_id>', methods=['GET'])
+@login_required
+def kompetenzhistorie(user_id):
+    if not current_user.admin:
+        abort(403)
+
+    db.get_or_404(Users, user_id)
+    query = (
+        db.select(CompetenceChange)
+        .where(CompetenceChange.users_id == user_id)
+        .order_by(CompetenceChange.id.desc())
+        .limit(min(max(request.args.get('limit', 100, type=int), 1), 1000))
+    )
+    skill_id = request.args.get('skill', type=int)
+    if skill_id:
+        query = query.where(CompetenceChange.knowledge_skill_id == skill_id)
+    skill_names = get_taxonomy().skill_names
+
+    return jsonify({
+        "user_id": user_id,
+        "changes": [
+            {
+                "skill_id": change.knowledge_skill_id,
+                "skill": skill_names.get(change.knowledge_skill_id),
+                "old_level": change.old_level.label if change.old_level else None,
+                "new_level": change.new_level.label if change.new_level else None,
+                "changed_at": change.changed_at.isoformat() + 'Z',
+            }
+            for change in db.session.scalars(query)
+        ],
+    })
+
+
+# === PROJEKTHISTORIE: VOLLTEXTSUCHE UND SEITEN ===
+# project_fts (SQLite FTS5, rowid = project.id) enthält Projektname, Notiz und die Namen der geforderten
+# Wissen/Fähigkeiten. Die Tabelle wird beim Anlegen und Abschließen eines Projekts in der Transaktion
+# des Aufrufers aktualisiert; "flask project-fts-rebuild" baut sie komplett neu auf (z. B. nach
+# Umbenennungen in der Taxonomie). Auf anderen Datenbanken wird ohne Index per LIKE gesucht.
+
+HISTORY_PAGE_SIZE = 20  # Projekte je Seite in der Projekthistorie
+
+# Eigene MetaData: wird weder von create_all noch von Alembic als normale Tabelle angelegt
+project_fts = db.Table('project_fts', db.MetaData(),
+    db.Column('rowid', db.Integer, primary_key=True),
+    db.Column('project_name', db.Text),
+    db.Column('notiz', db.Text),
+    db.Column('skills', db.Text),
+)
+
+PROJECT_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5("
+    "project_name, notiz, skills, tokenize = 'unicode61 remove_diacritics 2')"
+)
+
+
+# Volltexttabelle zusammen mit der Projekttabelle anlegen bzw. entfernen (db.create_all / drop_all)
+@db.event.listens_for(Project.__table__, 'after_create')
+def _create_project_fts(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("DROP TABLE IF EXISTS project_fts")
+        connection.exec_driver_sql(PROJECT_FTS_DDL)
+
+
+@db.event.listens_for(Project.__table__, 'after_drop')
+def _drop_project_fts(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.exec_driver_sql("DROP TABLE IF EXISTS project_fts")
+
+
+def _fts_enabled():
+    return db.session.get_bind().dialect.name == 'sqlite'
+
+
+# Projektname, Notiz und Namen der geforderten Wissen/Fähigkeiten je Projekt
+def _project_fts_select(project_ids=None):
+    query = (
+        db.select(
+            Project.id,
+            Project.project_name,
+            db.func.coalesce(Project.notiz, ''),
+            db.func.coalesce(db.func.group_concat(KnowledgeSkills.name, ' '), ''),
+        )
+        .outerjoin(ProjectRequirement, ProjectRequirement.project_id == Project.id)
+        .outerjoin(KnowledgeSkills, KnowledgeSkills.id == ProjectRequirement.knowledge_skill_id)
+        .group_by(Project.id)
+    )
+    if project_ids is not None:
+        query = query.where(Project.id.in_(project_ids))
+    return query
+
+
+# Aktualisiert die Volltexteinträge der angegebenen Projekte (ohne Argument: alle)
+def index_project_fts(project_ids=None):
+    if project_ids is not None:
+        project_ids = list(project_ids)
+        if not project_ids:
+            return
+    if not _fts_enabled():
+        return
+
+    db.session.flush()
+    delete = db.delete(project_fts)
+    if project_ids is not None:
+        delete = delete.where(project_fts.c.rowid.in_(project_ids))
+    db.session.execute(delete)
+    db.session.execute(
+        db.insert(project_fts).from_select(
+            ['rowid', 'project_name', 'notiz', 'skills'], _project_fts_select(project_ids)
+        )
+    )
+
+
+# Suchbegriffe als FTS5-Abfrage: jedes Wort als Präfix, alle Wörter müssen vorkommen
+def _fts_match_query(suche):
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', suche))
+
+
+# Filter für die Suche in Name, Notiz und geforderten Wissen/Fähigkeiten
+def _project_search_filter(suche):
+    if _fts_enabled():
+        match = _fts_match_query(suche)
+        if not match:
+            return db.true()
+        return Project.id.in_(
+            db.select(project_fts.c.rowid).where(db.literal_column('project_fts').op('MATCH')(match))
+        )
+
+    pattern = f"%{suche}%"
+    return db.or_(
+        Project.project_name.ilike(pattern),
+        Project.notiz.ilike(pattern),
+        Project.requirements.any(ProjectRequirement.knowledge_skill.has(KnowledgeSkills.name.ilike(pattern))),
+    )
+
+
+# CLI: Volltextindex der Projekte neu aufbauen
+@app.cli.command('project-fts-rebuild')
+def project_fts_rebuild_command():
+    if not _fts_enabled():
+        click.echo("Volltextsuche ist nur mit SQLite (FTS5) verfügbar.")
+        return
+    db.session.connection().exec_driver_sql(PROJECT_FTS_DDL)
+    index_project_fts()
+    db.session.commit()
+    click.echo("project_fts neu aufgebaut.")
+
+
+# History-Route: Zeigt abgeschlossene Projekte seitenweise (neueste zuerst) mit optionaler Volltextsuche.
+# Keyset-Pagination über die Projekt-ID: "vor" blättert zu älteren, "nach" zu neueren Projekten.
 @app.route('/history', methods=['GET', 'POST'])
 @login_required
+@read_only_db
 def history():
     # Form für CSRF-Schutz erstellen
     form = AdminCompetenceForm()
-    
-    projekte = Project.query.filter_by(status='Abgeschlossen').options(
-        db.joinedload(Project.requirements).joinedload(ProjectRequirement.knowledge_skill),
-        db.joinedload(Project.users)
-    ).all()
-    return render_template('history.html', projekte=projekte, form=form) 
+    suche = (request.args.get('q') or '').strip()
+    vor = request.args.get('vor', type=int)
+    nach = request.args.get('nach', type=int)
+
+    query = db.select(Project.id).where(Project.status == 'Abgeschlossen')
+    if suche:
+        query = query.where(_project_search_filter(suche))
+
+    if nach is not None:
+        ids = db.session.execute(
+            query.where(Project.id > nach).order_by(Project.id.asc()).limit(HISTORY_PAGE_SIZE + 1)
+        ).scalars().all()
+        has_newer = len(ids) > HISTORY_PAGE_SIZE
+        ids = ids[:HISTORY_PAGE_SIZE][::-1]
+        has_older = True
+    else:
+        if vor is not None:
+            query = query.where(Project.id < vor)
+        ids = db.session.execute(
+            query.order_by(Project.id.desc()).limit(HISTORY_PAGE_SIZE + 1)
+        ).scalars().all()
+        has_older = len(ids) > HISTORY_PAGE_SIZE
+        ids = ids[:HISTORY_PAGE_SIZE]
+        has_newer = vor is not None
+
+    # Nur die Projekte der aktuellen Seite mit Anforderungen und Nutzern laden
+    projekte = Project.query.filter(Project.id.in_(ids)).options(
+        selectinload(Project.requirements).joinedload(ProjectRequirement.knowledge_skill),
+        selectinload(Project.users)
+    ).order_by(Project.id.desc()).all() if ids else []
+
+    q = suche or None
+    seiten_urls = {
+        "newer": url_for('history', q=q, nach=ids[0]) if ids and has_newer else None,
+        "older": url_for('history', q=q, vor=ids[-1]) if ids and has_older else None,
+    }
+    return render_template('history.html', projekte=projekte, form=form, suche=suche, seiten_urls=seiten_urls) 
 
 # Benutzer zu Projekt zuweisen
 @app.route('/projekt_zuweisen', methods=['POST'])
@@ -713,19 +4301,9 @@ def projekt_zuweisen():
 
     projekt = Project.query.get_or_404(project_id) 
 
-    assigned_count = 0
-    
-    # Jeden ausgewählten Benutzer dem Projekt zuweisen
-    for uid in user_ids:
-        try:
-            user = Users.query.get(int(uid))
-            if user and user not in projekt.users:
-                projekt.users.append(user)
-                assigned_count += 1
-        except ValueError:  
-            continue    
-    if assigned_count > 0:        
-        db.session.commit()  
+    # Alle ausgewählten Benutzer gesammelt zuweisen (bestehende Zuweisungen werden übersprungen)
+    result = commit_project_assignments(assign=[(projekt.id, user_id) for user_id in _parse_ids(user_ids)])
+    if result.assigned:
         flash(f' Nutzer wurde(n) erfolgreich dem Projekt zugewiesen.', 'success')
     
     return redirect(url_for('admin'))
@@ -743,51 +4321,21 @@ def admin_competence(user_id):
     form = AdminCompetenceForm()
     
     if request.method == 'POST' and form.validate_on_submit():  
-        for key in request.form:
-            # Suche nach Kompetenz-Feldern 
-            if key.startswith("kompetenzen["):
-                knowledge_skill_id_str = key[12:-1]  
-                level = request.form[key]  
-
-              
-                try:
-                    knowledge_skill_id = int(knowledge_skill_id_str)
-                except ValueError:
-                    continue  
-
-                existing = UsersCompetence.query.filter_by(
-                    users_id=target_user.id,
-                    knowledge_skill_id=knowledge_skill_id
-                ).first()
-
-                if existing:
-                    # Vorhandenes Level aktualisieren
-                    existing.competence_level = level
-                else:
-                    new_competence = UsersCompetence(
-                        users_id=target_user.id,
-                        knowledge_skill_id=knowledge_skill_id,
-                        competence_level=level
-                    )
-                    db.session.add(new_competence)
-        
-        db.session.commit()  
+        levels = _parse_level_form(request.form, 'kompetenzen[')
+        save_user_competences(target_user.id, levels)
         return redirect(url_for('admin_user_management'))
 
-    competence_groups = CompetenceGroup.query.options(
-        db.joinedload(CompetenceGroup.competences).joinedload(Competence.knowledge_skills)
-    ).all()
+    competence_groups = get_taxonomy().groups
     
-    # Aktuelle Kompetenzen des Zielnutzers laden
-    current_competences = {
-        uc.knowledge_skill_id: uc.competence_level
-        for uc in UsersCompetence.query.filter_by(users_id=target_user.id).all()
-    }
+    # Anzahl bewerteter Wissen/Fähigkeiten je Gruppe (die Level selbst lädt kompetenz_gruppe())
+    group_counts = _count_levels_by_group(db.session.scalars(
+        db.select(UsersCompetence.knowledge_skill_id).where(UsersCompetence.users_id == target_user.id)
+    ))
     
     return render_template('admin_competence.html', 
                          competence_groups=competence_groups, 
                          target_user=target_user,
-                         current_competences=current_competences,
+                         group_counts=group_counts,
                          form=form)  
 
 # Admin-Nutzer-Verwaltung
@@ -802,6 +4350,18 @@ def admin_user_management():
     
     return render_template('admin_user_management.html', users=users)
 
+# Metriken im Prometheus-Textformat (nur für Admins)
+@app.route('/metrics', methods=['GET'])
+@login_required
+def metrics():
+    if not current_user.admin:
+        abort(403)
+
+    lines = []
+    for metric in METRICS.values():
+        lines.extend(metric.render())
+    return Response("\n".join(lines) + "\n", mimetype='text/plain; version=0.0.4')
+
 
 if __name__ == '__main__':
     with app.app_context():
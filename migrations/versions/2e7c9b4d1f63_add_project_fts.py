@@ -0,0 +1,44 @@
+"""add project_fts full-text index (SQLite FTS5)
+
+Revision ID: 2e7c9b4d1f63
+Revises: 6b1f0d8e4a52
+Create Date: 2026-10-18 15:12:40.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2e7c9b4d1f63'
+down_revision = '6b1f0d8e4a52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Volltextsuche gibt es nur mit SQLite; andere Datenbanken suchen ohne Index
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS project_fts USING fts5("
+        "project_name, notiz, skills, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+
+    # Initialer Aufbau für alle Projekte (entspricht "flask project-fts-rebuild")
+    op.execute(
+        "INSERT INTO project_fts (rowid, project_name, notiz, skills) "
+        "SELECT p.id, p.project_name, COALESCE(p.notiz, ''), COALESCE(GROUP_CONCAT(ks.name, ' '), '') "
+        "FROM project p "
+        "LEFT OUTER JOIN project_requirement pr ON pr.project_id = p.id "
+        "LEFT OUTER JOIN knowledge_skills ks ON ks.id = pr.knowledge_skill_id "
+        "GROUP BY p.id"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+
+    op.execute("DROP TABLE IF EXISTS project_fts")
@@ -0,0 +1,32 @@
+"""unique users_competence per user and knowledge skill
+
+Revision ID: 4c2e8f1a9b37
+Revises: b83dd3a01a7c
+Create Date: 2026-10-18 09:12:44.318205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4c2e8f1a9b37'
+down_revision = 'b83dd3a01a7c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Doppelte Einträge je Nutzer und Wissen/Fähigkeit entfernen (neuester Eintrag bleibt)
+    op.execute(
+        "DELETE FROM users_competence WHERE id NOT IN ("
+        "SELECT MAX(id) FROM users_competence GROUP BY users_id, knowledge_skill_id)"
+    )
+
+    with op.batch_alter_table('users_competence', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_users_competence_user_skill', ['users_id', 'knowledge_skill_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('users_competence', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_users_competence_user_skill', type_='unique')
@@ -0,0 +1,45 @@
+"""add materialized project_coverage table
+
+Revision ID: 6b1f0d8e4a52
+Revises: 9d5a7c3e2f10
+Create Date: 2026-10-18 13:05:29.874120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b1f0d8e4a52'
+down_revision = '9d5a7c3e2f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_coverage',
+        sa.Column('project_id', sa.Integer(), nullable=False),
+        sa.Column('knowledge_skill_id', sa.Integer(), nullable=False),
+        sa.Column('required_level', sa.SmallInteger(), nullable=True),
+        sa.Column('best_level', sa.SmallInteger(), nullable=True),
+        sa.ForeignKeyConstraint(['knowledge_skill_id'], ['knowledge_skills.id'], ),
+        sa.ForeignKeyConstraint(['project_id'], ['project.id'], ),
+        sa.PrimaryKeyConstraint('project_id', 'knowledge_skill_id')
+    )
+
+    # Initialer Aufbau für alle aktiven Projekte (entspricht "flask coverage-rebuild")
+    op.execute(
+        "INSERT INTO project_coverage (project_id, knowledge_skill_id, required_level, best_level) "
+        "SELECT pr.project_id, pr.knowledge_skill_id, MAX(pr.competence_level), MAX(uc.competence_level) "
+        "FROM project_requirement pr "
+        "JOIN project p ON p.id = pr.project_id "
+        "LEFT OUTER JOIN projekt_user pu ON pu.project_id = pr.project_id "
+        "LEFT OUTER JOIN users_competence uc "
+        "ON uc.users_id = pu.user_id AND uc.knowledge_skill_id = pr.knowledge_skill_id "
+        "WHERE p.status IS NULL OR p.status != 'Abgeschlossen' "
+        "GROUP BY pr.project_id, pr.knowledge_skill_id"
+    )
+
+
+def downgrade():
+    op.drop_table('project_coverage')
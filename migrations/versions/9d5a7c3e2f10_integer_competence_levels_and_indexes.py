@@ -0,0 +1,74 @@
+"""integer competence levels and indexes on hot filter columns
+
+Revision ID: 9d5a7c3e2f10
+Revises: 4c2e8f1a9b37
+Create Date: 2026-10-18 10:41:07.552913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d5a7c3e2f10'
+down_revision = '4c2e8f1a9b37'
+branch_labels = None
+depends_on = None
+
+LEVELS = {'Kenner': 1, 'Könner': 2, 'Experte': 3}
+LEVEL_TABLES = ('users_competence', 'project_requirement')
+
+
+def _label_to_ordinal(column):
+    cases = ' '.join(f"WHEN '{label}' THEN {value}" for label, value in LEVELS.items())
+    return f"CASE {column} {cases} END"
+
+
+def _ordinal_to_label(column):
+    cases = ' '.join(f"WHEN {value} THEN '{label}'" for label, value in LEVELS.items())
+    return f"CASE {column} {cases} END"
+
+
+def upgrade():
+    # Level-Namen in Ordinalzahlen umwandeln (Zwischenspalte, danach umbenennen)
+    for table in LEVEL_TABLES:
+        op.add_column(table, sa.Column('competence_level_ord', sa.SmallInteger(), nullable=True))
+        op.execute(f"UPDATE {table} SET competence_level_ord = {_label_to_ordinal('competence_level')}")
+
+    # Nutzerkompetenzen ohne gültiges Level sind nicht mehr darstellbar
+    op.execute("DELETE FROM users_competence WHERE competence_level_ord IS NULL")
+
+    with op.batch_alter_table('users_competence', schema=None) as batch_op:
+        batch_op.drop_column('competence_level')
+        batch_op.alter_column('competence_level_ord', new_column_name='competence_level',
+                              existing_type=sa.SmallInteger(), nullable=False)
+
+    with op.batch_alter_table('project_requirement', schema=None) as batch_op:
+        batch_op.drop_column('competence_level')
+        batch_op.alter_column('competence_level_ord', new_column_name='competence_level',
+                              existing_type=sa.SmallInteger(), nullable=True)
+        batch_op.create_index('ix_project_requirement_project_id', ['project_id'], unique=False)
+
+    # users_competence(users_id, knowledge_skill_id) ist bereits über uq_users_competence_user_skill indiziert
+    op.create_index('ix_projekt_user_user_id', 'projekt_user', ['user_id'], unique=False)
+    op.create_index('ix_project_status', 'project', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_project_status', table_name='project')
+    op.drop_index('ix_projekt_user_user_id', table_name='projekt_user')
+
+    for table in LEVEL_TABLES:
+        op.add_column(table, sa.Column('competence_level_label', sa.String(length=100), nullable=True))
+        op.execute(f"UPDATE {table} SET competence_level_label = {_ordinal_to_label('competence_level')}")
+
+    with op.batch_alter_table('project_requirement', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_requirement_project_id')
+        batch_op.drop_column('competence_level')
+        batch_op.alter_column('competence_level_label', new_column_name='competence_level',
+                              existing_type=sa.String(length=100), type_=sa.String(length=20), nullable=True)
+
+    with op.batch_alter_table('users_competence', schema=None) as batch_op:
+        batch_op.drop_column('competence_level')
+        batch_op.alter_column('competence_level_label', new_column_name='competence_level',
+                              existing_type=sa.String(length=100), nullable=False)
@@ -0,0 +1,57 @@
+"""add analytics snapshot tables
+
+Revision ID: c8e1f4a7d2b6
+Revises: 7a4d2c9e5b18
+Create Date: 2026-10-18 17:22:48.913507
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e1f4a7d2b6'
+down_revision = '7a4d2c9e5b18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('analytics_snapshot',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('taken_at', sa.DateTime(), nullable=False),
+        sa.Column('active_projects', sa.Integer(), nullable=False),
+        sa.Column('requirements', sa.Integer(), nullable=False),
+        sa.Column('undercovered', sa.Integer(), nullable=False),
+        sa.Column('single_holder_skills', sa.Integer(), nullable=False),
+        sa.Column('unheld_skills', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('analytics_snapshot', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_analytics_snapshot_taken_at'), ['taken_at'], unique=False)
+
+    op.create_table('skill_gap_snapshot',
+        sa.Column('snapshot_id', sa.Integer(), nullable=False),
+        sa.Column('knowledge_skill_id', sa.Integer(), nullable=False),
+        sa.Column('required', sa.Integer(), nullable=False),
+        sa.Column('undercovered', sa.Integer(), nullable=False),
+        sa.Column('kenner', sa.Integer(), nullable=False),
+        sa.Column('koenner', sa.Integer(), nullable=False),
+        sa.Column('experte', sa.Integer(), nullable=False),
+        sa.Column('qualified', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['snapshot_id'], ['analytics_snapshot.id'], ),
+        sa.PrimaryKeyConstraint('snapshot_id', 'knowledge_skill_id')
+    )
+    with op.batch_alter_table('skill_gap_snapshot', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_skill_gap_snapshot_knowledge_skill_id'), ['knowledge_skill_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('skill_gap_snapshot', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_skill_gap_snapshot_knowledge_skill_id'))
+
+    op.drop_table('skill_gap_snapshot')
+    with op.batch_alter_table('analytics_snapshot', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_analytics_snapshot_taken_at'))
+
+    op.drop_table('analytics_snapshot')
@@ -0,0 +1,54 @@
+"""add competence change log and project close date
+
+Revision ID: e4b7a1c9d3f2
+Revises: c8e1f4a7d2b6
+Create Date: 2026-10-18 19:04:12.381406
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b7a1c9d3f2'
+down_revision = 'c8e1f4a7d2b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('competence_change',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('users_id', sa.Integer(), nullable=False),
+        sa.Column('knowledge_skill_id', sa.Integer(), nullable=False),
+        sa.Column('old_level', sa.SmallInteger(), nullable=True),
+        sa.Column('new_level', sa.SmallInteger(), nullable=True),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['knowledge_skill_id'], ['knowledge_skills.id'], ),
+        sa.ForeignKeyConstraint(['users_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('competence_change', schema=None) as batch_op:
+        batch_op.create_index('ix_competence_change_user_skill_time', ['users_id', 'knowledge_skill_id', 'changed_at'], unique=False)
+        batch_op.create_index('ix_competence_change_changed_at', ['changed_at'], unique=False)
+
+    # Vorhandene Level als Ausgangsstand übernehmen; der tatsächliche Zeitpunkt ist unbekannt
+    op.execute(
+        "INSERT INTO competence_change (users_id, knowledge_skill_id, old_level, new_level, changed_at) "
+        "SELECT users_id, knowledge_skill_id, NULL, competence_level, '1970-01-01 00:00:00.000000' "
+        "FROM users_competence ORDER BY id"
+    )
+
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('closed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('project', schema=None) as batch_op:
+        batch_op.drop_column('closed_at')
+
+    with op.batch_alter_table('competence_change', schema=None) as batch_op:
+        batch_op.drop_index('ix_competence_change_changed_at')
+        batch_op.drop_index('ix_competence_change_user_skill_time')
+
+    op.drop_table('competence_change')
@@ -0,0 +1,33 @@
+"""add cache generation counters
+
+Revision ID: f1c3d5e7a9b0
+Revises: e4b7a1c9d3f2
+Create Date: 2026-10-18 20:11:37.550219
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c3d5e7a9b0'
+down_revision = 'e4b7a1c9d3f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    cache_generation = op.create_table('cache_generation',
+        sa.Column('namespace', sa.String(length=50), nullable=False),
+        sa.Column('generation', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('namespace')
+    )
+    op.bulk_insert(cache_generation, [
+        {'namespace': 'taxonomie', 'generation': 0},
+        {'namespace': 'kompetenzen', 'generation': 0},
+        {'namespace': 'zuordnungen', 'generation': 0},
+    ])
+
+
+def downgrade():
+    op.drop_table('cache_generation')
@@ -0,0 +1,160 @@
+// Kompetenzvergleich auf der Admin-Seite: Filter und Blättern laden nur die angeforderte Seite
+// als JSON (/admin/kompetenzvergleich/<id>) und ersetzen Tabelle, Seitenangabe und Nutzerauswahl.
+// Ohne JavaScript bleiben Formular und Links normale GET-Anfragen an /admin.
+(function () {
+  'use strict';
+
+  const CELL_CLASS = 'border border-gray-300 px-4 py-2 text-xs text-center dark:text-white';
+  const HEAD_CLASS = 'border border-gray-300 px-4 py-2 text-sm text-white dark:text-white';
+  const LINK_CLASS = 'text-[#2A4A6A] hover:underline dark:text-blue-400';
+  const FILTERS = ['min_erfuellt', 'skill_id', 'symbol', 'sort', 'name'];
+  const DEFAULTS = { min_erfuellt: '0', sort: 'score' };
+
+  // Gesetzte Filter des Formulars (leere Felder und Standardwerte fallen weg)
+  function filterParams(form) {
+    const data = new FormData(form);
+    const params = new URLSearchParams();
+    FILTERS.forEach(function (key) {
+      const value = (data.get(key) || '').trim();
+      if (value && value !== DEFAULTS[key]) {
+        params.set(key, value);
+      }
+    });
+    return params;
+  }
+
+  // Entsprechende Adresse der Admin-Seite, damit Neuladen und Lesezeichen denselben Stand zeigen
+  function adminUrl(form, params, page) {
+    const url = new URL(form.getAttribute('action'), window.location.href);
+    const search = new URLSearchParams(params);
+    search.set('project_id', form.querySelector('[name="project_id"]').value);
+    if (page > 1) {
+      search.set('page', page);
+    }
+    url.search = search.toString();
+    return url;
+  }
+
+  function renderHead(table, users) {
+    const head = table.querySelector('[data-comparison-head]');
+    while (head.children.length > 1) {
+      head.lastElementChild.remove();
+    }
+    users.forEach(function (user) {
+      const th = document.createElement('th');
+      th.className = HEAD_CLASS;
+      th.textContent = user.name;
+      head.appendChild(th);
+    });
+  }
+
+  function renderRows(table, users) {
+    table.querySelectorAll('[data-comparison-span]').forEach(function (cell) {
+      cell.colSpan = users.length + 1;
+    });
+    table.querySelectorAll('tr[data-skill-id]').forEach(function (row) {
+      while (row.children.length > 1) {
+        row.lastElementChild.remove();
+      }
+      users.forEach(function (user) {
+        const info = user.skills[row.dataset.skillId];
+        const td = document.createElement('td');
+        td.className = CELL_CLASS;
+        td.append(info ? info.symbol : '', document.createElement('br'),
+                  info && info.user_level ? info.user_level : 'Nichts', document.createElement('br'));
+        row.appendChild(td);
+      });
+    });
+  }
+
+  function bindPager(pager, load) {
+    pager.querySelectorAll('a[data-page]').forEach(function (a) {
+      a.addEventListener('click', function (event) {
+        event.preventDefault();
+        load(Number(a.dataset.page));
+      });
+    });
+  }
+
+  function renderPager(pager, form, params, data, load) {
+    pager.innerHTML = '';
+    [[data.page - 1, '« Zurück', data.page > 1], [data.page + 1, 'Weiter »', data.page < data.pages]]
+      .forEach(function (link) {
+        if (!link[2]) {
+          return;
+        }
+        const a = document.createElement('a');
+        a.href = adminUrl(form, params, link[0]).toString() + '#Kompetenzvergleich';
+        a.dataset.page = link[0];
+        a.className = LINK_CLASS;
+        a.textContent = link[1];
+        pager.appendChild(a);
+      });
+    bindPager(pager, load);
+  }
+
+  // Auswahl "Nutzer zuweisen": Nutzer der aktuellen Seite, die noch nicht zugewiesen sind
+  function renderUserSelect(select, users) {
+    if (!select) {
+      return;
+    }
+    const assigned = new Set(JSON.parse(select.dataset.assigned || '[]'));
+    select.innerHTML = '';
+    users.forEach(function (user) {
+      if (!assigned.has(user.id)) {
+        select.appendChild(new Option(user.name, user.id));
+      }
+    });
+  }
+
+  function initComparison(form) {
+    const table = document.querySelector('[data-comparison-table]');
+    const summary = document.querySelector('[data-comparison-summary]');
+    const pager = document.querySelector('[data-comparison-pager]');
+    const select = document.querySelector('[data-comparison-users]');
+    let latest = 0;
+
+    function load(page) {
+      const params = filterParams(form);
+      const target = adminUrl(form, params, page);
+      const query = new URLSearchParams(params);
+      query.set('page', page);
+      const request = ++latest;
+
+      fetch(form.dataset.url + '?' + query.toString(), { headers: { 'X-Requested-With': 'fetch' } })
+        .then(function (response) {
+          if (!response.ok) {
+            throw new Error(response.status);
+          }
+          return response.json();
+        })
+        .then(function (data) {
+          if (request !== latest) {  // Veraltete Antworten verwerfen
+            return;
+          }
+          renderHead(table, data.users);
+          renderRows(table, data.users);
+          summary.textContent = data.total + ' Nutzer, Seite ' + data.page + ' von ' + data.pages;
+          renderPager(pager, form, params, data, load);
+          renderUserSelect(select, data.users);
+          window.history.replaceState(null, '', adminUrl(form, params, data.page).toString() + '#Kompetenzvergleich');
+        })
+        .catch(function () {
+          window.location.href = target.toString() + '#Kompetenzvergleich';  // Rückfall: Seite normal laden
+        });
+    }
+
+    form.addEventListener('submit', function (event) {
+      event.preventDefault();
+      load(1);
+    });
+    bindPager(pager, load);
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    const form = document.querySelector('[data-comparison-form]');
+    if (form && document.querySelector('[data-comparison-table]')) {
+      initComparison(form);
+    }
+  });
+})();
@@ -0,0 +1,164 @@
+// Kompetenzkatalog in den Formularen: Gruppen werden erst beim Aufklappen vom Server geladen,
+// die Suche springt zur gefundenen Kompetenz bzw. Wissen/Fähigkeit.
+(function () {
+  'use strict';
+
+  const SEARCH_DELAY_MS = 200;
+
+  // Lädt den Inhalt einer Gruppe genau einmal (gleichzeitige Aufrufe teilen sich die Anfrage)
+  function loadGroup(details) {
+    if (!details._loading) {
+      const body = details.querySelector('[data-group-body]');
+      details._loading = fetch(details.dataset.url, { headers: { 'X-Requested-With': 'fetch' } })
+        .then(function (response) {
+          if (!response.ok) {
+            throw new Error(response.status);
+          }
+          return response.text();
+        })
+        .then(function (html) {
+          body.innerHTML = html;
+        })
+        .catch(function () {
+          details._loading = null;  // Beim nächsten Aufklappen erneut versuchen
+          body.innerHTML = '<p class="text-sm text-red-600">Gruppe konnte nicht geladen werden.</p>';
+        });
+    }
+    return details._loading;
+  }
+
+  function highlight(element) {
+    element.scrollIntoView({ behavior: 'smooth', block: 'center' });
+    element.classList.add('ring-2', 'ring-[#2A4A6A]');
+    setTimeout(function () {
+      element.classList.remove('ring-2', 'ring-[#2A4A6A]');
+    }, 2000);
+  }
+
+  // Klappt Gruppe und Kompetenz des Treffers auf und markiert die Fundstelle
+  function reveal(catalog, hit) {
+    const details = catalog.querySelector('details[data-group-id="' + hit.group_id + '"]');
+    if (!details) {
+      return;
+    }
+    details.open = true;
+    loadGroup(details).then(function () {
+      const competence = details.querySelector('details[data-competence-id="' + hit.competence_id + '"]');
+      if (!competence) {
+        return;
+      }
+      competence.open = true;
+      const row = hit.type === 'skill' ? document.getElementById('skill-row-' + hit.id) : null;
+      highlight(row || competence);
+    });
+  }
+
+  function renderResults(catalog, list, input, results) {
+    list.innerHTML = '';
+    results.forEach(function (hit) {
+      const item = document.createElement('li');
+      item.setAttribute('role', 'option');
+      item.tabIndex = -1;
+      item.className = 'px-4 py-2 cursor-pointer hover:bg-gray-100 focus:bg-gray-100 focus:outline-none dark:hover:bg-gray-600';
+
+      const name = document.createElement('span');
+      name.className = 'font-medium text-gray-900 dark:text-white';
+      name.textContent = hit.name;
+      const path = document.createElement('span');
+      path.className = 'block text-xs text-gray-500 dark:text-gray-300';
+      path.textContent = hit.type === 'skill' ? hit.group + ' › ' + hit.competence : hit.group + ' (Kompetenz)';
+      item.append(name, path);
+
+      function choose() {
+        list.classList.add('hidden');
+        input.setAttribute('aria-expanded', 'false');
+        reveal(catalog, hit);
+      }
+      item.addEventListener('click', choose);
+      item.addEventListener('keydown', function (event) {
+        if (event.key === 'Enter') {
+          event.preventDefault();
+          choose();
+        }
+      });
+      list.appendChild(item);
+    });
+
+    if (!results.length && input.value.trim()) {
+      const empty = document.createElement('li');
+      empty.className = 'px-4 py-2 text-sm text-gray-500';
+      empty.textContent = 'Keine Treffer';
+      list.appendChild(empty);
+    }
+    const open = list.children.length > 0;
+    list.classList.toggle('hidden', !open);
+    input.setAttribute('aria-expanded', String(open));
+  }
+
+  function initCatalog(catalog) {
+    catalog.querySelectorAll('details[data-group-id]').forEach(function (details) {
+      details.addEventListener('toggle', function () {
+        if (details.open) {
+          loadGroup(details);
+        }
+      });
+    });
+
+    const input = catalog.querySelector('[data-catalog-search]');
+    const list = catalog.querySelector('[data-catalog-results]');
+    let timer = null;
+    let latest = 0;
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () {
+        const query = input.value.trim();
+        const request = ++latest;
+        if (!query) {
+          renderResults(catalog, list, input, []);
+          return;
+        }
+        fetch(catalog.dataset.searchUrl + '?q=' + encodeURIComponent(query))
+          .then(function (response) { return response.json(); })
+          .then(function (data) {
+            if (request === latest) {  // Veraltete Antworten verwerfen
+              renderResults(catalog, list, input, data.results);
+            }
+          });
+      }, SEARCH_DELAY_MS);
+    });
+
+    input.addEventListener('keydown', function (event) {
+      if (event.key === 'ArrowDown' && list.firstElementChild) {
+        event.preventDefault();
+        list.firstElementChild.focus();
+      } else if (event.key === 'Escape') {
+        list.classList.add('hidden');
+        input.setAttribute('aria-expanded', 'false');
+      }
+    });
+    list.addEventListener('keydown', function (event) {
+      const current = document.activeElement;
+      if (event.key === 'ArrowDown' && current.nextElementSibling) {
+        event.preventDefault();
+        current.nextElementSibling.focus();
+      } else if (event.key === 'ArrowUp') {
+        event.preventDefault();
+        (current.previousElementSibling || input).focus();
+      } else if (event.key === 'Escape') {
+        list.classList.add('hidden');
+        input.focus();
+      }
+    });
+    document.addEventListener('click', function (event) {
+      if (!catalog.contains(event.target)) {
+        list.classList.add('hidden');
+        input.setAttribute('aria-expanded', 'false');
+      }
+    });
+  }
+
+  document.addEventListener('DOMContentLoaded', function () {
+    document.querySelectorAll('[data-skill-catalog]').forEach(initCatalog);
+  });
+})();
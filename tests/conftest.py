@@ -0,0 +1,68 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Eigene Datenbankdatei für die Tests; muss gesetzt sein, bevor main die Konfiguration liest
+_DB_DIR = tempfile.mkdtemp(prefix='dss-tests-')
+os.environ['DSS_DATABASE_URI'] = 'sqlite:///' + os.path.join(_DB_DIR, 'test.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from main import app, db  # noqa: E402
+
+app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+
+
+# Leere Datenbank samt zurückgesetzten Prozess-Caches je Test
+@pytest.fixture
+def database():
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.create_all()
+        main.invalidate_taxonomy()
+        main.invalidate_user_cache()
+        main._cache_sync = main.CacheSync()
+        yield db
+        db.session.remove()
+
+
+# Kleine Taxonomie (eine Gruppe, zwei Kompetenzen, vier Wissen/Fähigkeiten), ein Admin und zwei Nutzer
+@pytest.fixture
+def seed(database):
+    group = main.CompetenceGroup(name='Data Science')
+    analyse = main.Competence(name='Analyse', competence_group=group)
+    technik = main.Competence(name='Technik', competence_group=group)
+    skills = [
+        main.KnowledgeSkills(name='Statistik', competence=analyse),
+        main.KnowledgeSkills(name='Text Mining', competence=analyse),
+        main.KnowledgeSkills(name='Python', competence=technik),
+        main.KnowledgeSkills(name='SQL', competence=technik),
+    ]
+    admin = main.Users(name='Admin', email='admin@test.de', admin=True, password='admin')
+    erika = main.Users(name='Erika', email='erika@test.de', password='erika')
+    max_ = main.Users(name='Max', email='max@test.de', password='max')
+    db.session.add_all([group, analyse, technik, *skills, admin, erika, max_])
+    db.session.commit()
+    return {
+        "skill_ids": [skill.id for skill in skills],
+        "admin_id": admin.id,
+        "user_ids": [erika.id, max_.id],
+    }
+
+
+@pytest.fixture
+def client(seed):
+    return app.test_client()
+
+
+# Meldet den Test-Client mit E-Mail und Passwort an
+@pytest.fixture
+def login(client):
+    def login_as(email, password):
+        client.get('/logout')
+        response = client.post('/login', data={'email': email, 'password': password})
+        assert response.status_code == 302
+    return login_as
@@ -0,0 +1,85 @@
+import sqlite3
+
+import pytest
+
+import main
+from main import CacheGeneration, db
+
+
+def _generations():
+    return dict(db.session.execute(db.select(CacheGeneration.namespace, CacheGeneration.generation)).all())
+
+
+def _rename_user(user_id, name):
+    db.session.get(main.Users, user_id).name = name
+    db.session.commit()
+
+
+# Verworfene Bereiche mitschreiben statt die Caches tatsächlich zu leeren
+@pytest.fixture
+def dropped(monkeypatch):
+    namespaces = []
+    monkeypatch.setattr(main, '_drop_cache_namespace', namespaces.append)
+    return namespaces
+
+
+def test_commit_bumps_only_changed_namespaces(seed):
+    before = _generations()
+
+    _rename_user(seed['user_ids'][0], 'Erika M.')
+    after = _generations()
+    assert after['kompetenzen'] == before['kompetenzen'] + 1
+    assert after['taxonomie'] == before['taxonomie']
+
+    db.session.add(main.Project(project_name='Neu', status='Aktiv'))
+    db.session.commit()
+    assert _generations()['zuordnungen'] == before.get('zuordnungen', 0) + 1
+    assert _generations()['kompetenzen'] == after['kompetenzen']
+
+
+def test_rollback_does_not_bump(seed):
+    before = _generations()
+    db.session.get(main.Users, seed['user_ids'][0]).name = 'Verworfen'
+    db.session.flush()
+    db.session.rollback()
+
+    db.session.commit()
+    assert _generations() == before
+
+
+# Ein zweiter CacheSync steht für einen anderen Worker-Prozess
+def test_other_worker_drops_changed_namespace(seed, dropped):
+    other = main.CacheSync()
+    assert other.check() == []
+
+    _rename_user(seed['user_ids'][0], 'Erika M.')
+
+    assert other.check() == ['kompetenzen']
+    assert dropped == ['kompetenzen']
+    assert other.check() == []
+    assert dropped == ['kompetenzen']
+
+
+def test_own_commit_is_not_dropped_again(seed, dropped):
+    assert main._cache_sync.check() == []
+
+    _rename_user(seed['user_ids'][0], 'Erika M.')
+
+    assert main._cache_sync.check() == []
+    assert dropped == []
+
+
+# Zählt ein anderer Prozess zwischen eigenem Abgleich und eigenem Commit, darf record_own
+# dessen Änderung nicht übernehmen
+def test_foreign_bump_before_own_commit_is_still_detected(seed, dropped):
+    _rename_user(seed['user_ids'][0], 'Erika M.')
+    assert main._cache_sync.check() == []
+
+    connection = sqlite3.connect(db.engine.url.database)
+    with connection:
+        connection.execute("UPDATE cache_generation SET generation = generation + 1 WHERE namespace = 'kompetenzen'")
+    connection.close()
+    _rename_user(seed['user_ids'][1], 'Max M.')
+
+    assert main._cache_sync.check() == ['kompetenzen']
+    assert dropped == ['kompetenzen']
@@ -0,0 +1,93 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import main
+from main import app, db
+
+
+def _database_locked():
+    orig = sqlite3.OperationalError('database is locked')
+    orig.sqlite_errorcode = sqlite3.SQLITE_BUSY
+    return OperationalError('COMMIT', {}, orig)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setitem(app.config, 'DB_LOCK_RETRY_BASE_SECONDS', 0)
+
+
+# SQLITE_BUSY nach dem Schreiben der Level: nur die Transaktion läuft erneut, nicht die Route
+def test_competence_save_retries_transaction_once(client, login, seed, monkeypatch):
+    skill_ids = seed["skill_ids"]
+    erika_id = seed["user_ids"][0]
+
+    parse_calls = []
+    parse = main._parse_level_form
+
+    def counting_parse(form, prefix):
+        parse_calls.append(prefix)
+        return parse(form, prefix)
+
+    refresh_calls = []
+    refresh = main.refresh_user_project_coverage
+
+    def busy_once(user_id, changed_skill_ids):
+        refresh_calls.append(list(changed_skill_ids))
+        refresh(user_id, changed_skill_ids)
+        if len(refresh_calls) == 1:
+            raise _database_locked()
+
+    monkeypatch.setattr(main, '_parse_level_form', counting_parse)
+    monkeypatch.setattr(main, 'refresh_user_project_coverage', busy_once)
+
+    login('erika@test.de', 'erika')
+    response = client.post('/competence', data={
+        f'kompetenzen[{skill_ids[0]}]': 'Kenner',
+        f'kompetenzen[{skill_ids[2]}]': 'Experte',
+    })
+
+    assert response.status_code == 302
+    assert parse_calls == ['kompetenzen[']
+    assert len(refresh_calls) == 2
+
+    levels = dict(db.session.execute(
+        db.select(main.UsersCompetence.knowledge_skill_id, main.UsersCompetence.competence_level)
+        .where(main.UsersCompetence.users_id == erika_id)
+    ).all())
+    assert levels == {skill_ids[0]: main.CompetenceLevel.KENNER, skill_ids[2]: main.CompetenceLevel.EXPERTE}
+
+    changes = db.session.execute(
+        db.select(main.CompetenceChange.knowledge_skill_id, main.CompetenceChange.changed_at)
+        .where(main.CompetenceChange.users_id == erika_id)
+    ).all()
+    assert sorted(change.knowledge_skill_id for change in changes) == [skill_ids[0], skill_ids[2]]
+    assert len({change.changed_at for change in changes}) == 1  # ein einziger Batch
+
+
+def test_retry_gives_up_after_configured_attempts(database, monkeypatch):
+    monkeypatch.setitem(app.config, 'DB_LOCK_RETRIES', 2)
+    calls = []
+
+    @main.retry_on_db_lock
+    def always_locked():
+        calls.append(1)
+        raise _database_locked()
+
+    with pytest.raises(OperationalError):
+        always_locked()
+    assert len(calls) == 3
+
+
+def test_other_operational_errors_are_not_retried(database):
+    calls = []
+
+    @main.retry_on_db_lock
+    def broken():
+        calls.append(1)
+        raise OperationalError('SELECT', {}, sqlite3.OperationalError('no such table: x'))
+
+    with pytest.raises(OperationalError):
+        broken()
+    assert len(calls) == 1
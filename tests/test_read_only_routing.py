@@ -0,0 +1,68 @@
+import pytest
+from sqlalchemy import event
+
+import main
+from main import app, db
+
+
+# Zählt die Statements, die über die Read-only-Engine laufen
+@pytest.fixture
+def read_statements(database):
+    engine = main.get_read_engine()
+    assert engine is not None
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.fixture
+def project(seed):
+    projekt = main.Project(project_name='Routing', status='Aktiv')
+    db.session.add(projekt)
+    db.session.commit()
+    return projekt.id
+
+
+def test_get_report_reads_through_read_only_engine(client, login, project, read_statements):
+    login('admin@test.de', 'admin')
+    read_statements.clear()
+
+    response = client.get('/admin', query_string={'project_id': project})
+
+    assert response.status_code == 200
+    assert read_statements
+
+
+def test_post_on_report_route_uses_primary_engine(client, login, project, read_statements):
+    login('admin@test.de', 'admin')
+    read_statements.clear()
+
+    response = client.post('/admin', data={'project_id': project})
+
+    assert response.status_code == 200
+    assert read_statements == []
+
+
+def test_flush_in_read_only_session_switches_back_to_primary(seed, read_statements):
+    db.session.info['read_only'] = True
+    erika = db.session.get(main.Users, seed['user_ids'][0])
+    assert read_statements
+
+    erika.name = 'Erika M.'
+    db.session.flush()
+    read_statements.clear()
+
+    # Nach dem Flush sieht die Session ihre eigene, noch nicht committete Änderung
+    name = db.session.scalar(db.select(main.Users.name).where(main.Users.id == erika.id))
+    assert name == 'Erika M.'
+    assert read_statements == []
+    assert 'read_only' not in db.session.info
+
+    db.session.commit()
+    db.session.expire_all()
+    assert db.session.get(main.Users, erika.id).name == 'Erika M.'
@@ -0,0 +1,76 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from main import _min_cost_assignment
+
+
+# Günstigste Zuordnung durch Ausprobieren aller Spaltenfolgen (None, wenn jede Zuordnung eine verbotene Kante nutzt)
+def _brute_force(cost):
+    n_rows, n_cols = cost.shape
+    best = None
+    for cols in itertools.permutations(range(n_cols), n_rows):
+        total = cost[np.arange(n_rows), list(cols)].sum()
+        if np.isfinite(total) and (best is None or total < best):
+            best = total
+    return best
+
+
+def _random_cost(rng, n_rows, n_cols, forbidden):
+    cost = rng.integers(-9, 10, size=(n_rows, n_cols)).astype(float)
+    cost[rng.random((n_rows, n_cols)) < forbidden] = np.inf
+    return cost
+
+
+def _check(cost):
+    expected = _brute_force(cost)
+    if expected is None:
+        with pytest.raises(ValueError):
+            _min_cost_assignment(cost)
+        return
+
+    cols = _min_cost_assignment(cost)
+    assert len(cols) == cost.shape[0]
+    assert len(set(cols.tolist())) == len(cols)
+    total = cost[np.arange(cost.shape[0]), cols].sum()
+    assert np.isfinite(total)
+    assert total == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_square_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 7))
+    _check(_random_cost(rng, n, n, forbidden=0.0))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_rectangular_matches_brute_force(seed):
+    rng = np.random.default_rng(1000 + seed)
+    n_rows = int(rng.integers(1, 5))
+    n_cols = n_rows + int(rng.integers(1, 4))
+    _check(_random_cost(rng, n_rows, n_cols, forbidden=0.0))
+
+
+# Mit verbotenen Kanten (np.inf): teils lösbar, teils nicht
+@pytest.mark.parametrize('seed', range(60))
+def test_forbidden_edges_match_brute_force(seed):
+    rng = np.random.default_rng(2000 + seed)
+    n_rows = int(rng.integers(1, 5))
+    n_cols = n_rows + int(rng.integers(0, 3))
+    _check(_random_cost(rng, n_rows, n_cols, forbidden=0.5))
+
+
+def test_infeasible_when_rows_share_a_single_column():
+    cost = np.array([[1.0, np.inf, np.inf],
+                     [2.0, np.inf, np.inf]])
+    with pytest.raises(ValueError):
+        _min_cost_assignment(cost)
+
+
+# Wie in StaffingOptimizer: kostenlose Dummy-Spalten je Zeile machen jede Runde lösbar
+def test_dummy_columns_keep_rows_unassigned_when_nothing_helps():
+    cost = np.array([[np.inf, 0.0, np.inf],
+                     [-3.0, np.inf, 0.0]])
+    assert _min_cost_assignment(cost).tolist() == [1, 0]
@@ -0,0 +1,86 @@
+import itertools
+import random
+
+import pytest
+
+from main import CompetenceLevel, TeamRecommender
+
+
+# Zufällige Anforderungen (Soll-Level, teils ohne Level) und Postings (user_id, skill_id, level)
+def _random_instance(rng):
+    skill_ids = rng.sample(range(1, 50), rng.randint(1, 6))
+    anforderungen = {
+        skill_id: rng.choice([None, *CompetenceLevel]) for skill_id in skill_ids
+    }
+    postings = []
+    for user_id in range(1, rng.randint(1, 9) + 1):
+        for skill_id in skill_ids:
+            if rng.random() < 0.4:
+                postings.append((user_id, skill_id, rng.choice(list(CompetenceLevel))))
+    return anforderungen, postings
+
+
+# Je Nutzer die Menge der Anforderungen, die er im Soll-Level erfüllt
+def _user_coverage(anforderungen, postings):
+    coverage = {}
+    for user_id, skill_id, level in postings:
+        if level >= (anforderungen[skill_id] or 0):
+            coverage.setdefault(user_id, set()).add(skill_id)
+    return coverage
+
+
+# Kleinstes Team, das alles Abdeckbare abdeckt, durch Ausprobieren aller Teilmengen
+def _brute_force_size(coverage):
+    coverable = set().union(*coverage.values())
+    for size in range(len(coverage) + 1):
+        for team in itertools.combinations(coverage, size):
+            if set().union(*(coverage[user_id] for user_id in team)) == coverable:
+                return size
+
+
+@pytest.mark.parametrize('seed', range(80))
+@pytest.mark.parametrize('exact', [True, False])
+def test_recommendations_cover_everything_coverable(seed, exact):
+    anforderungen, postings = _random_instance(random.Random(seed))
+    coverage = _user_coverage(anforderungen, postings)
+    coverable = set().union(*coverage.values())
+    recommender = TeamRecommender(anforderungen, postings)
+
+    recommendations = recommender.recommend(limit=3, exact=exact)
+
+    if not coverage:
+        assert recommendations == []
+        return
+    minimum = _brute_force_size(coverage)
+    assert recommendations
+    for r in recommendations:
+        assert set().union(*(coverage[user_id] for user_id in r.user_ids)) == coverable
+        assert set(r.uncovered) == set(anforderungen) - coverable
+        assert len(r.user_ids) >= minimum
+    if exact:
+        assert len(recommendations[0].user_ids) == minimum
+        assert recommendations[0].exact
+
+
+# Greedy wählt zuerst den Nutzer mit den meisten Anforderungen und braucht dann noch zwei weitere;
+# die exakte Suche findet das Zweierteam
+def test_exact_beats_greedy_set_cover():
+    anforderungen = dict.fromkeys(range(1, 7), CompetenceLevel.KENNER)
+    coverage = {1: {1, 2, 3, 4}, 2: {1, 3, 5}, 3: {2, 4, 6}}
+    postings = [(user_id, skill_id, CompetenceLevel.KENNER)
+                for user_id, skills in coverage.items() for skill_id in skills]
+    recommender = TeamRecommender(anforderungen, postings)
+
+    assert len(recommender._greedy()) == 3
+    best = recommender.recommend(limit=1, exact=True)[0]
+    assert sorted(best.user_ids) == [2, 3]
+    assert best.exact
+
+
+def test_level_below_requirement_does_not_count():
+    anforderungen = {1: CompetenceLevel.EXPERTE, 2: CompetenceLevel.KENNER}
+    postings = [(1, 1, CompetenceLevel.KOENNER), (1, 2, CompetenceLevel.KENNER)]
+    recommender = TeamRecommender(anforderungen, postings)
+
+    assert recommender.uncovered_skill_ids() == [1]
+    assert recommender.recommend(exact=True)[0].user_ids == (1,)